@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from order.order import Order, OrderType, OrderDirection
+from order.costs import affordable_quantity
+from portfolio.portfolio import Portfolio
+from kernels.matching import bar_fills, LIMIT, STOP, STOP_LIMIT
+
+def moving_average_signals(close, fast=20, slow=50):
+    # 1 while the fast average is above the slow one, else 0 (long or flat)
+    if fast >= slow:
+        raise ValueError(f"Fast window must be shorter than slow window, got {fast} and {slow}")
+    fast_ma = close.rolling(window=fast).mean()
+    slow_ma = close.rolling(window=slow).mean()
+    return (fast_ma > slow_ma).astype(int)
+
+def run_signal_backtest(stock_data, signals, initial_capital=100000, cost_model=None):
+    # Trades the close on every bar where the long/flat signal changes: enters with all
+    # available cash net of trading costs and exits the whole position, marking the Portfolio on every bar
+    ticker = stock_data.get_ticker
+    close = stock_data.get_prices['Close']
+    signals = signals.reindex(close.index).fillna(0).astype(int)
+    changes = signals.diff().fillna(signals.iloc[0])
+    portfolio = Portfolio(initial_capital=initial_capital, cost_model=cost_model)
+
+    for timestamp, price, change in zip(close.index, close.to_numpy(dtype=float), changes.to_numpy()):
+        if change > 0:
+            quantity = int(affordable_quantity(portfolio.current_cash, price, cost_model))
+            if quantity > 0:
+                order = Order(ticker, OrderType.MARKET, OrderDirection.LONG, quantity, open_price=price, timestamp=timestamp)
+                portfolio.execute_market_order(order, price, timestamp=timestamp)
+        elif change < 0 and ticker in portfolio.position_df.index:
+            quantity = int(portfolio.position_df.at[ticker, 'quantity'])
+            if quantity > 0:
+                order = Order(ticker, OrderType.MARKET, OrderDirection.SHORT, quantity, open_price=price, timestamp=timestamp)
+                portfolio.execute_market_order(order, price, timestamp=timestamp)
+        portfolio.update_portfolio_value({ticker: price}, timestamp)
+    return portfolio
+
+def backtest_summary(portfolio, periods_per_year=252):
+    summary = dict(portfolio.get_performance_metrics(periods_per_year=periods_per_year))
+    summary['trades'] = len(portfolio.filled_orders_df)
+    summary['final_value'] = float(portfolio.portfolio_history_df['total_value'].iloc[-1])
+    return {key: (float(value) if isinstance(value, (np.floating, np.integer)) else value)
+            for key, value in summary.items()}
+
+def simulate_bar_fills(orders, bars):
+    # First fill of each resting order against OHLC bars (see kernels.matching for the rules).
+    # orders: rows like Portfolio.open_orders_df, where a STOP with a limit_price is a
+    # stop-limit; each order works from the first bar after its open_time. Stops trigger in
+    # the same direction as StopOrder in Portfolio.check_pending_orders (a LONG stop once the
+    # price falls to it), so on bars with one price both fill the same orders at that price.
+    order_type = orders['order_type'].map(lambda value: getattr(value, 'value', value)).to_numpy()
+    if (order_type == OrderType.MARKET.value).any():
+        raise ValueError("Market orders fill on submission and cannot be simulated against bars")
+    is_buy = orders['direction'].map(lambda value: getattr(value, 'value', value)).to_numpy() == OrderDirection.LONG.value
+    limit_price = pd.to_numeric(orders['limit_price'], errors='coerce').to_numpy(dtype=float)
+    stop_price = pd.to_numeric(orders['stop_price'], errors='coerce').to_numpy(dtype=float)
+    kind = np.where(order_type == OrderType.LIMIT.value, LIMIT, np.where(np.isnan(limit_price), STOP, STOP_LIMIT))
+    start = np.searchsorted(bars.index.to_numpy(), pd.to_datetime(orders['open_time']).to_numpy(), side='right')
+
+    fill_bar, fill_price = bar_fills(start.astype(np.int64), is_buy, kind.astype(np.int64), limit_price, stop_price,
+                                     bars['Open'].to_numpy(dtype=float), bars['High'].to_numpy(dtype=float),
+                                     bars['Low'].to_numpy(dtype=float))
+    filled = fill_bar >= 0
+    fill_time = pd.Series(pd.NaT, index=orders.index, dtype=bars.index.dtype)
+    fill_time[filled] = bars.index[fill_bar[filled]]
+    return pd.DataFrame({'order_id': orders['order_id'].to_numpy(), 'filled': filled,
+                         'fill_time': fill_time.to_numpy(), 'fill_price': fill_price}, index=orders.index)
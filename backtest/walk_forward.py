@@ -0,0 +1,160 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data.stock_data import StockData
+from portfolio.analytics import compute_metrics, METRIC_NAMES
+from portfolio.portfolio_batch import PortfolioBatch
+from order.costs import affordable_quantity
+from backtest.backtester import run_signal_backtest, backtest_summary
+
+# Objectives where a smaller value is better; every other metric is maximized
+MINIMIZED = ('annualized_volatility', 'max_drawdown_duration')
+
+def parameter_grid(fast_windows, slow_windows):
+    # Every (fast, slow) moving average pair with fast < slow
+    return [(fast, slow) for fast in fast_windows for slow in slow_windows if fast < slow]
+
+def walk_forward_windows(n_bars, train_size, test_size, step=None, anchored=False):
+    # (train_start, test_start, test_end) bar positions. Test windows follow each other by
+    # step (default test_size) until the data runs out; the last one may be shorter.
+    # Anchored windows train from the first bar, rolling ones on the train_size bars before.
+    if train_size < 2 or test_size < 1:
+        raise ValueError(f"Need train_size >= 2 and test_size >= 1, got {train_size} and {test_size}")
+    step = step or test_size
+    windows = []
+    for test_start in range(train_size, n_bars, step):
+        windows.append((0 if anchored else test_start - train_size, test_start, min(test_start + test_size, n_bars)))
+    return windows
+
+def crossover_signals(close, params):
+    # (len(params), bars) long/flat signals as moving_average_signals() would give for each pair,
+    # computing each distinct rolling mean once over the whole history
+    close = pd.Series(close, dtype=float)
+    for fast, slow in params:
+        if fast >= slow:
+            raise ValueError(f"Fast window must be shorter than slow window, got {fast} and {slow}")
+    windows = sorted({window for pair in params for window in pair})
+    means = {window: close.rolling(window=window).mean().to_numpy() for window in windows}
+    signals = np.zeros((len(params), len(close)), dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        for k, (fast, slow) in enumerate(params):
+            signals[k] = means[fast] > means[slow]
+    return signals
+
+def evaluate_signals(close, signals, initial_capital=100000, cost_model=None, return_trades=False):
+    # Equity curves (K, bars) of run_signal_backtest() for K signal rows over the same closes,
+    # each starting flat. Trades only happen where a signal changes, so the batch is filled on
+    # those bars alone and cash and positions are carried forward in between.
+    # return_trades=True also returns each row's number of executed fills.
+    close = np.asarray(close, dtype=float)
+    signals = np.atleast_2d(signals)
+    n_params, n_bars = signals.shape
+    changes = np.diff(signals, axis=1, prepend=0)
+    batch = PortfolioBatch(n_params, ['asset'], initial_capital, cost_model)
+    events = np.flatnonzero(changes.any(axis=0))
+    cash = np.empty((len(events) + 1, n_params))
+    quantity = np.empty((len(events) + 1, n_params))
+    cash[0], quantity[0] = batch.cash, 0.0
+    for i, t in enumerate(events, start=1):
+        price = close[t]
+        held = batch.quantity[:, 0]
+        orders = np.where(changes[:, t] > 0, affordable_quantity(batch.cash, price, cost_model),
+                          np.where((changes[:, t] < 0) & (held > 0), -held, 0.0))
+        batch.execute(orders[:, None], [price])
+        cash[i], quantity[i] = batch.cash, batch.quantity[:, 0]
+    # Row of the last event at or before each bar (row 0 is the starting state)
+    last = np.searchsorted(events, np.arange(n_bars), side='right')
+    equity = (cash[last] + quantity[last] * close[:, None]).T
+    if return_trades:
+        return equity, batch.trade_count
+    return equity
+
+def _score_window(task):
+    # Runs in a worker process: the objective for every parameter row over one training slice
+    close, signals, initial_capital, cost_model, objective, periods_per_year = task
+    start = time.perf_counter()
+    equity = evaluate_signals(close, signals, initial_capital, cost_model)
+    scores = compute_metrics(equity, periods_per_year)[objective].to_numpy()
+    return scores, time.perf_counter() - start
+
+def walk_forward(stock_data, params, train_size=252, test_size=63, step=None, anchored=False,
+                 objective='sharpe_ratio', initial_capital=100000, cost_model=None,
+                 max_workers=None, periods_per_year=252, portfolio=True):
+    # Optimizes the moving average pair on each training window (in a process pool) and trades
+    # the winner on the test window that follows. Signals for every pair are computed once over
+    # the preloaded history and sliced per window, so no window reloads data or recomputes
+    # indicators; each window's cost is its own length times the number of pairs.
+    # portfolio=False returns the out-of-sample equity without building a Portfolio.
+    if objective not in METRIC_NAMES:
+        raise ValueError(f"Unknown objective {objective!r}, expected one of {METRIC_NAMES}")
+    start = time.perf_counter()
+    params = list(params)
+    prices = stock_data.get_prices
+    close = prices['Close'].to_numpy(dtype=float)
+    signals = crossover_signals(close, params)
+    windows = walk_forward_windows(len(close), train_size, test_size, step, anchored)
+    if not windows:
+        raise ValueError(f"Need more than {train_size} bars for a walk-forward test, got {len(close)}")
+
+    tasks = [(close[train_start:test_start], signals[:, train_start:test_start], initial_capital,
+              cost_model, objective, periods_per_year)
+             for train_start, test_start, _ in windows]
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_score_window(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_score_window, tasks, chunksize=chunksize))
+
+    # Out of sample, each test window follows its winning pair's signal. The position carries
+    # over between windows and only trades when the new pair's signal disagrees with it.
+    stitched = np.zeros(len(close), dtype=np.int8)
+    rows = []
+    for (train_start, test_start, test_end), (scores, _) in zip(windows, results):
+        ranked = -scores if objective in MINIMIZED else scores
+        best = int(np.argmax(np.where(np.isnan(ranked), -np.inf, ranked)))
+        stitched[test_start:test_end] = signals[best, test_start:test_end]
+        rows.append({
+            'train_start': prices.index[train_start], 'test_start': prices.index[test_start],
+            'test_end': prices.index[test_end - 1], 'fast': params[best][0], 'slow': params[best][1],
+            'in_sample': float(scores[best]),
+        })
+
+    first, last = windows[0][1], windows[-1][2]
+    test_prices = prices.iloc[first:last]
+    if portfolio:
+        # Log returns are sliced from the preloaded data rather than recomputed
+        returns = stock_data.get_log_returns
+        test_data = StockData(ticker=stock_data.get_ticker, start_date=test_prices.index[0],
+                              end_date=test_prices.index[-1], prices=test_prices,
+                              log_returns=returns[returns.index.isin(test_prices.index)],
+                              volatility=stock_data.get_volatility)
+        portfolio = run_signal_backtest(test_data, pd.Series(stitched[first:last], index=test_prices.index),
+                                        initial_capital, cost_model)
+        equity = portfolio.portfolio_history_df['total_value'].astype(float)
+        summary = backtest_summary(portfolio, periods_per_year)
+    else:
+        # The same curve from the batched evaluator, skipping the Portfolio's per-bar bookkeeping
+        curves, trades = evaluate_signals(close[first:last], stitched[first:last], initial_capital, cost_model,
+                                          return_trades=True)
+        curve = curves[0]
+        equity = pd.Series(curve, index=test_prices.index, name='total_value')
+        summary = compute_metrics(equity, periods_per_year)
+        summary['trades'] = int(trades[0])
+        summary['final_value'] = float(curve[-1])
+        portfolio = None
+    timings = {
+        'wall_seconds': time.perf_counter() - start,
+        'optimize_seconds': {row['test_start']: seconds for row, (_, seconds) in zip(rows, results)},
+        'workers': workers,
+    }
+    return {
+        'windows': pd.DataFrame(rows),
+        'equity': equity,
+        'portfolio': portfolio,
+        'summary': summary,
+        'timings': timings,
+    }
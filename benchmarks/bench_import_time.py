@@ -0,0 +1,71 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.run_benchmarks import compare_to_baseline
+
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_MODULES = ('data.data_factory', 'data.option_data', 'data.option_pricer', 'graph.graph_model',
+                   'portfolio.portfolio', 'cli')
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'matplotlib', 'yfinance')
+
+# Run in a fresh interpreter so nothing is already cached in sys.modules
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(elapsed, ','.join(heavy))
+"""
+
+def measure_import(module, repeat=5):
+    samples = []
+    loaded = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                   capture_output=True, text=True, cwd=str(REPO_ROOT), check=True)
+        elapsed, _, heavy = completed.stdout.strip().partition(' ')
+        samples.append(float(elapsed))
+        loaded = [name for name in heavy.split(',') if name]
+    median = statistics.median(samples)
+    return {'median_s': median, 'min_s': min(samples), 'repeats': repeat, 'units': 1,
+            'per_unit_us': median * 1e6, 'heavy_modules': loaded}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import time of the repo's modules in fresh interpreters")
+    parser.add_argument('modules', nargs='*', default=list(DEFAULT_MODULES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help="Write the JSON results to this file")
+    parser.add_argument('--baseline', default=None, help="Compare against a JSON results file")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = {f'import.{module}': measure_import(module, args.repeat) for module in args.modules}
+    report = {'results': results}
+    if args.baseline:
+        with open(args.baseline) as handle:
+            report['comparison'] = compare_to_baseline(results, json.load(handle)['results'], args.threshold)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        comparison = report.get('comparison', {})
+        for name, result in results.items():
+            line = f"{name:32} {result['median_s'] * 1e3:>9.1f} ms  loads: {', '.join(result['heavy_modules']) or '-'}"
+            if comparison.get(name, {}).get('ratio') is not None:
+                line += f"  x{comparison[name]['ratio']:.2f} vs baseline"
+            print(line)
+    regressions = [name for name, entry in report.get('comparison', {}).items() if entry['status'] == 'regression']
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from order.order_book import OrderBook
+
+def generate_order_flow(n_messages, seed=0, mid=100.0, tick=0.01, levels=50):
+    # Synthetic flow: 50% limits around the mid, 40% cancels, 10% market orders
+    rng = np.random.default_rng(seed)
+    kinds = rng.choice(3, size=n_messages, p=[0.5, 0.4, 0.1])
+    is_buy = rng.random(n_messages) < 0.5
+    offsets = rng.integers(0, levels, size=n_messages)
+    quantities = rng.integers(1, 100, size=n_messages)
+    prices = np.round(np.where(is_buy, mid - offsets * tick, mid + offsets * tick), 2)
+    picks = rng.random(n_messages)
+    return kinds.tolist(), is_buy.tolist(), prices.tolist(), quantities.tolist(), picks.tolist()
+
+def run_order_flow(flow):
+    kinds, is_buy, prices, quantities, picks = flow
+    book = OrderBook("SYN")
+    live = []
+    start = time.perf_counter()
+    for kind, buy, price, quantity, pick in zip(kinds, is_buy, prices, quantities, picks):
+        if kind == 0:
+            live.append(book.add_limit(buy, quantity, price))
+        elif kind == 1 and live:
+            index = int(pick * len(live))
+            live[index], live[-1] = live[-1], live[index]
+            book.cancel(live.pop())
+        else:
+            book.add_market(buy, quantity)
+    elapsed = time.perf_counter() - start
+    return {
+        'messages': len(kinds),
+        'seconds': elapsed,
+        'messages_per_second': len(kinds) / elapsed,
+        'trades': len(book.trades),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Order book matching throughput on synthetic order flow")
+    parser.add_argument('--messages', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    result = run_order_flow(generate_order_flow(args.messages, args.seed))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['messages']:,} messages in {result['seconds']:.2f}s "
+              f"({result['messages_per_second']:,.0f} msg/s, {result['trades']:,} trades)")
+    return result
+
+if __name__ == '__main__':
+    main()
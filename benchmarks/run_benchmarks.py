@@ -0,0 +1,346 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+DEFAULT_ORDER_SIZES = (1_000, 10_000, 100_000)
+SYMBOLS = ('AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'FFF', 'GGG', 'HHH')
+
+def synthetic_prices(n_days=2520, seed=0, start_price=100.0, annual_vol=0.25, freq='B'):
+    # Seeded GBM bars from data.synthetic_data, in Open/High/Low/Close/Volume column order
+    from data.synthetic_data import generate_prices
+    prices = generate_prices('2010-01-04', n_bars=n_days, freq=freq, start_price=start_price, drift=0.05,
+                             volatility=annual_vol, seed=seed)
+    return prices[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+def _stock_data(prices, ticker='SYN'):
+    from data.stock_data import StockData
+    return StockData(ticker=ticker, start_date=prices.index[0], end_date=prices.index[-1], prices=prices.copy())
+
+def _option_data(prices, strike_price, option_type='call'):
+    from data.option_data import OptionData
+    return OptionData(ticker='SYN', start_date=prices.index[0], end_date=prices.index[-1], prices=prices.copy(),
+                      option_type=option_type, strike_price=strike_price, expiration_date=datetime.now() + timedelta(days=90))
+
+def _limit_orders(n_orders, seed=0):
+    # Buy limits around 100 across a few symbols; roughly half of them are marketable at 100
+    from order.order import LimitOrder, OrderDirection
+    rng = np.random.default_rng(seed)
+    symbols = rng.choice(SYMBOLS, n_orders).tolist()
+    limits = np.round(100 + rng.normal(0, 1, n_orders), 2).tolist()
+    opened = datetime(2024, 1, 2)
+    return [(LimitOrder(symbol, OrderDirection.LONG, 1, limit_price=limit, open_price=100.0, timestamp=opened), limit)
+            for symbol, limit in zip(symbols, limits)]
+
+def _filled_portfolio(n_orders):
+    # Open orders are written in one frame; building them through add_order is itself quadratic
+    from portfolio.portfolio import Portfolio
+    portfolio = Portfolio(initial_capital=n_orders * 200)
+    rows = [{
+        'order_id': order.order_id,
+        'symbol': order.symbol,
+        'order_type': order.order_type,
+        'direction': order.direction,
+        'quantity': order.quantity,
+        'open_price': order.open_price,
+        'open_time': order.open_time,
+        'limit_price': limit,
+        'stop_price': None,
+        'filled': order.filled
+    } for order, limit in _limit_orders(n_orders)]
+    portfolio.open_orders_df = pd.DataFrame(rows, columns=portfolio.open_orders_df.columns)
+    return portfolio
+
+def bench_stock_data(n_days):
+    prices = synthetic_prices(n_days)
+    return lambda: _stock_data(prices)
+
+def bench_option_data(n_days):
+    prices = synthetic_prices(n_days)
+    strike = float(prices['Close'].iloc[-1])
+    return lambda: _option_data(prices, strike)
+
+def bench_option_greeks(n_calls):
+    option = _option_data(synthetic_prices(252), 100.0)
+
+    def run():
+        for _ in range(n_calls):
+            option.calculate_greeks()
+            option.get_option_price()
+    return run
+
+def bench_add_order(n_orders):
+    from portfolio.portfolio import Portfolio
+    orders = _limit_orders(n_orders)
+
+    def run():
+        portfolio = Portfolio(initial_capital=n_orders * 200)
+        for order, limit in orders:
+            portfolio.add_order(order, limit_price=limit)
+    return run
+
+def bench_check_pending_orders(n_orders):
+    portfolio = _filled_portfolio(n_orders)
+    open_orders = portfolio.open_orders_df.copy()
+    market_data = {symbol: 100.0 for symbol in SYMBOLS}
+
+    def run():
+        # Every repeat starts from the same cash, book and orders
+        portfolio.current_cash = portfolio.initial_capital
+        portfolio.position_df = portfolio.position_df.iloc[0:0]
+        portfolio.filled_orders_df = portfolio.filled_orders_df.iloc[0:0]
+        portfolio.open_orders_df = open_orders.copy()
+        portfolio.check_pending_orders(market_data, timestamp=datetime(2024, 1, 3))
+    return run
+
+def bench_update_portfolio_value(n_orders):
+    # Marks a book holding every symbol once per 100 orders' worth of fills
+    from portfolio.portfolio import Portfolio
+    portfolio = Portfolio(initial_capital=n_orders * 200)
+    for symbol in SYMBOLS:
+        portfolio.position_df.loc[symbol] = {'quantity': n_orders // len(SYMBOLS), 'avg_price': 100.0,
+                                             'market_value': 0.0, 'unrealized_pnl': 0.0}
+    rng = np.random.default_rng(1)
+    marks = [dict(zip(SYMBOLS, 100 + rng.normal(0, 1, len(SYMBOLS)))) for _ in range(max(n_orders // 100, 1))]
+    timestamps = pd.bdate_range('2024-01-04', periods=len(marks))
+
+    def run():
+        for timestamp, market_data in zip(timestamps, marks):
+            portfolio.update_portfolio_value(market_data, timestamp)
+    return run
+
+def bench_portfolio_batch(n_portfolios, n_bars=252):
+    # A year of random rebalances and marks across n_portfolios array portfolios
+    from portfolio.portfolio_batch import PortfolioBatch
+    rng = np.random.default_rng(2)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, len(SYMBOLS))), axis=0))
+    targets = rng.integers(-50, 51, (n_bars, n_portfolios, len(SYMBOLS))).astype(float)
+    timestamps = pd.bdate_range('2024-01-02', periods=n_bars)
+
+    def run():
+        batch = PortfolioBatch(n_portfolios, SYMBOLS, initial_capital=1e6)
+        for bar in range(n_bars):
+            batch.rebalance(targets[bar], prices[bar])
+            batch.mark(prices[bar], timestamps[bar])
+    return run
+
+def bench_american_binomial(n_options, steps=200):
+    from data.option_pricer import american_option
+    rng = np.random.default_rng(3)
+    strikes = rng.uniform(80, 120, n_options)
+    years = rng.uniform(0.1, 2.0, n_options)
+    return lambda: american_option(100.0, strikes, years, 0.04, 0.25, False, steps)
+
+def bench_bar_fills(n_orders, n_days):
+    # Limit, stop and stop-limit orders worked against a long OHLC path
+    from backtest.backtester import simulate_bar_fills
+    bars = synthetic_prices(n_days)
+    rng = np.random.default_rng(4)
+    last = float(bars['Close'].iloc[0])
+    order_type = rng.choice(['LIMIT', 'STOP'], n_orders)
+    offset = rng.uniform(0.7, 1.3, n_orders) * last
+    orders = pd.DataFrame({
+        'order_id': np.arange(n_orders),
+        'order_type': order_type,
+        'direction': rng.choice(['LONG', 'SHORT'], n_orders),
+        'limit_price': np.where((order_type == 'LIMIT') | (rng.random(n_orders) < 0.5), offset, np.nan),
+        'stop_price': np.where(order_type == 'STOP', offset, np.nan),
+        'open_time': bars.index[rng.integers(0, n_days, n_orders)],
+    })
+    return lambda: simulate_bar_fills(orders, bars)
+
+def bench_generate_panel(n_tickers, n_bars):
+    # Correlated jump-diffusion minute bars; units are generated bars
+    from data.synthetic_data import generate_panel
+    tickers = [f'T{i:03d}' for i in range(n_tickers)]
+    return lambda: generate_panel(tickers, '2020-01-02', n_bars=n_bars, freq='1min', process='jump', correlation=0.5)
+
+def bench_walk_forward(n_days, train_size=252, test_size=63):
+    # Quarterly re-optimization of 12 moving average pairs over one preloaded history
+    from backtest.walk_forward import parameter_grid, walk_forward
+    stock = _stock_data(synthetic_prices(n_days))
+    params = parameter_grid((5, 10, 20, 40), (50, 100, 200))
+    return lambda: walk_forward(stock, params, train_size, test_size, max_workers=1, portfolio=False)
+
+def bench_bar_aggregator(n_ticks):
+    # One symbol's ticks rolled into 1min/5min/1h/1D bars; units are ticks
+    from data.bar_aggregator import BarAggregator
+    rng = np.random.default_rng(5)
+    timestamps = pd.Timestamp('2024-01-02 09:30').value + np.cumsum(rng.integers(1, 50_000_000, n_ticks))
+    prices = 100 + np.cumsum(rng.normal(0, 0.01, n_ticks))
+    events = list(zip(timestamps.tolist(), ['AAPL'] * n_ticks, prices.tolist(), rng.integers(1, 100, n_ticks).tolist()))
+
+    def run():
+        BarAggregator(['1min', '5min', '1h', '1D']).consume(events).flush()
+    return run
+
+def bench_stress_option_book(n_contracts):
+    # A 50 x 20 x 5 spot/vol/time grid over a three-underlying book; units are contract scenarios
+    from portfolio.scenario import stress_option_book
+    rng = np.random.default_rng(6)
+    book = pd.DataFrame({
+        'underlying': rng.choice(['SPY', 'AAPL', 'MSFT'], n_contracts),
+        'option_type': rng.choice(['call', 'put'], n_contracts),
+        'strike_price': rng.uniform(80, 120, n_contracts),
+        'expiration_date': pd.Timestamp('2025-01-02') + pd.to_timedelta(rng.integers(5, 700, n_contracts), unit='D'),
+        'multiplier': 100,
+        'quantity': rng.integers(-10, 11, n_contracts),
+    })
+    grid = (np.linspace(-0.3, 0.3, 50), np.linspace(-0.1, 0.1, 20), [0, 1, 5, 10, 30])
+    return lambda: stress_option_book(book, 100.0, 0.25, '2025-01-02', *grid)
+
+def bench_graph(method_name, n_days, freq='B'):
+    # Headless render to a PNG, reusing the cached figure between calls
+    from graph.graph_model import GraphModel
+    model = GraphModel(_stock_data(synthetic_prices(n_days, freq=freq)))
+    method = getattr(model, method_name)
+    path = str(Path(tempfile.mkdtemp()) / f'{method_name}.png')
+    return lambda: method(save_path=path)
+
+def build_cases(order_sizes=DEFAULT_ORDER_SIZES, n_days=2520):
+    # name -> (setup returning the timed callable, work units per call)
+    cases = {
+        f'stock_data.construct[{n_days}d]': (lambda: bench_stock_data(n_days), 1),
+        f'option_data.construct[{n_days}d]': (lambda: bench_option_data(n_days), 1),
+        'option_data.greeks_and_price[x1000]': (lambda: bench_option_greeks(1000), 1000),
+    }
+    for n in order_sizes:
+        cases[f'portfolio.add_order[{n}]'] = (lambda n=n: bench_add_order(n), n)
+        cases[f'portfolio.check_pending_orders[{n}]'] = (lambda n=n: bench_check_pending_orders(n), n)
+        cases[f'portfolio.update_portfolio_value[{n}]'] = (lambda n=n: bench_update_portfolio_value(n), max(n // 100, 1))
+    cases['synthetic_data.generate_panel[10x100000min]'] = (lambda: bench_generate_panel(10, 100_000), 1_000_000)
+    cases['kernels.american_binomial[1000x200]'] = (lambda: bench_american_binomial(1000), 1000)
+    cases[f'kernels.bar_fills[1000x{n_days}d]'] = (lambda: bench_bar_fills(1000, n_days), 1000)
+    # Units are portfolio-bars, so per_unit_us compares directly with one Portfolio's bar
+    cases['portfolio_batch.rebalance_and_mark[1000x252]'] = (lambda: bench_portfolio_batch(1000), 1000 * 252)
+    cases['bar_aggregator.consume[100000x4]'] = (lambda: bench_bar_aggregator(100_000), 100_000)
+    cases['scenario.stress_option_book[1000x5000]'] = (lambda: bench_stress_option_book(1000), 1000 * 5000)
+    # Units are walk-forward windows
+    n_windows = max((n_days - 252 + 62) // 63, 1)
+    cases[f'backtest.walk_forward[12x{n_days}d]'] = (lambda: bench_walk_forward(n_days), n_windows)
+    for method_name in ('plot_price_chart', 'plot_returns_distribution', 'plot_volatility_analysis',
+                        'plot_cumulative_returns', 'plot_summary_dashboard'):
+        cases[f'graph.{method_name}[{n_days}d]'] = (lambda m=method_name: bench_graph(m, n_days), 1)
+    # Half a million session minute bars (about five years) exercise decimation
+    for method_name in ('plot_price_chart', 'plot_summary_dashboard'):
+        cases[f'graph.{method_name}[500000min]'] = (lambda m=method_name: bench_graph(m, 500_000, 'min'), 1)
+    return cases
+
+def run_suite(cases, repeat=5, max_seconds=None, pattern=None):
+    # Each case is repeated until `repeat` samples or max_seconds of measurement, whichever
+    # comes first. The first call is a warm-up unless it alone exceeds max_seconds.
+    results = {}
+    for name, (setup, units) in cases.items():
+        if pattern and pattern not in name:
+            continue
+        run = setup()
+        start = time.perf_counter()
+        run()
+        first = time.perf_counter() - start
+        samples = [first] if max_seconds is not None and first > max_seconds else []
+        budget_start = time.perf_counter()
+        while len(samples) < repeat:
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+            if max_seconds is not None and time.perf_counter() - budget_start > max_seconds:
+                break
+        median = statistics.median(samples)
+        results[name] = {
+            'median_s': median,
+            'min_s': min(samples),
+            'repeats': len(samples),
+            'units': units,
+            'per_unit_us': median / units * 1e6,
+        }
+    return results
+
+def environment():
+    import matplotlib
+    from kernels.backend import BACKEND
+    return {
+        'kernel_backend': BACKEND,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+    }
+
+def compare_to_baseline(results, baseline, threshold=0.2):
+    # A case regresses when its median is more than `threshold` (fractional) slower than baseline
+    comparison = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            comparison[name] = {'status': 'new', 'ratio': None}
+            continue
+        ratio = result['median_s'] / base['median_s']
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        comparison[name] = {'status': status, 'ratio': ratio, 'baseline_median_s': base['median_s']}
+    return comparison
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite on synthetic data")
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_ORDER_SIZES),
+                        help="Comma-separated order counts for the Portfolio cases")
+    parser.add_argument('--days', type=int, default=2520, help="Bars of synthetic history per series")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=10.0, help="Measurement budget per case")
+    parser.add_argument('--filter', default=None, help="Only run cases whose name contains this text")
+    parser.add_argument('--output', default=None, help="Write the JSON results to this file")
+    parser.add_argument('--baseline', default=None, help="Compare against a JSON results file")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument('--json', action='store_true', help="Print JSON instead of a table")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    with warnings.catch_warnings():
+        # Keep pandas deprecation chatter out of the report
+        warnings.simplefilter('ignore', FutureWarning)
+        results = run_suite(build_cases(sizes, args.days), args.repeat, args.max_seconds, args.filter)
+    report = {'environment': environment(), 'results': results}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)['results']
+        report['comparison'] = compare_to_baseline(results, baseline, args.threshold)
+        report['threshold'] = args.threshold
+        regressions = [name for name, entry in report['comparison'].items() if entry['status'] == 'regression']
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        comparison = report.get('comparison', {})
+        print(f"kernel backend: {report['environment']['kernel_backend']}")
+        for name, result in results.items():
+            line = f"{name:48} {result['median_s'] * 1e3:>10.2f} ms  {result['per_unit_us']:>10.2f} us/unit"
+            if name in comparison and comparison[name]['ratio'] is not None:
+                line += f"  x{comparison[name]['ratio']:.2f} {comparison[name]['status']}"
+            print(line)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Only the standard library is imported up front; pandas, matplotlib, scipy and yfinance
+# are imported by the steps that need them, so --help and argument errors return at once.
+
+STEPS = ('stats', 'price-option', 'backtest', 'report')
+
+class Session:
+    # Loads each ticker's history (and the rate and option chains) once per run, even when
+    # several steps running in different threads ask for it at the same time
+
+    def __init__(self, start_date, end_date, price_loader=None, rate_loader=None, chain_loader=None, source=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.source = source
+        self._price_loader = price_loader
+        self._rate_loader = rate_loader
+        self._chain_loader = chain_loader
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _once(self, key, function):
+        with self._lock:
+            future = self._cache.get(key)
+            owner = future is None
+            if owner:
+                future = self._cache[key] = Future()
+        if owner:
+            try:
+                future.set_result(function())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _data_source(self):
+        # source: a name or DataSource; None follows ALGO_DATA_SOURCE (default yfinance)
+        from data.data_factory import DataLoader
+        return DataLoader.source(self.source)
+
+    def prices(self, ticker):
+        def load():
+            if self._price_loader is not None:
+                return self._price_loader(ticker, self.start_date, self.end_date)
+            return self._data_source().fetch_bars(ticker, self.start_date, self.end_date)
+        return self._once(('prices', ticker), load)
+
+    def stock(self, ticker):
+        def build():
+            from data.stock_data import StockData
+            return StockData(ticker=ticker, start_date=self.start_date, end_date=self.end_date,
+                             prices=self.prices(ticker).copy())
+        return self._once(('stock', ticker), build)
+
+    def risk_free_rate(self):
+        def load():
+            if self._rate_loader is not None:
+                return self._rate_loader()
+            # The curve is interpolated at each option's maturity
+            from data.rate_curve import RateCurveCache
+            rate = self._data_source().risk_free_rate()
+            return rate.curve() if isinstance(rate, RateCurveCache) else rate
+        return self._once(('rate',), load)
+
+    def option_chain(self, ticker, expiration_date):
+        def load():
+            if self._chain_loader is not None:
+                return self._chain_loader(ticker, expiration_date)
+            return self._data_source().fetch_chain(ticker, expiration_date)
+        return self._once(('chain', ticker, str(expiration_date)), load)
+
+    def option(self, ticker, option_type='call', expiration_date=None, strike_price=None, risk_free_rate=None):
+        from data.data_factory import DataLoader
+        # History, rate and chain are independent downloads, so they are fetched concurrently
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            prices = pool.submit(self.prices, ticker)
+            rate = pool.submit(self.risk_free_rate) if risk_free_rate is None else None
+            if strike_price is not None and expiration_date is not None:
+                chain = None
+            else:
+                chain = pool.submit(self.option_chain, ticker, expiration_date)
+            strike_data = chain.result() if chain is not None else {
+                'calls': None, 'puts': None, 'expiration': _date_string(expiration_date)}
+            return DataLoader.build_option_data(
+                ticker, self.start_date, self.end_date, prices.result().copy(), strike_data,
+                rate.result() if rate is not None else risk_free_rate, option_type, strike_price)
+
+def _date_string(value):
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+def _plain(value):
+    # numpy scalars and timestamps to JSON-friendly Python values
+    if hasattr(value, 'item') and not isinstance(value, (list, dict)):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def step_load(session, ticker):
+    prices = session.prices(ticker)
+    return {
+        'ticker': ticker,
+        'rows': len(prices),
+        'first_date': _date_string(prices.index[0]),
+        'last_date': _date_string(prices.index[-1]),
+        'columns': list(prices.columns),
+        'last_close': _plain(prices['Close'].iloc[-1]),
+    }
+
+def step_stats(session, ticker):
+    stats = session.stock(ticker).get_prices_stats()
+    return {'ticker': ticker, **{key: _plain(value) for key, value in stats.items()}}
+
+def step_price_option(session, ticker, option_type='call', expiration_date=None, strike_price=None, risk_free_rate=None):
+    info = session.option(ticker, option_type, expiration_date, strike_price, risk_free_rate).get_option_info()
+    info['greeks'] = {key: _plain(value) for key, value in info['greeks'].items()}
+    return {key: (_plain(value) if key != 'greeks' else value) for key, value in info.items()}
+
+def step_backtest(session, ticker, fast=20, slow=50, initial_capital=100000):
+    from backtest.backtester import moving_average_signals, run_signal_backtest, backtest_summary
+    stock = session.stock(ticker)
+    portfolio = run_signal_backtest(stock, moving_average_signals(stock.get_prices['Close'], fast, slow), initial_capital)
+    return {'ticker': ticker, 'strategy': f'sma_{fast}_{slow}', **backtest_summary(portfolio)}
+
+def step_report(session, tickers, output_dir='reports', workers=None, headless=False):
+    from graph.batch_report import generate_reports
+    report = generate_reports([session.stock(ticker) for ticker in tickers], output_dir, max_workers=workers)
+    if not headless:
+        # Opening the page does not block, unlike plt.show()
+        import webbrowser
+        webbrowser.open(Path(report['index']).resolve().as_uri())
+    timings = report['timings']
+    return {
+        'index': report['index'],
+        'images': report['images'],
+        'wall_seconds': timings['wall_seconds'],
+        'seconds_per_ticker': timings['seconds_per_ticker'],
+        'workers': timings['workers'],
+    }
+
+def run_steps(session, args):
+    # All steps share one Session, so the history is downloaded once however many steps
+    # need it. The report renders last so its process pool never forks while threads run.
+    steps = [step.strip() for step in args.steps.split(',') if step.strip()]
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown steps: {', '.join(sorted(unknown))}")
+    jobs = {
+        'load': lambda: step_load(session, args.ticker),
+        'stats': lambda: step_stats(session, args.ticker),
+        'price-option': lambda: step_price_option(session, args.ticker, args.type, args.expiration, args.strike, args.rate),
+        'backtest': lambda: step_backtest(session, args.ticker, args.fast, args.slow, args.capital),
+    }
+    selected = ['load'] + [step for step in steps if step in jobs]
+    with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+        futures = {step: pool.submit(jobs[step]) for step in selected}
+        results = {step: future.result() for step, future in futures.items()}
+    if 'report' in steps:
+        results['report'] = step_report(session, [args.ticker], args.output_dir, args.workers, args.headless)
+    return results
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--start', type=_parse_date, default=None, help="History start date (YYYY-MM-DD), default one year ago")
+    common.add_argument('--end', type=_parse_date, default=None, help="History end date (YYYY-MM-DD), default today")
+    common.add_argument('--json', action='store_true', help="Print results as JSON")
+    common.add_argument('--headless', action='store_true', help="Never open windows or a browser")
+    common.add_argument('--source', default=None,
+                        help="Data source: yfinance, synthetic (seeded offline data), or local/memmap with "
+                             "ALGO_DATA_DIR; default ALGO_DATA_SOURCE or yfinance")
+
+    option = argparse.ArgumentParser(add_help=False)
+    option.add_argument('--type', choices=('call', 'put'), default='call')
+    option.add_argument('--expiration', type=_parse_date, default=None, help="Expiration date, default nearest listed")
+    option.add_argument('--strike', type=float, default=None, help="Strike price, default at the money from the chain")
+    option.add_argument('--rate', type=float, default=None, help="Risk-free rate, default from ^IRX")
+
+    backtest = argparse.ArgumentParser(add_help=False)
+    backtest.add_argument('--fast', type=int, default=20)
+    backtest.add_argument('--slow', type=int, default=50)
+    backtest.add_argument('--capital', type=float, default=100000)
+
+    report = argparse.ArgumentParser(add_help=False)
+    report.add_argument('--output-dir', default='reports')
+    report.add_argument('--workers', type=int, default=None)
+
+    parser = argparse.ArgumentParser(description="Algo trading model command line runner")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('load', parents=[common], help="Download price history").add_argument('ticker')
+    commands.add_parser('stats', parents=[common], help="Price and return statistics").add_argument('ticker')
+    commands.add_parser('price-option', parents=[common, option], help="Black-Scholes price and Greeks").add_argument('ticker')
+    commands.add_parser('backtest', parents=[common, backtest], help="Moving average crossover backtest").add_argument('ticker')
+    commands.add_parser('report', parents=[common, report], help="Dashboards and index.html").add_argument('tickers', nargs='+')
+    run = commands.add_parser('run', parents=[common, option, backtest, report], help="Several steps on one download")
+    run.add_argument('ticker')
+    run.add_argument('--steps', default=','.join(STEPS), help=f"Comma-separated steps from {', '.join(STEPS)}")
+    return parser
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def print_result(result, as_json=False, indent=0):
+    if as_json:
+        print(json.dumps(result, indent=2, default=str))
+        return
+    for key, value in result.items():
+        if isinstance(value, dict):
+            print(f"{' ' * indent}{key}:")
+            print_result(value, indent=indent + 2)
+        elif isinstance(value, float):
+            print(f"{' ' * indent}{key:22}: {value:.6f}")
+        else:
+            print(f"{' ' * indent}{key:22}: {value}")
+
+def main(argv=None, session=None):
+    args = build_parser().parse_args(argv)
+    if args.headless:
+        import matplotlib
+        matplotlib.use('Agg')
+    end_date = args.end or datetime.now()
+    start_date = args.start or end_date - timedelta(days=365)
+    session = session or Session(start_date, end_date, source=args.source)
+
+    try:
+        if args.command == 'load':
+            result = step_load(session, args.ticker)
+        elif args.command == 'stats':
+            result = step_stats(session, args.ticker)
+        elif args.command == 'price-option':
+            result = step_price_option(session, args.ticker, args.type, args.expiration, args.strike, args.rate)
+        elif args.command == 'backtest':
+            result = step_backtest(session, args.ticker, args.fast, args.slow, args.capital)
+        elif args.command == 'report':
+            result = step_report(session, args.tickers, args.output_dir, args.workers, args.headless)
+        else:
+            result = run_steps(session, args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print_result(result, args.json)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
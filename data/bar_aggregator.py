@@ -0,0 +1,161 @@
+from collections import deque
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+BAR_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+def _nanoseconds(timestamp):
+    return timestamp if isinstance(timestamp, int) else pd.Timestamp(timestamp).value
+
+class BarAggregator:
+    # Streaming OHLCV bars for several timeframes at once. Every tick or fine bar updates the
+    # open bar of each timeframe in place, so an event costs O(timeframes) whatever the history
+    # length. A bar completes when the first event of a later bucket arrives (or on advance()
+    # and flush()) and is then sent to subscribers as callback(symbol, timeframe, timestamp, bar),
+    # with bar a dict of Open/High/Low/Close/Volume labelled by the bucket start, as yfinance
+    # labels bars. Buckets are aligned to origin (default midnight); pass e.g. '2024-01-02 09:30'
+    # to start hourly bars at the session open. Events older than a symbol's open bars (or an
+    # earlier advance()) are counted in late and dropped.
+
+    def __init__(self, timeframes, origin=None, history=1000):
+        self.timeframes = [str(timeframe) for timeframe in timeframes]
+        if not self.timeframes:
+            raise ValueError("At least one timeframe is required")
+        self._steps = []
+        for timeframe in self.timeframes:
+            step = pd.Timedelta(to_offset(timeframe)).value
+            if step <= 0:
+                raise ValueError(f"Timeframe must be positive, got {timeframe}")
+            self._steps.append(step)
+        self._origin = 0 if origin is None else pd.Timestamp(origin).value
+        self.history = history
+        # symbol -> one [start, end, open, high, low, close, volume] list per timeframe, or None
+        self._open = {}
+        self._floor = {}
+        self._completed = {}
+        self._subscribers = []
+        self.events = 0
+        self.late = 0
+        self.emitted = 0
+
+    def subscribe(self, callback, timeframes=None, symbols=None):
+        # timeframes/symbols: None for all, or the ones to receive
+        timeframes = None if timeframes is None else {str(timeframe) for timeframe in
+                                                      ([timeframes] if isinstance(timeframes, str) else timeframes)}
+        symbols = None if symbols is None else set([symbols] if isinstance(symbols, str) else symbols)
+        self._subscribers.append((callback, timeframes, symbols))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [entry for entry in self._subscribers if entry[0] is not callback]
+
+    def _emit(self, symbol, position, state):
+        timeframe = self.timeframes[position]
+        timestamp = pd.Timestamp(state[0])
+        bar = dict(zip(BAR_FIELDS, state[2:7]))
+        if self.history:
+            key = (symbol, timeframe)
+            completed = self._completed.get(key)
+            if completed is None:
+                completed = self._completed[key] = deque(maxlen=self.history)
+            completed.append((timestamp, state[2:7]))
+        self.emitted += 1
+        for callback, timeframes, symbols in self._subscribers:
+            if (timeframes is None or timeframe in timeframes) and (symbols is None or symbol in symbols):
+                callback(symbol, timeframe, timestamp, bar)
+
+    def _update(self, symbol, timestamp, open_, high, low, close, volume):
+        states = self._open.get(symbol)
+        if states is None:
+            states = self._open[symbol] = [None] * len(self._steps)
+        # Latest bucket start (or advance() time) seen for the symbol; anything earlier is late
+        floor = self._floor.get(symbol)
+        if floor is not None and timestamp < floor:
+            self.late += 1
+            return
+        self.events += 1
+        origin = self._origin
+        for position, step in enumerate(self._steps):
+            state = states[position]
+            if state is not None and timestamp < state[1]:
+                if high > state[3]:
+                    state[3] = high
+                if low < state[4]:
+                    state[4] = low
+                state[5] = close
+                state[6] += volume
+                continue
+            if state is not None:
+                self._emit(symbol, position, state)
+            start = timestamp - (timestamp - origin) % step
+            states[position] = [start, start + step, open_, high, low, close, volume]
+            if floor is None or start > floor:
+                floor = start
+        self._floor[symbol] = floor
+
+    def on_tick(self, symbol, timestamp, price, size=0.0):
+        self._update(symbol, _nanoseconds(timestamp), price, price, price, price, size)
+
+    def on_bar(self, symbol, timestamp, bar):
+        # A finer bar (dict with Open/High/Low/Close and optional Volume) labelled by its start
+        close = bar['Close']
+        self._update(symbol, _nanoseconds(timestamp), bar.get('Open', close), bar.get('High', close),
+                     bar.get('Low', close), close, bar.get('Volume', 0.0))
+
+    def consume(self, events):
+        # (timestamp_ns, symbol, price, size) events, as replay.merge_streams yields them
+        for timestamp, symbol, price, size in events:
+            self._update(symbol, _nanoseconds(timestamp), price, price, price, price, size)
+        return self
+
+    def advance(self, timestamp):
+        # Completes every open bar whose bucket ends at or before timestamp, e.g. on a clock
+        # tick, so quiet symbols still emit their bars on time
+        timestamp = _nanoseconds(timestamp)
+        for symbol, states in self._open.items():
+            for position, state in enumerate(states):
+                if state is not None and state[1] <= timestamp:
+                    self._emit(symbol, position, state)
+                    states[position] = None
+            self._floor[symbol] = max(self._floor.get(symbol, timestamp), timestamp)
+
+    def flush(self):
+        # Completes every open bar, e.g. at the end of a replay
+        for symbol, states in self._open.items():
+            for position, state in enumerate(states):
+                if state is not None:
+                    self._emit(symbol, position, state)
+                    states[position] = None
+
+    def current(self, symbol, timeframe):
+        # The bar still forming for symbol and timeframe as (timestamp, bar), or None
+        states = self._open.get(symbol)
+        state = states[self.timeframes.index(str(timeframe))] if states is not None else None
+        if state is None:
+            return None
+        return pd.Timestamp(state[0]), dict(zip(BAR_FIELDS, state[2:7]))
+
+    def bars(self, symbol, timeframe):
+        # The last `history` completed bars as a DataFrame shaped like load_ticker_data output
+        completed = self._completed.get((symbol, str(timeframe)), ())
+        frame = pd.DataFrame([values for _, values in completed], columns=list(BAR_FIELDS),
+                             index=pd.DatetimeIndex([timestamp for timestamp, _ in completed], name='Date'))
+        return frame[['Close', 'High', 'Low', 'Open', 'Volume']]
+
+def stock_data_appender(stock_data):
+    # Subscriber appending completed bars to a StockData; appends are buffered by StockData, so
+    # this stays O(1) per bar until the prices are read
+    def append(symbol, timeframe, timestamp, bar):
+        if timestamp > stock_data.last_timestamp:
+            stock_data.append_bar(timestamp, bar)
+    return append
+
+def portfolio_marker(portfolio):
+    # Subscriber marking the Portfolio at each completed bar's close. Subscribe it to a single
+    # timeframe; symbols without a new bar keep their last close.
+    last_prices = {}
+
+    def mark(symbol, timeframe, timestamp, bar):
+        last_prices[symbol] = bar['Close']
+        portfolio.update_portfolio_value(last_prices, timestamp)
+    return mark
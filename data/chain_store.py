@@ -0,0 +1,251 @@
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data.option_pricer import black_scholes, option_symbol
+
+# Numeric columns kept from yfinance option chains; anything missing is stored as NaN
+CHAIN_COLUMNS = ('strike', 'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility')
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).normalize().date(), 'D')
+
+def _day_str(day):
+    return str(np.datetime64(day, 'D'))
+
+def nearest_expiration(expirations, requested):
+    # expirations: sorted 'YYYY-MM-DD' strings, which sort chronologically. Binary search
+    # instead of parsing every date; ties go to the earlier expiry.
+    if not expirations:
+        raise ValueError("No expirations to choose from")
+    requested = _day_str(_day(requested))
+    position = bisect_left(expirations, requested)
+    if position == 0:
+        return expirations[0]
+    if position == len(expirations):
+        return expirations[-1]
+    before, after = expirations[position - 1], expirations[position]
+    if after == requested:
+        return after
+    gap_before = _day(requested) - _day(before)
+    gap_after = _day(after) - _day(requested)
+    return before if gap_before <= gap_after else after
+
+class ChainSnapshot:
+    # One ticker's chains captured on one date, as columns sorted by (expiry, type, strike).
+    # key = expiry day * 2 + (0 call, 1 put), so any expiry/type slice is two binary searches.
+
+    def __init__(self, ticker, snapshot_date, columns):
+        self.ticker = ticker
+        self.snapshot_date = _day(snapshot_date)
+        self.columns = columns
+        self.keys = columns['expiry'].astype(np.int64) * 2 + columns['is_put'].astype(np.int64)
+        self.expirations = np.unique(columns['expiry'])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def nearest_expiration(self, requested):
+        if len(self.expirations) == 0:
+            raise ValueError(f"No expirations in {self.ticker} snapshot {_day_str(self.snapshot_date)}")
+        requested = _day(requested)
+        position = int(np.searchsorted(self.expirations, requested))
+        candidates = self.expirations[max(position - 1, 0):position + 1]
+        return candidates[int(np.argmin(np.abs(candidates - requested)))]
+
+    def _slice(self, expiration, option_type):
+        key = _day(expiration).astype(np.int64) * 2 + (1 if option_type == 'put' else 0)
+        return int(np.searchsorted(self.keys, key, 'left')), int(np.searchsorted(self.keys, key, 'right'))
+
+    def strike_range(self, expiration, option_type='call', low=-np.inf, high=np.inf):
+        # Row positions of strikes in [low, high] for one expiry and type
+        start, stop = self._slice(expiration, option_type)
+        strikes = self.columns['strike'][start:stop]
+        return start + int(np.searchsorted(strikes, low, 'left')), start + int(np.searchsorted(strikes, high, 'right'))
+
+    def chain(self, expiration, option_type='call', low=-np.inf, high=np.inf):
+        start, stop = self.strike_range(expiration, option_type, low, high)
+        frame = pd.DataFrame({column: self.columns[column][start:stop] for column in CHAIN_COLUMNS})
+        expiry = pd.Timestamp(_day(expiration))
+        frame.insert(0, 'contractSymbol', [option_symbol(self.ticker, expiry, option_type, strike)
+                                           for strike in frame['strike']])
+        return frame
+
+    def to_frame(self):
+        frame = pd.DataFrame({column: self.columns[column] for column in CHAIN_COLUMNS})
+        frame.insert(0, 'option_type', np.where(self.columns['is_put'], 'put', 'call'))
+        frame.insert(0, 'expiration', self.columns['expiry'].astype('datetime64[ns]'))
+        return frame
+
+    def strike_data(self, expiration_date=None):
+        # Same shape as download_data.load_strike_data()
+        expiration = self.nearest_expiration(expiration_date) if expiration_date is not None else self.expirations[0]
+        expiration_str = _day_str(expiration)
+        return {
+            'calls': self.chain(expiration, 'call'),
+            'puts': self.chain(expiration, 'put'),
+            'expiration': expiration_str,
+            'expiration_dates': expiration_str
+        }
+
+def _columns_from_chains(chains):
+    # chains: {expiration: {'calls': DataFrame, 'puts': DataFrame}}
+    parts = []
+    for expiration, sides in chains.items():
+        for is_put, side in ((False, 'calls'), (True, 'puts')):
+            frame = sides.get(side)
+            if frame is None or frame.empty:
+                continue
+            part = {column: frame[column].to_numpy(dtype=float) if column in frame.columns
+                    else np.full(len(frame), np.nan) for column in CHAIN_COLUMNS}
+            part['expiry'] = np.full(len(frame), _day(expiration))
+            part['is_put'] = np.full(len(frame), is_put)
+            parts.append(part)
+    names = ('expiry', 'is_put') + CHAIN_COLUMNS
+    if not parts:
+        empty = {column: np.empty(0, dtype=float) for column in CHAIN_COLUMNS}
+        empty.update(expiry=np.empty(0, dtype='datetime64[D]'), is_put=np.empty(0, dtype=bool))
+        return empty
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in names}
+    order = np.lexsort((columns['strike'], columns['is_put'], columns['expiry']))
+    return {name: values[order] for name, values in columns.items()}
+
+class ChainStore:
+    # Snapshots live at root/TICKER/YYYY-MM-DD.npz. The snapshot dates of each ticker are
+    # kept as a sorted list, so as-of lookups are a bisect, and loaded snapshots are cached.
+
+    def __init__(self, root, compress=False, cache_size=64):
+        self.root = root
+        self.compress = compress
+        self.cache_size = cache_size
+        self._dates = {}
+        self._cache = {}
+
+    def _path(self, ticker, snapshot_date):
+        return os.path.join(self.root, ticker, f"{_day_str(_day(snapshot_date))}.npz")
+
+    def snapshot_dates(self, ticker):
+        dates = self._dates.get(ticker)
+        if dates is None:
+            directory = os.path.join(self.root, ticker)
+            names = os.listdir(directory) if os.path.isdir(directory) else []
+            dates = self._dates[ticker] = sorted(name[:-4] for name in names
+                                                 if name.endswith('.npz') and not name.endswith('.tmp.npz'))
+        return dates
+
+    def _remember(self, ticker, date, snapshot):
+        if len(self._cache) >= self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[(ticker, date)] = snapshot
+        return snapshot
+
+    def _write(self, ticker, snapshot_date, columns):
+        path = self._path(ticker, snapshot_date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path[:-4] + '.tmp.npz'
+        (np.savez_compressed if self.compress else np.savez)(tmp_path, **columns)
+        os.replace(tmp_path, path)
+
+        date = _day_str(_day(snapshot_date))
+        dates = self.snapshot_dates(ticker)
+        position = bisect_left(dates, date)
+        if position == len(dates) or dates[position] != date:
+            dates.insert(position, date)
+        self._cache.pop((ticker, date), None)
+        self._remember(ticker, date, ChainSnapshot(ticker, date, columns))
+        return path
+
+    def save_snapshot(self, ticker, snapshot_date, chains):
+        # chains: {expiration: {'calls': DataFrame, 'puts': DataFrame}}; replaces the whole snapshot
+        return self._write(ticker, snapshot_date, _columns_from_chains(chains))
+
+    def add_chain(self, ticker, snapshot_date, expiration, calls, puts):
+        # Adds or replaces one expiry in a snapshot, keeping its other expiries
+        columns = _columns_from_chains({expiration: {'calls': calls, 'puts': puts}})
+        if _day_str(_day(snapshot_date)) in self.snapshot_dates(ticker):
+            existing = self.load(ticker, snapshot_date).columns
+            keep = existing['expiry'] != _day(expiration)
+            columns = {name: np.concatenate([existing[name][keep], values]) for name, values in columns.items()}
+            order = np.lexsort((columns['strike'], columns['is_put'], columns['expiry']))
+            columns = {name: values[order] for name, values in columns.items()}
+        return self._write(ticker, snapshot_date, columns)
+
+    def load(self, ticker, snapshot_date):
+        date = _day_str(_day(snapshot_date))
+        snapshot = self._cache.get((ticker, date))
+        if snapshot is None:
+            path = self._path(ticker, date)
+            if not os.path.exists(path):
+                raise ValueError(f"No {ticker} chain snapshot for {date}")
+            with np.load(path) as archive:
+                columns = {name: archive[name] for name in archive.files}
+            snapshot = self._remember(ticker, date, ChainSnapshot(ticker, date, columns))
+        return snapshot
+
+    def as_of(self, ticker, date):
+        # Latest snapshot taken on or before date
+        dates = self.snapshot_dates(ticker)
+        position = bisect_right(dates, _day_str(_day(date)))
+        if position == 0:
+            raise ValueError(f"No {ticker} chain snapshot on or before {_day_str(_day(date))}")
+        return self.load(ticker, dates[position - 1])
+
+    def load_range(self, ticker, start_date, end_date):
+        dates = self.snapshot_dates(ticker)
+        lo = bisect_left(dates, _day_str(_day(start_date)))
+        hi = bisect_right(dates, _day_str(_day(end_date)))
+        return [self.load(ticker, date) for date in dates[lo:hi]]
+
+    def load_history(self, tickers, start_date, end_date, option_type=None):
+        # Every snapshot of every ticker in [start_date, end_date] as one long DataFrame,
+        # built column-wise rather than by concatenating per-snapshot frames
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        snapshots = [snapshot for ticker in tickers for snapshot in self.load_range(ticker, start_date, end_date)]
+        names = ('expiry', 'is_put') + CHAIN_COLUMNS
+        if not snapshots:
+            return pd.DataFrame(columns=['ticker', 'snapshot_date', 'expiration', 'option_type'] + list(CHAIN_COLUMNS))
+        columns = {name: np.concatenate([snapshot.columns[name] for snapshot in snapshots]) for name in names}
+        lengths = [len(snapshot) for snapshot in snapshots]
+        frame = pd.DataFrame({
+            'ticker': np.repeat([snapshot.ticker for snapshot in snapshots], lengths),
+            'snapshot_date': np.repeat([snapshot.snapshot_date for snapshot in snapshots], lengths).astype('datetime64[ns]'),
+            'expiration': columns['expiry'].astype('datetime64[ns]'),
+            'option_type': np.where(columns['is_put'], 'put', 'call'),
+            **{column: columns[column] for column in CHAIN_COLUMNS},
+        })
+        if option_type is not None:
+            frame = frame[frame['option_type'] == option_type].reset_index(drop=True)
+        return frame
+
+    def load_strike_data(self, ticker, expiration_date=None, snapshot_date=None):
+        return self.as_of(ticker, snapshot_date or datetime.now()).strike_data(expiration_date)
+
+def synthetic_chain_snapshot(spot, snapshot_date, expirations, strikes=None, volatility=0.25, rate=0.04,
+                             skew=-0.1, spread_bps=50.0, seed=0):
+    # Black-Scholes priced chains with a linear volatility skew, for offline tests and backtests
+    rng = np.random.default_rng(seed)
+    if strikes is None:
+        strikes = np.round(spot * np.linspace(0.7, 1.3, 25), 0)
+    strikes = np.unique(np.asarray(strikes, dtype=float))
+    snapshot_day = _day(snapshot_date)
+    chains = {}
+    for expiration in expirations:
+        years = max((_day(expiration) - snapshot_day).astype(int), 1) / 365.25
+        smile = np.maximum(volatility + skew * np.log(strikes / spot), 0.01)
+        sides = {}
+        for side, is_call in (('calls', True), ('puts', False)):
+            price = black_scholes(spot, strikes, years, rate, smile, is_call, greeks=False)['price']
+            half_spread = np.maximum(price * spread_bps / 2e4, 0.01)
+            sides[side] = pd.DataFrame({
+                'strike': strikes,
+                'lastPrice': price,
+                'bid': np.maximum(price - half_spread, 0.0),
+                'ask': price + half_spread,
+                'volume': rng.integers(0, 5000, len(strikes)).astype(float),
+                'openInterest': rng.integers(0, 20000, len(strikes)).astype(float),
+                'impliedVolatility': smile,
+            })
+        chains[_day(expiration)] = sides
+    return chains
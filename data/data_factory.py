@@ -1,14 +1,39 @@
-from data import download_data as ddData
+import os
 from data.base_data import BaseData
 from data.stock_data import StockData
 from data.option_data import OptionData
+from data.data_sources import DataSource, DataSourceError, YFinanceSource, SyntheticSource, source_from_env
 from datetime import datetime
 
+# name -> DataSource. Names not registered here are built from the environment on first use
+# (see data_sources.source_from_env), so ALGO_DATA_SOURCE=local with ALGO_DATA_DIR moves every
+# default load to local files.
+SOURCES = {}
+
+def register_source(name, source):
+    SOURCES[name.lower()] = source
+    return source
+
+register_source('yfinance', YFinanceSource())
+register_source('synthetic', SyntheticSource())
+
 class DataLoader:
     @staticmethod
-    def load_data(ticker, start_date, end_date, data_type = "stock", option_type= "call", expiration_date=datetime.now()):
+    def source(name=None):
+        # A DataSource passes through; None means ALGO_DATA_SOURCE, default yfinance
+        if isinstance(name, DataSource):
+            return name
+        name = (name or os.environ.get('ALGO_DATA_SOURCE', 'yfinance')).lower()
+        if name not in SOURCES:
+            register_source(name, source_from_env(name))
+        return SOURCES[name]
+
+    @staticmethod
+    def load_data(ticker, start_date, end_date, data_type = "stock", option_type= "call", expiration_date=datetime.now(),
+                  source=None):
         try:
-            stock_data = ddData.load_ticker_data(ticker, start_date, end_date)
+            source = DataLoader.source(source)
+            stock_data = source.fetch_bars(ticker, start_date, end_date)
             if data_type.lower() == "base":
                 return BaseData(
                     ticker=ticker,
@@ -24,39 +49,48 @@ class DataLoader:
                     prices=stock_data
                 )
             elif data_type.lower() == 'option':
-                risk_free_rate = ddData.load_rf_data()
-                strike_data = ddData.load_strike_data(ticker, expiration_date)
-                # Get the actual expiration date used
-                actual_expiration = datetime.strptime(strike_data['expiration'], '%Y-%m-%d')
-                if option_type == "call":
-                    # Get ATM strike from calls
-                    calls_df = strike_data['calls']
-                    strike_price = calls_df.iloc[len(calls_df)//2]['strike'] if not calls_df.empty else 100.0
-                    return OptionData(
-                        ticker=ticker,
-                        start_date=start_date,
-                        end_date=end_date,
-                        prices=stock_data,
-                        strike_price=strike_price,
-                        expiration_date=actual_expiration,
-                        risk_free_rate=risk_free_rate
-                    )
-                else:
-                    # Get ATM strike from puts
-                    puts_df = strike_data['puts']
-                    strike_price = puts_df.iloc[len(puts_df)//2]['strike'] if not puts_df.empty else 100.0
-                    return OptionData(
-                        ticker=ticker,
-                        start_date=start_date,
-                        end_date=end_date,
-                        prices=stock_data,
-                        strike_price=strike_price,
-                        expiration_date=actual_expiration,
-                        risk_free_rate=risk_free_rate
-                    )
+                # The source's curve is interpolated at the option's maturity in build_option_data
+                risk_free_rate = source.risk_free_rate()
+                strike_data = source.fetch_chain(ticker, expiration_date)
+                return DataLoader.build_option_data(ticker, start_date, end_date, stock_data,
+                                                    strike_data, risk_free_rate, option_type)
             else:
                 raise ValueError(f"Unknown data type: {data_type}")
 
+        except DataSourceError:
+            # Backend failures keep their type and per-ticker errors
+            raise
         except Exception as e:
             raise Exception(f"Failed to load data for {ticker}: {str(e)}")
 
+    @staticmethod
+    def load_batch(tickers, start_date, end_date, data_type="stock", source=None):
+        # {ticker: StockData or BaseData} from one batch fetch, e.g. a single yf.download call
+        data_class = {"stock": StockData, "base": BaseData}.get(data_type.lower())
+        if data_class is None:
+            raise ValueError(f"Unknown data type for batch loads: {data_type}")
+        frames = DataLoader.source(source).fetch_bars(list(tickers), start_date, end_date)
+        return {ticker: data_class(ticker=ticker, start_date=start_date, end_date=end_date, prices=prices)
+                for ticker, prices in frames.items()}
+
+    @staticmethod
+    def build_option_data(ticker, start_date, end_date, prices, strike_data, risk_free_rate, option_type="call", strike_price=None):
+        # Builds OptionData from already loaded prices and chain, so callers holding them avoid a second download
+        actual_expiration = datetime.strptime(strike_data['expiration'], '%Y-%m-%d')
+        if strike_price is None:
+            # ATM strike from the middle of the calls or puts chain
+            chain_df = strike_data['calls'] if option_type == "call" else strike_data['puts']
+            strike_price = chain_df.iloc[len(chain_df)//2]['strike'] if not chain_df.empty else 100.0
+        if hasattr(risk_free_rate, 'rate'):
+            # RateCurve or RateCurveCache: the rate for this option's time to maturity
+            risk_free_rate = risk_free_rate.rate(max((actual_expiration - datetime.now()).days / 365.25, 0.001))
+        return OptionData(
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            prices=prices,
+            strike_price=strike_price,
+            option_type=option_type,
+            expiration_date=actual_expiration,
+            risk_free_rate=risk_free_rate
+        )
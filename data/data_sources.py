@@ -0,0 +1,314 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from data.chain_store import nearest_expiration
+from data.rate_curve import RateCurve, default_cache
+
+# Raw binary bar records for MemmapSource, in the style of replay.TICK_DTYPE
+BAR_DTYPE = np.dtype([('timestamp', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                      ('close', '<f8'), ('volume', '<f8')])
+
+class DataSourceError(ValueError):
+    # A fetch that failed in a backend. errors maps each failed ticker to its message; it is a
+    # ValueError so callers written against download_data keep working.
+
+    def __init__(self, message, source=None, errors=None):
+        super().__init__(message)
+        self.source = source
+        self.errors = errors or {}
+
+def _window(frame, start, end):
+    # Rows in [start, end), the range yf.download returns, by binary search on the sorted index
+    index = frame.index
+    first = 0 if start is None else index.searchsorted(pd.Timestamp(start), 'left')
+    last = len(index) if end is None else index.searchsorted(pd.Timestamp(end), 'left')
+    return frame.iloc[first:last]
+
+class DataSource(ABC):
+    # Bars and option chains from one backend. fetch_bars takes one ticker (returns a DataFrame
+    # shaped like download_data.load_ticker_data) or several (returns {ticker: DataFrame}).
+    # Backends fetch one ticker in _fetch_ticker, or a whole batch in _fetch_batch when they
+    # can do it in one request. Every backend call holds the instance's semaphore, so
+    # max_concurrency bounds the requests in flight across all threads sharing the source.
+    name = 'base'
+    max_concurrency = 4
+
+    def __init__(self, max_concurrency=None):
+        if max_concurrency is not None:
+            if max_concurrency < 1:
+                raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+            self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    def _call(self, function, *args):
+        with self._semaphore:
+            try:
+                return function(*args)
+            except DataSourceError:
+                raise
+            except Exception as e:
+                raise DataSourceError(f"{self.name}: {e}", source=self.name) from e
+
+    def fetch_bars(self, tickers, start=None, end=None):
+        single = isinstance(tickers, str)
+        tickers = [tickers] if single else list(dict.fromkeys(tickers))
+        frames, errors = self._fetch_batch(tickers, start, end)
+        for ticker in tickers:
+            if ticker not in errors and (ticker not in frames or frames[ticker].empty):
+                errors[ticker] = f"No data found for ticker: {ticker}"
+        if errors:
+            detail = '; '.join(f"{ticker}: {message}" for ticker, message in errors.items())
+            raise DataSourceError(f"{self.name} fetch failed for {len(errors)} ticker(s): {detail}",
+                                  source=self.name, errors=errors)
+        return frames[tickers[0]] if single else {ticker: frames[ticker] for ticker in tickers}
+
+    def _fetch_batch(self, tickers, start, end):
+        # Default batch: one _fetch_ticker per ticker on a thread pool sized to the semaphore
+        def fetch(ticker):
+            try:
+                return ticker, self._call(self._fetch_ticker, ticker, start, end), None
+            except DataSourceError as e:
+                return ticker, None, str(e)
+
+        if len(tickers) == 1:
+            results = [fetch(tickers[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(tickers), self.max_concurrency)) as pool:
+                results = list(pool.map(fetch, tickers))
+        frames = {ticker: frame for ticker, frame, error in results if error is None}
+        errors = {ticker: error for ticker, _, error in results if error is not None}
+        return frames, errors
+
+    @abstractmethod
+    def _fetch_ticker(self, ticker, start, end):
+        # One ticker's bars as a DataFrame indexed by date; called under the semaphore
+        ...
+
+    def fetch_chain(self, ticker, expiry=None):
+        # Same shape as download_data.load_strike_data(); expiry picks the nearest listed one
+        return self._call(self._fetch_chain, ticker, expiry)
+
+    def _fetch_chain(self, ticker, expiry):
+        raise DataSourceError(f"{self.name} has no option chains", source=self.name)
+
+    def risk_free_rate(self):
+        # A RateCurve or RateCurveCache, as build_option_data accepts
+        return default_cache()
+
+class YFinanceSource(DataSource):
+    # Batches are one yf.download call; yf.Ticker objects (and the options list they cache) are
+    # kept per ticker. Pass session to share a requests/curl_cffi session across calls.
+    name = 'yfinance'
+    max_concurrency = 2
+
+    def __init__(self, session=None, max_concurrency=None):
+        super().__init__(max_concurrency)
+        self.session = session
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    def _fetch_batch(self, tickers, start, end):
+        try:
+            data = self._call(self._download, tickers if len(tickers) > 1 else tickers[0], start, end)
+        except DataSourceError as e:
+            return {}, {ticker: str(e) for ticker in tickers}
+        frames = {}
+        if isinstance(data.columns, pd.MultiIndex):
+            # (Price, Ticker) columns; one frame per ticker without the bars it does not have
+            for ticker in tickers:
+                if ticker in data.columns.get_level_values(1):
+                    frame = data.xs(ticker, axis=1, level=1).dropna(how='all')
+                    frame.columns.name = 'Price'
+                    frames[ticker] = frame
+        elif not data.empty:
+            frames[tickers[0]] = data
+        return frames, {}
+
+    def _fetch_ticker(self, ticker, start, end):
+        # Batches never come through here (_fetch_batch is one download); this serves direct
+        # single-ticker calls
+        data = self._download(ticker, start, end)
+        if isinstance(data.columns, pd.MultiIndex):
+            data = data.xs(ticker, axis=1, level=1).dropna(how='all')
+        return data
+
+    def _download(self, tickers, start, end):
+        import yfinance as yf
+        return yf.download(tickers, start=start, end=end, session=self.session, progress=False)
+
+    def _ticker(self, symbol):
+        import yfinance as yf
+        with self._lock:
+            ticker = self._tickers.get(symbol)
+            if ticker is None:
+                ticker = self._tickers[symbol] = yf.Ticker(symbol, session=self.session)
+        return ticker
+
+    def _fetch_chain(self, ticker, expiry):
+        yf_ticker = self._ticker(ticker)
+        expirations = sorted(yf_ticker.options)
+        if not expirations:
+            raise DataSourceError(f"No option data available for {ticker}", source=self.name)
+        expiration = nearest_expiration(expirations, expiry) if expiry is not None else expirations[0]
+        chain = yf_ticker.option_chain(expiration)
+        return {'calls': chain.calls, 'puts': chain.puts, 'expiration': expiration, 'expiration_dates': expiration}
+
+class LocalFileSource(DataSource):
+    # A directory of <TICKER>.csv or <TICKER>.parquet bar files (columns as load_ticker_data
+    # returns, dates in the first column or index), with an optional ChainStore for chains and
+    # rates.csv (RateCurve.to_csv layout) for the rate curve. Parsed files are cached until
+    # their modification time changes, so repeated windows cost one slice each.
+    name = 'local'
+    max_concurrency = 8
+
+    def __init__(self, root, file_format=None, chain_store=None, max_concurrency=None):
+        super().__init__(max_concurrency)
+        if file_format not in (None, 'csv', 'parquet'):
+            raise ValueError(f"Unknown file format: {file_format}, expected 'csv' or 'parquet'")
+        self.root = root
+        self.file_format = file_format
+        self.chain_store = chain_store
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def path(self, ticker):
+        formats = [self.file_format] if self.file_format else ['parquet', 'csv']
+        for file_format in formats:
+            path = os.path.join(self.root, f"{ticker}.{file_format}")
+            if os.path.exists(path):
+                return path
+        raise DataSourceError(f"No data found for ticker: {ticker} in {self.root}", source=self.name)
+
+    def _read(self, path):
+        if path.endswith('.parquet'):
+            frame = pd.read_parquet(path)
+        else:
+            frame = pd.read_csv(path, index_col=0, parse_dates=True)
+        frame.index = pd.DatetimeIndex(frame.index, name=frame.index.name or 'Date')
+        frame.columns.name = 'Price'
+        return frame.sort_index()
+
+    def _fetch_ticker(self, ticker, start, end):
+        path = self.path(ticker)
+        modified = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is None or cached[0] != modified:
+            cached = (modified, self._read(path))
+            with self._lock:
+                self._cache[path] = cached
+        return _window(cached[1], start, end).copy()
+
+    def write(self, ticker, frame, file_format='csv'):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"{ticker}.{file_format}")
+        if file_format == 'parquet':
+            frame.to_parquet(path)
+        else:
+            frame.to_csv(path)
+        return path
+
+    def _fetch_chain(self, ticker, expiry):
+        if self.chain_store is None:
+            raise DataSourceError(f"{self.name} has no chain store", source=self.name)
+        return self.chain_store.load_strike_data(ticker, expiry)
+
+    def risk_free_rate(self):
+        path = os.path.join(self.root, 'rates.csv')
+        return RateCurve.read_csv(path) if os.path.exists(path) else default_cache()
+
+def write_binary_bars(path, frame):
+    # frame: OHLCV bars indexed by timestamp, as load_ticker_data returns
+    records = np.empty(len(frame), dtype=BAR_DTYPE)
+    records['timestamp'] = pd.DatetimeIndex(frame.index).asi8
+    for field, column in (('open', 'Open'), ('high', 'High'), ('low', 'Low'), ('close', 'Close'), ('volume', 'Volume')):
+        records[field] = frame[column].to_numpy(dtype=float)
+    records.tofile(path)
+    return len(records)
+
+class MemmapSource(DataSource):
+    # A directory of <TICKER>.bars files of BAR_DTYPE records sorted by time. Files stay mapped
+    # between fetches and a range is found by binary search on the timestamps, so a fetch only
+    # reads the pages it returns.
+    name = 'memmap'
+    max_concurrency = 16
+
+    def __init__(self, root, max_concurrency=None):
+        super().__init__(max_concurrency)
+        self.root = root
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.bars")
+
+    def write(self, ticker, frame):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            self._maps.pop(ticker, None)
+        return write_binary_bars(self.path(ticker), frame)
+
+    def _records(self, ticker):
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            raise DataSourceError(f"No data found for ticker: {ticker} in {self.root}", source=self.name)
+        size = os.path.getsize(path)
+        with self._lock:
+            cached = self._maps.get(ticker)
+            if cached is None or cached[0] != size:
+                records = np.memmap(path, dtype=BAR_DTYPE, mode='r') if size else np.empty(0, dtype=BAR_DTYPE)
+                cached = self._maps[ticker] = (size, records)
+        return cached[1]
+
+    def _fetch_ticker(self, ticker, start, end):
+        records = self._records(ticker)
+        timestamps = records['timestamp']
+        first = 0 if start is None else int(np.searchsorted(timestamps, pd.Timestamp(start).value, 'left'))
+        last = len(records) if end is None else int(np.searchsorted(timestamps, pd.Timestamp(end).value, 'left'))
+        chunk = np.array(records[first:last])
+        frame = pd.DataFrame({
+            'Close': chunk['close'], 'High': chunk['high'], 'Low': chunk['low'], 'Open': chunk['open'],
+            'Volume': chunk['volume'],
+        }, index=pd.DatetimeIndex(chunk['timestamp'].astype('datetime64[ns]'), name='Date'))
+        frame.columns.name = 'Price'
+        return frame
+
+class SyntheticSource(DataSource):
+    # data.synthetic_data behind the DataSource interface; options go to its load_ticker_data
+    name = 'synthetic'
+    max_concurrency = os.cpu_count() or 1
+
+    def __init__(self, rate=0.04, max_concurrency=None, **options):
+        super().__init__(max_concurrency)
+        self.rate = rate
+        self.options = options
+
+    def _fetch_ticker(self, ticker, start, end):
+        from data import synthetic_data
+        return synthetic_data.load_ticker_data(ticker, start, end, **self.options)
+
+    def _fetch_chain(self, ticker, expiry):
+        from data import synthetic_data
+        return synthetic_data.load_strike_data(ticker, expiry, rate=self.rate, seed=self.options.get('seed', 0))
+
+    def risk_free_rate(self):
+        from data import synthetic_data
+        return synthetic_data.load_rate_curve(self.rate)
+
+def source_from_env(name=None):
+    # Builds a backend from ALGO_DATA_SOURCE (yfinance, local, memmap, synthetic) and
+    # ALGO_DATA_DIR, so deployments can point DataLoader at local files without code changes
+    name = (name or os.environ.get('ALGO_DATA_SOURCE', 'yfinance')).lower()
+    root = os.environ.get('ALGO_DATA_DIR')
+    if name == 'yfinance':
+        return YFinanceSource()
+    if name == 'synthetic':
+        return SyntheticSource()
+    if name in ('local', 'memmap'):
+        if not root:
+            raise ValueError(f"Set ALGO_DATA_DIR to use the {name} data source")
+        return LocalFileSource(root) if name == 'local' else MemmapSource(root)
+    raise ValueError(f"Unknown data source: {name}")
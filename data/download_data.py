@@ -1,8 +1,12 @@
-import yfinance as yf
 import pandas as pd
+from data.chain_store import nearest_expiration
+from data.rate_curve import TREASURY_TENORS, RateCurve, default_cache
+
+# yfinance is imported by each loader on first use; it is the slowest import in the package
 
 def load_ticker_data(ticker, start_date, end_date):
     try:
+        import yfinance as yf
         stock_data = yf.download(ticker, start=start_date, end=end_date)
         if stock_data.empty:
             raise ValueError(f"No data found for ticker: {ticker}")
@@ -14,22 +18,45 @@ def load_ticker_data(ticker, start_date, end_date):
     except Exception as e:
         raise ValueError(f"Download data error: {str(e)}")
     
-def load_rf_data():
-    try:
-        treasury = yf.Ticker("^IRX")
-        treasury_data = treasury.history(period="1d")
-        if not treasury_data.empty:
-            return treasury_data['Close'].iloc[-1] / 100
-        return 0.05 
-    except:
-        return 0.05
-
-def load_strike_data(ticker_symbol, expiration_date=None):
+def load_treasury_curve(start_date=None, end_date=None):
+    # Treasury yields as a RateCurve; the last five days when no range is given
+    import yfinance as yf
+    tickers = list(TREASURY_TENORS)
+    if start_date is None:
+        data = yf.download(tickers, period="5d", progress=False)
+    else:
+        data = yf.download(tickers, start=start_date, end=end_date, progress=False)
+    if data.empty:
+        raise ValueError("No treasury yield data found")
+    close = data['Close'].rename(columns=TREASURY_TENORS).dropna(how='all') / 100
+    return RateCurve.from_frame(close)
+
+def load_rf_data(maturity=0.25, as_of=None):
+    # Served from the cached curve (data.rate_curve.default_cache()), so repeated option
+    # loads do not download ^IRX each time
+    return default_cache().rate(maturity, as_of)
+
+def load_strike_data(ticker_symbol, expiration_date=None, store=None):
+    # store: optional data.chain_store.ChainStore. Chains already captured today are served
+    # from it, and freshly downloaded chains are added to today's snapshot.
     from datetime import datetime
 
+    today = datetime.now()
+    snapshot = None
+    if store is not None and store.snapshot_dates(ticker_symbol)[-1:] == [today.strftime('%Y-%m-%d')]:
+        snapshot = store.load(ticker_symbol, today)
+        # An expiry today's snapshot holds answers without touching the network. The snapshot
+        # may hold only the expiries fetched so far, so anything else is resolved against the
+        # listed expirations below
+        if expiration_date is not None and \
+                pd.Timestamp(expiration_date).strftime('%Y-%m-%d') in [str(expiry) for expiry in snapshot.expirations]:
+            return snapshot.strike_data(expiration_date)
+
+    import yfinance as yf
+
     ticker = yf.Ticker(ticker_symbol)
 
-    expirations = ticker.options
+    expirations = sorted(ticker.options)
     if not expirations:
         raise ValueError(f"No option data available for {ticker_symbol}")
 
@@ -39,29 +66,28 @@ def load_strike_data(ticker_symbol, expiration_date=None):
         # Convert to string format
         if hasattr(expiration_date, 'strftime'):
             expiration_str = expiration_date.strftime('%Y-%m-%d')
-            requested_dt = expiration_date
         else:
             expiration_str = str(expiration_date)
-            requested_dt = datetime.strptime(expiration_str, '%Y-%m-%d')
 
         print(f"Requested expiration: {expiration_str}")
 
-        # Check if it's in available expirations
-        if expiration_str in expirations:
-            expiration = expiration_str
+        # Binary search over the sorted expiration strings for the closest date
+        expiration = nearest_expiration(expirations, expiration_str)
+        if expiration == expiration_str:
             print(f"Using requested expiration: {expiration}")
         else:
-            # Find the closest expiration date
-            expiration_dates = [datetime.strptime(exp, '%Y-%m-%d') for exp in expirations]
-            closest_exp = min(expiration_dates, key=lambda x: abs((x - requested_dt).days))
-            expiration = closest_exp.strftime('%Y-%m-%d')
             print(f"Warning: Expiration {expiration_str} not available. Using closest available: {expiration}")
     else:
         # Use first available expiration
         expiration = expirations[0]
         print(f"No expiration requested. Using first available: {expiration}")
 
+    if snapshot is not None and expiration in [str(expiry) for expiry in snapshot.expirations]:
+        return snapshot.strike_data(expiration)
+
     option_chain = ticker.option_chain(expiration)
+    if store is not None:
+        store.add_chain(ticker_symbol, today, expiration, option_chain.calls, option_chain.puts)
     return {
         'calls': option_chain.calls,
         'puts': option_chain.puts,
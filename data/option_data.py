@@ -1,9 +1,8 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import scipy.stats as stats
 from dataclasses import dataclass, field
 from data.stock_data import StockData
+from data.option_pricer import black_scholes
 from datetime import datetime
 
 @dataclass
@@ -38,48 +37,23 @@ class OptionData(StockData):
         d2 = d1 - sigma * np.sqrt(T)
         return d1, d2
 
-    def calculate_greeks(self):
-        d1, d2 = self.calculate_d1_d2()
-        S = self.get_current_price
-        K = self.strike_price
-        T = self.time_to_maturity
-        r = self.risk_free_rate
-        sigma = self.get_volatility
-
-        if T <= 0:
-            # Option expired
-            self.delta = 0.0
-            self.gamma = 0.0
-            self.vega = 0.0
-            self.theta = 0.0
-            self.rho = 0.0
-            return
-
-        # Delta
-        if self.option_type == 'call':
-            self.delta = stats.norm.cdf(d1)
-        else:  # put
-            self.delta = stats.norm.cdf(d1) - 1
+    def _price_and_greeks(self):
+        return black_scholes(
+            self.get_current_price,
+            self.strike_price,
+            self.time_to_maturity,
+            self.risk_free_rate,
+            self.get_volatility,
+            self.option_type == 'call'
+        )
 
-        # Gamma (same for calls and puts)
-        self.gamma = stats.norm.pdf(d1) / (S * sigma * np.sqrt(T))
-
-        # Vega (same for calls and puts)
-        self.vega = S * stats.norm.pdf(d1) * np.sqrt(T) / 100
-
-        # Theta (per day)
-        if self.option_type == 'call':
-            self.theta = (-S * stats.norm.pdf(d1) * sigma / (2 * np.sqrt(T)) 
-                - r * K * np.exp(-r * T) * stats.norm.cdf(d2)) / 365
-        else:
-            self.theta = (-S * stats.norm.pdf(d1) * sigma / (2 * np.sqrt(T)) 
-                + r * K * np.exp(-r * T) * stats.norm.cdf(-d2)) / 365
-
-        # Rho
-        if self.option_type == 'call':
-            self.rho = K * T * np.exp(-r * T) * stats.norm.cdf(d2) / 100
-        else:
-            self.rho = -K * T * np.exp(-r * T) * stats.norm.cdf(-d2) / 100
+    def calculate_greeks(self):
+        results = self._price_and_greeks()
+        self.delta = float(results['delta'])
+        self.gamma = float(results['gamma'])
+        self.vega = float(results['vega'])
+        self.theta = float(results['theta'])
+        self.rho = float(results['rho'])
 
     def calculate_time_to_maturity(self):
         current_date = datetime.now()
@@ -91,18 +65,7 @@ class OptionData(StockData):
         return 'OptionData'
 
     def get_option_price(self):
-        d1, d2 = self.calculate_d1_d2()
-        S = self.get_current_price
-        K = self.strike_price
-        T = self.time_to_maturity
-        r = self.risk_free_rate
-
-        if self.option_type == 'call':
-            price = S * stats.norm.cdf(d1) - K * np.exp(-r * T) * stats.norm.cdf(d2)
-        else:  # put
-            price = K * np.exp(-r * T) * stats.norm.cdf(-d2) - S * stats.norm.cdf(-d1)
-        
-        return price
+        return float(self._price_and_greeks()['price'])
 
     def get_greeks_dict(self):
         return {
@@ -0,0 +1,80 @@
+import numpy as np
+
+GREEK_NAMES = ('delta', 'gamma', 'vega', 'theta', 'rho')
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def black_scholes(spot, strike, time_to_maturity, rate, volatility, is_call, greeks=True):
+    # All inputs broadcast against each other; greeks follow OptionData's units
+    # (vega and rho per 1%, theta per calendar day). greeks=False returns only the price.
+    # scipy is imported on the first pricing call rather than with the module
+    from scipy.special import ndtr
+    S = np.asarray(spot, dtype=float)
+    K = np.asarray(strike, dtype=float)
+    T = np.asarray(time_to_maturity, dtype=float)
+    r = np.asarray(rate, dtype=float)
+    sigma = np.asarray(volatility, dtype=float)
+    is_call = np.asarray(is_call, dtype=bool)
+
+    S, K, T, r, sigma, is_call = np.broadcast_arrays(S, K, T, r, sigma, is_call)
+    live = (T > 0) & (sigma > 0)
+    T_safe = np.where(live, T, 1.0)
+    sigma_safe = np.where(live, sigma, 1.0)
+
+    sqrt_T = np.sqrt(T_safe)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma_safe ** 2) * T_safe) / (sigma_safe * sqrt_T)
+    d2 = d1 - sigma_safe * sqrt_T
+    discount = np.exp(-r * T_safe)
+    cdf_d1 = ndtr(d1)
+    cdf_d2 = ndtr(d2)
+    # ndtr(-x) rather than 1 - ndtr(x), which cancels to zero far in the tails
+    cdf_minus_d1 = ndtr(-d1)
+    cdf_minus_d2 = ndtr(-d2)
+
+    call_price = S * cdf_d1 - K * discount * cdf_d2
+    put_price = K * discount * cdf_minus_d2 - S * cdf_minus_d1
+    price = np.where(is_call, call_price, put_price)
+    # Expired (or zero-vol) contracts are worth intrinsic value and carry no greeks
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    if not greeks:
+        return {'price': np.where(live, price, intrinsic)}
+
+    pdf_d1 = _norm_pdf(d1)
+    delta = np.where(is_call, cdf_d1, -cdf_minus_d1)
+    gamma = pdf_d1 / (S * sigma_safe * sqrt_T)
+    vega = S * pdf_d1 * sqrt_T / 100
+    theta_decay = -S * pdf_d1 * sigma_safe / (2 * sqrt_T)
+    theta = np.where(is_call,
+                     theta_decay - r * K * discount * cdf_d2,
+                     theta_decay + r * K * discount * cdf_minus_d2) / 365
+    rho = np.where(is_call,
+                   K * T_safe * discount * cdf_d2,
+                   -K * T_safe * discount * cdf_minus_d2) / 100
+
+    return {
+        'price': np.where(live, price, intrinsic),
+        'delta': np.where(live, delta, 0.0),
+        'gamma': np.where(live, gamma, 0.0),
+        'vega': np.where(live, vega, 0.0),
+        'theta': np.where(live, theta, 0.0),
+        'rho': np.where(live, rho, 0.0),
+    }
+
+def american_option(spot, strike, time_to_maturity, rate, volatility, is_call, steps=200):
+    # Binomial-tree price with early exercise; inputs broadcast like black_scholes. The lattice
+    # runs in kernels.lattice, compiled with numba when it is installed.
+    from kernels.lattice import american_binomial
+    S, K, T, r, sigma, is_call = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in
+                                                       (spot, strike, time_to_maturity, rate, volatility, is_call)))
+    live = (T > 0) & (sigma > 0)
+    intrinsic = np.where(is_call != 0, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    price = intrinsic.copy()
+    if live.any():
+        price[live] = american_binomial(S[live], K[live], T[live], r[live], sigma[live], is_call[live] != 0, int(steps))
+    return price
+
+def option_symbol(underlying, expiration_date, option_type, strike_price):
+    # OCC-style contract identifier, e.g. AAPL250117C00150000
+    flag = 'C' if option_type.lower() == 'call' else 'P'
+    return f"{underlying}{expiration_date.strftime('%y%m%d')}{flag}{int(round(strike_price * 1000)):08d}"
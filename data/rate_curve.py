@@ -0,0 +1,138 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Yahoo Finance treasury yield tickers and their maturities in years
+TREASURY_TENORS = {'^IRX': 0.25, '^FVX': 5.0, '^TNX': 10.0, '^TYX': 30.0}
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).normalize().date(), 'D')
+
+class RateCurve:
+    # Zero rates by observation date (rows) and maturity in years (columns). Rates are linear
+    # in maturity between tenors and flat beyond the shortest and longest ones.
+
+    def __init__(self, dates, tenors, rates):
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.tenors = np.asarray(tenors, dtype=float)
+        self.rates = np.asarray(rates, dtype=float).reshape(len(self.dates), len(self.tenors))
+        if len(self.dates) == 0 or len(self.tenors) == 0:
+            raise ValueError("Rate curve needs at least one date and one tenor")
+        if np.any(np.diff(self.dates).astype(int) <= 0) or np.any(np.diff(self.tenors) <= 0):
+            raise ValueError("Rate curve dates and tenors must be strictly increasing")
+
+    @classmethod
+    def flat(cls, rate, as_of='1900-01-01'):
+        return cls([_day(as_of)], [1.0], [[rate]])
+
+    @classmethod
+    def from_frame(cls, frame):
+        # frame: index of dates, one column per maturity in years, rates as decimals.
+        # Missing quotes carry forward in time, then fill across maturities.
+        frame = frame.copy()
+        frame.index = pd.to_datetime(frame.index).normalize()
+        frame.columns = frame.columns.astype(float)
+        frame = frame.sort_index().sort_index(axis=1)
+        frame = frame[~frame.index.duplicated(keep='last')].ffill()
+        frame = frame.interpolate(axis=1, limit_direction='both').dropna(how='all')
+        return cls(frame.index.to_numpy(dtype='datetime64[D]'), frame.columns.to_numpy(), frame.to_numpy())
+
+    def to_frame(self):
+        return pd.DataFrame(self.rates, index=pd.DatetimeIndex(self.dates.astype('datetime64[ns]'), name='date'),
+                            columns=self.tenors)
+
+    @classmethod
+    def read_csv(cls, path):
+        # Local curve file: a date column, then one column per maturity in years
+        return cls.from_frame(pd.read_csv(path, index_col=0, parse_dates=True))
+
+    def to_csv(self, path):
+        self.to_frame().to_csv(path)
+        return path
+
+    def _rows(self, as_of):
+        if as_of is None:
+            return len(self.dates) - 1
+        days = np.asarray(pd.to_datetime(as_of).normalize(), dtype='datetime64[D]')
+        rows = np.searchsorted(self.dates, days, 'right') - 1
+        if np.any(rows < 0):
+            raise ValueError(f"No rate curve on or before {np.min(days)}")
+        return rows
+
+    def rate(self, maturity, as_of=None):
+        # maturity and as_of broadcast against each other, so a whole chain (or a whole
+        # backtest's bar dates) is one call
+        maturity = np.asarray(maturity, dtype=float)
+        rows = self._rows(as_of)
+        tenors = self.tenors
+        if len(tenors) == 1:
+            result = self.rates[rows, 0] + np.zeros_like(maturity)
+        else:
+            years = np.clip(maturity, tenors[0], tenors[-1])
+            upper = np.clip(np.searchsorted(tenors, years), 1, len(tenors) - 1)
+            weight = (years - tenors[upper - 1]) / (tenors[upper] - tenors[upper - 1])
+            result = self.rates[rows, upper - 1] * (1 - weight) + self.rates[rows, upper] * weight
+        return float(result) if np.ndim(result) == 0 else result
+
+    def curve(self, as_of=None):
+        return pd.Series(self.rates[self._rows(as_of)], index=self.tenors)
+
+    def add_observation(self, date, rates):
+        # rates: {maturity: rate} for one date; other maturities carry forward
+        frame = self.to_frame()
+        frame.loc[pd.Timestamp(_day(date))] = pd.Series(rates, dtype=float)
+        updated = RateCurve.from_frame(frame)
+        self.dates, self.tenors, self.rates = updated.dates, updated.tenors, updated.rates
+        return self
+
+def _download_curve():
+    from data.download_data import load_treasury_curve
+    return load_treasury_curve()
+
+class RateCurveCache:
+    # Holds the current curve for ttl seconds. path reads a local curve file instead of
+    # downloading. A failed refresh keeps the last curve; with none, fallback_rate is flat.
+
+    def __init__(self, loader=None, ttl=3600.0, path=None, fallback_rate=0.05):
+        if loader is None:
+            loader = (lambda: RateCurve.read_csv(path)) if path is not None else _download_curve
+        self.loader = loader
+        self.ttl = ttl
+        self.fallback_rate = fallback_rate
+        self._curve = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def curve(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at >= self.ttl:
+                try:
+                    self._curve = self.loader()
+                except Exception as e:
+                    if self._curve is None:
+                        print(f"Warning: rate curve unavailable ({e}). Using flat {self.fallback_rate:.2%}")
+                        self._curve = RateCurve.flat(self.fallback_rate)
+                    else:
+                        print(f"Warning: rate curve refresh failed ({e}). Keeping the previous curve")
+                self._loaded_at = now
+            return self._curve
+
+    def rate(self, maturity, as_of=None):
+        return self.curve().rate(maturity, as_of)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+_default_cache = RateCurveCache()
+
+def default_cache():
+    return _default_cache
+
+def set_default_cache(cache):
+    # e.g. set_default_cache(RateCurveCache(path='curve.csv')) for offline runs
+    global _default_cache
+    _default_cache = cache
+    return cache
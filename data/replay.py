@@ -0,0 +1,125 @@
+import heapq
+from abc import ABC, abstractmethod
+from operator import itemgetter
+import pandas as pd
+import numpy as np
+
+# Raw binary tick records: int64 epoch nanoseconds, float64 price, float64 size
+TICK_DTYPE = np.dtype([('timestamp', '<i8'), ('price', '<f8'), ('size', '<f8')])
+
+def write_binary_ticks(path, ticks):
+    # ticks: DataFrame indexed by timestamp with 'price' and optional 'size' columns
+    records = np.empty(len(ticks), dtype=TICK_DTYPE)
+    records['timestamp'] = pd.DatetimeIndex(ticks.index).asi8
+    records['price'] = ticks['price'].to_numpy(dtype=float)
+    records['size'] = ticks['size'].to_numpy(dtype=float) if 'size' in ticks.columns else 0.0
+    records.tofile(path)
+    return len(records)
+
+class TickReader(ABC):
+
+    def __init__(self, path, symbol, chunksize=100000):
+        if chunksize <= 0:
+            raise ValueError(f"Chunk size must be positive, got {chunksize}")
+        self.path = path
+        self.symbol = symbol
+        self.chunksize = chunksize
+        self.chunks_read = 0
+
+    @abstractmethod
+    def iter_chunks(self):
+        # Yields (timestamps_ns, prices, sizes) arrays one chunk at a time
+        ...
+
+    def iter_events(self):
+        # Only one chunk per stream is materialized at a time
+        symbol = self.symbol
+        for timestamps, prices, sizes in self.iter_chunks():
+            self.chunks_read += 1
+            for event in zip(timestamps.tolist(), [symbol] * len(timestamps), prices.tolist(), sizes.tolist()):
+                yield event
+
+class CsvTickReader(TickReader):
+
+    def __init__(self, path, symbol, chunksize=100000, timestamp_col='timestamp', price_col='price', size_col='size'):
+        super().__init__(path, symbol, chunksize)
+        self.timestamp_col = timestamp_col
+        self.price_col = price_col
+        self.size_col = size_col
+
+    def iter_chunks(self):
+        columns = [self.timestamp_col, self.price_col, self.size_col]
+        reader = pd.read_csv(self.path, chunksize=self.chunksize,
+                             usecols=lambda column: column in columns)
+        for chunk in reader:
+            raw = chunk[self.timestamp_col]
+            if pd.api.types.is_numeric_dtype(raw):
+                timestamps = raw.to_numpy(dtype='int64')
+            else:
+                timestamps = pd.DatetimeIndex(pd.to_datetime(raw)).asi8
+            prices = chunk[self.price_col].to_numpy(dtype=float)
+            if self.size_col in chunk.columns:
+                sizes = chunk[self.size_col].to_numpy(dtype=float)
+            else:
+                sizes = np.zeros(len(chunk))
+            yield timestamps, prices, sizes
+
+class BinaryTickReader(TickReader):
+
+    def iter_chunks(self):
+        records = np.memmap(self.path, dtype=TICK_DTYPE, mode='r')
+        for start in range(0, len(records), self.chunksize):
+            chunk = np.array(records[start:start + self.chunksize])
+            yield chunk['timestamp'], chunk['price'], chunk['size']
+
+def merge_streams(readers):
+    # k-way heap merge of already time-sorted streams; ties keep reader order
+    return heapq.merge(*(reader.iter_events() for reader in readers), key=itemgetter(0))
+
+class ReplayEngine:
+
+    def __init__(self, readers, batch_size=10000):
+        if batch_size <= 0:
+            raise ValueError(f"Batch size must be positive, got {batch_size}")
+        self.readers = readers
+        self.batch_size = batch_size
+
+    def iter_batches(self):
+        batch = []
+        for event in merge_streams(self.readers):
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def summarize_batch(batch):
+        # Last price and total size per symbol, plus the batch's closing timestamp
+        prices = {}
+        volumes = {}
+        for _, symbol, price, size in batch:
+            prices[symbol] = price
+            volumes[symbol] = volumes.get(symbol, 0.0) + size
+        return prices, volumes, pd.Timestamp(batch[-1][0])
+
+    def run(self, portfolio, on_batch=None, mark_every=1):
+        # on_batch(batch, prices, timestamp, portfolio) lets a strategy place orders per batch.
+        # Pending orders are checked against each symbol's last print in the batch, so
+        # batch_size sets the trade-off between fill fidelity and per-batch overhead.
+        batches = 0
+        events = 0
+        last_prices = {}
+        for batch in self.iter_batches():
+            prices, volumes, timestamp = self.summarize_batch(batch)
+            last_prices.update(prices)
+            if on_batch is not None:
+                on_batch(batch, prices, timestamp, portfolio)
+            portfolio.check_pending_orders(prices, volume_data=volumes, timestamp=timestamp)
+            batches += 1
+            events += len(batch)
+            if batches % mark_every == 0:
+                # Symbols that did not trade in this batch are marked at their last print
+                portfolio.update_portfolio_value(last_prices, timestamp)
+        return {'batches': batches, 'events': events}
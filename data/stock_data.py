@@ -1,4 +1,3 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass, field
@@ -11,10 +10,13 @@ class StockData(BaseData):
 
     def __post_init__(self):
         super().__post_init__()
+        self._pending = []
+        self._return_sums = None
         if self.log_returns.empty and not self.prices.empty:
             self.calculate_log_returns()
     
     def calculate_log_returns(self):
+        self._flush()
         if self.prices.empty or 'Close' not in self.prices.columns:
             raise ValueError("Prices data is missing or invalid")
         close_prices = self.prices['Close']
@@ -22,6 +24,55 @@ class StockData(BaseData):
 
         if not self.log_returns.empty:
             self.volatility = self.log_returns.std() * np.sqrt(252)
+        self._return_sums = None
+
+    def append_bar(self, timestamp, bar):
+        # Appends one OHLCV bar and updates volatility from running sums. Bars are buffered and
+        # only concatenated onto prices and log_returns when those are next read, so a stream
+        # of appends costs O(1) each instead of copying both frames per bar.
+        if 'Close' not in bar:
+            raise ValueError("Bar must contain a 'Close' price")
+        previous_close = self._pending[-1][1]['Close'] if self._pending else self.prices['Close'].iloc[-1]
+        log_return = float(np.log(bar['Close'] / previous_close))
+        self._pending.append((timestamp, bar, log_return))
+
+        if self._return_sums is None:
+            values = self.log_returns.to_numpy(dtype=float)
+            self._return_sums = [len(values), values.sum(), (values ** 2).sum()]
+        self._return_sums[0] += 1
+        self._return_sums[1] += log_return
+        self._return_sums[2] += log_return ** 2
+
+        n, total, total_sq = self._return_sums
+        if n > 1:
+            variance = max((total_sq - total ** 2 / n) / (n - 1), 0.0)
+            self.volatility = np.sqrt(variance) * np.sqrt(252)
+
+    def _flush(self):
+        # Materializes buffered bars with one concat per frame
+        pending = getattr(self, '_pending', None)
+        if not pending:
+            return
+        index = pd.Index([timestamp for timestamp, _, _ in pending], name=self.prices.index.name)
+        bars = pd.DataFrame([bar for _, bar, _ in pending], index=index).reindex(columns=self.prices.columns)
+        returns = pd.Series([log_return for _, _, log_return in pending], index=index, name=self.log_returns.name)
+        self.prices = pd.concat([self.prices, bars])
+        self.log_returns = pd.concat([self.log_returns, returns])
+        self._pending = []
+
+    @property
+    def last_timestamp(self):
+        # Timestamp of the latest bar, without materializing buffered appends
+        return self._pending[-1][0] if self._pending else self.prices.index[-1]
+
+    @property
+    def get_prices(self):
+        self._flush()
+        return self.prices
+
+    @property
+    def get_current_price(self):
+        return self._pending[-1][1]['Close'] if self._pending else self.prices["Close"].iloc[-1]
 
     @property
     def get_volatility(self):
@@ -29,6 +80,7 @@ class StockData(BaseData):
     
     @property
     def get_log_returns(self):
+        self._flush()
         return self.log_returns
 
     @property
@@ -36,6 +88,7 @@ class StockData(BaseData):
      return "StockType"
 
     def get_prices_stats(self):
+        self._flush()
         close_prices = self.prices["Close"]
         returns = self.log_returns
 
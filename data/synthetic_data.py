@@ -0,0 +1,218 @@
+import zlib
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from data.chain_store import nearest_expiration, synthetic_chain_snapshot, _day_str
+from data.option_pricer import option_symbol
+from data.rate_curve import RateCurve
+
+# Column order of yf.download() once load_ticker_data has dropped the ticker level
+PRICE_COLUMNS = ['Close', 'High', 'Low', 'Open', 'Volume']
+PROCESSES = ('gbm', 'jump', 'regime')
+TRADING_DAYS = 252
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+# Daily series start here whatever range is asked for, so overlapping requests for a ticker agree
+EPOCH = pd.Timestamp('2000-01-03')
+# (annual drift, annual volatility) of a calm and a stressed regime, and per-bar switching odds
+DEFAULT_REGIMES = ((0.10, 0.15), (-0.20, 0.45))
+DEFAULT_TRANSITION = ((0.99, 0.01), (0.04, 0.96))
+
+def ticker_seed(ticker, seed=0):
+    # Stable across processes, unlike hash()
+    return zlib.crc32(str(ticker).encode()) + seed * 2 ** 32
+
+def _bar_step(freq):
+    # None for daily (business day) bars, else the intraday bar length
+    offset = to_offset(freq)
+    if offset.name in ('B', 'D'):
+        return None
+    step = pd.Timedelta(offset)
+    if step > pd.Timedelta(minutes=SESSION_MINUTES):
+        raise ValueError(f"Bars must be daily or fit in one {SESSION_MINUTES} minute session, got {freq}")
+    return step
+
+def bar_index(start_date, end_date=None, n_bars=None, freq='1d'):
+    # Business days, or intraday bars through each 09:30-16:00 session, from start_date until
+    # end_date (exclusive, like yf.download) or for n_bars bars
+    if (end_date is None) == (n_bars is None):
+        raise ValueError("Pass exactly one of end_date and n_bars")
+    start = pd.Timestamp(start_date)
+    step = _bar_step(freq)
+    if step is None:
+        if n_bars is not None:
+            return pd.bdate_range(start, periods=n_bars, name='Date')
+        return pd.bdate_range(start, pd.Timestamp(end_date) - pd.Timedelta(days=1), name='Date')
+
+    per_day = SESSION_MINUTES * pd.Timedelta(minutes=1) // step
+    if n_bars is not None:
+        days = pd.bdate_range(start.normalize(), periods=-(-n_bars // per_day))
+    else:
+        days = pd.bdate_range(start.normalize(), pd.Timestamp(end_date) - pd.Timedelta(days=1))
+    stamps = (days.to_numpy()[:, None] + SESSION_OPEN.to_timedelta64() +
+              np.arange(per_day) * step.to_timedelta64()).ravel()
+    stamps = stamps[stamps >= start.to_datetime64()]
+    if end_date is not None:
+        stamps = stamps[stamps < pd.Timestamp(end_date).to_datetime64()]
+    return pd.DatetimeIndex(stamps[:n_bars], name='Datetime')
+
+def _streams(seed, count, offset=0):
+    children = np.random.SeedSequence(seed).spawn(offset + count)[offset:]
+    return [np.random.default_rng(child) for child in children]
+
+def _regime_path(n_bars, transition, rng):
+    # Markov chain of regimes sampled one run at a time: holding times are geometric, so the
+    # loop runs once per regime switch rather than once per bar
+    transition = np.asarray(transition, dtype=float)
+    path = np.empty(n_bars, dtype=np.int64)
+    state, filled = 0, 0
+    while filled < n_bars:
+        stay = transition[state, state]
+        length = rng.geometric(1.0 - stay) if stay < 1 else n_bars
+        path[filled:filled + length] = state
+        filled += length
+        leave = transition[state].copy()
+        leave[state] = 0.0
+        if leave.sum() > 0:
+            state = int(rng.choice(len(leave), p=leave / leave.sum()))
+    return path
+
+def _correlation_factor(correlation, n_tickers):
+    matrix = np.asarray(correlation, dtype=float)
+    if matrix.ndim == 0:
+        matrix = np.full((n_tickers, n_tickers), float(matrix))
+        np.fill_diagonal(matrix, 1.0)
+    if matrix.shape != (n_tickers, n_tickers):
+        raise ValueError(f"Correlation must be a number or a {n_tickers}x{n_tickers} matrix, got shape {matrix.shape}")
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlation matrix must be positive definite")
+
+def simulate_log_returns(n_bars, n_tickers=1, process='gbm', drift=0.05, volatility=0.2, dt=1 / TRADING_DAYS,
+                         correlation=0.0, jump_intensity=5.0, jump_mean=-0.02, jump_std=0.05,
+                         regimes=DEFAULT_REGIMES, transition=DEFAULT_TRANSITION, seed=0):
+    # (n_bars, n_tickers) log returns and the per-bar volatility behind them. drift, volatility
+    # and jump_intensity are annual; drift and volatility may be one value per ticker.
+    #   gbm:    lognormal steps with correlated shocks
+    #   jump:   gbm plus compound Poisson jumps with normal log sizes (Merton), drift compensated
+    #           so the expected growth rate is still drift
+    #   regime: drift and volatility follow a Markov chain over regimes shared by all tickers
+    if process not in PROCESSES:
+        raise ValueError(f"Unknown process {process!r}, expected one of {PROCESSES}")
+    # One stream per component, each drawn bar by bar, so a longer series extends a shorter
+    # one with the same seed instead of replacing it
+    shock_rng, regime_rng, count_rng, size_rng = _streams(seed, 4)
+    shocks = shock_rng.standard_normal((n_bars, n_tickers))
+    if n_tickers > 1:
+        shocks = shocks @ _correlation_factor(correlation, n_tickers).T
+
+    if process == 'regime':
+        regimes = np.asarray(regimes, dtype=float)
+        path = _regime_path(n_bars, transition, regime_rng)
+        drift = regimes[path, 0][:, None]
+        volatility = regimes[path, 1][:, None]
+    else:
+        drift = np.asarray(drift, dtype=float)
+        volatility = np.asarray(volatility, dtype=float)
+
+    log_returns = (drift - 0.5 * volatility ** 2) * dt + volatility * np.sqrt(dt) * shocks
+    if process == 'jump':
+        counts = count_rng.poisson(jump_intensity * dt, (n_bars, n_tickers))
+        jumps = counts * jump_mean + np.sqrt(counts) * jump_std * size_rng.standard_normal((n_bars, n_tickers))
+        compensator = jump_intensity * (np.exp(jump_mean + 0.5 * jump_std ** 2) - 1) * dt
+        log_returns = log_returns + jumps - compensator
+    bar_volatility = np.broadcast_to(volatility * np.sqrt(dt), (n_bars, n_tickers))
+    return log_returns, bar_volatility
+
+def _ohlcv(log_returns, bar_volatility, start_price, volume, seed):
+    # Bars around each close path: opens gap a little from the previous close, highs and
+    # lows extend past the body, and volume rises with the size of the move
+    n_bars, n_tickers = log_returns.shape
+    start_price = np.broadcast_to(np.asarray(start_price, dtype=float), (n_tickers,))
+    close = start_price * np.exp(np.cumsum(log_returns, axis=0))
+    previous = np.vstack([start_price[None, :], close[:-1]])
+    bar_rng, volume_rng = _streams(seed, 2, offset=4)
+    noise = bar_rng.standard_normal((n_bars, n_tickers, 3))
+    open_ = previous * np.exp(0.1 * bar_volatility * noise[..., 0])
+    high = np.maximum(open_, close) * np.exp(0.5 * bar_volatility * np.abs(noise[..., 1]))
+    low = np.minimum(open_, close) * np.exp(-0.5 * bar_volatility * np.abs(noise[..., 2]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        activity = 1.0 + np.nan_to_num(np.abs(log_returns) / bar_volatility)
+    shares = np.asarray(volume, dtype=float) * activity * volume_rng.lognormal(0.0, 0.3, (n_bars, n_tickers))
+    return close, high, low, open_, np.round(shares).astype(np.int64)
+
+def generate_panel(tickers, start_date='2020-01-01', end_date=None, n_bars=None, freq='1d', process='gbm',
+                   start_price=100.0, drift=0.05, volatility=0.2, correlation=0.0, volume=1_000_000, seed=0,
+                   **process_options):
+    # {ticker: OHLCV DataFrame} on one shared calendar, each frame laid out like
+    # download_data.load_ticker_data(). start_price and volume may be per ticker.
+    tickers = list(tickers)
+    if end_date is None and n_bars is None:
+        end_date = datetime.now()
+    index = bar_index(start_date, end_date, n_bars, freq)
+    step = _bar_step(freq)
+    dt = 1 / TRADING_DAYS if step is None else step / pd.Timedelta(minutes=SESSION_MINUTES) / TRADING_DAYS
+    log_returns, bar_volatility = simulate_log_returns(len(index), len(tickers), process, drift, volatility, dt,
+                                                       correlation, seed=seed, **process_options)
+    columns = _ohlcv(log_returns, bar_volatility, start_price, volume, seed)
+    frames = {}
+    for position, ticker in enumerate(tickers):
+        frame = pd.DataFrame({name: values[:, position] for name, values in zip(PRICE_COLUMNS, columns)}, index=index)
+        frame.columns.name = 'Price'
+        frames[ticker] = frame
+    return frames
+
+def generate_prices(start_date='2020-01-01', end_date=None, n_bars=None, freq='1d', process='gbm', start_price=100.0,
+                    drift=0.05, volatility=0.2, volume=1_000_000, seed=0, **process_options):
+    return generate_panel(['SYN'], start_date, end_date, n_bars, freq, process, start_price, drift, volatility,
+                          volume=volume, seed=seed, **process_options)['SYN']
+
+def load_ticker_data(ticker, start_date, end_date, freq='1d', process='gbm', seed=0, **options):
+    # Drop-in for download_data.load_ticker_data. Each ticker has its own seeded path and
+    # daily paths start at EPOCH, so any two ranges of one ticker agree where they overlap.
+    start = pd.Timestamp(start_date)
+    anchor = min(EPOCH, start) if _bar_step(freq) is None else start
+    prices = generate_prices(anchor, end_date, freq=freq, process=process, seed=ticker_seed(ticker, seed), **options)
+    prices = prices[prices.index >= start]
+    if prices.empty:
+        raise ValueError(f"No data found for ticker: {ticker}")
+    return prices
+
+def listed_expirations(as_of, months=12, weeks=4):
+    # The next few weekly (Friday) expiries and the monthly ones (third Friday) for a year
+    as_of = pd.Timestamp(as_of).normalize()
+    weekly = pd.date_range(as_of + pd.Timedelta(days=1), periods=weeks, freq='W-FRI')
+    monthly = pd.date_range(as_of + pd.Timedelta(days=1), periods=months, freq='WOM-3FRI')
+    return sorted({_day_str(np.datetime64(day.date(), 'D')) for day in weekly.union(monthly)})
+
+def load_strike_data(ticker_symbol, expiration_date=None, as_of=None, spot=None, volatility=0.25, rate=0.04, seed=0):
+    # Drop-in for download_data.load_strike_data: Black-Scholes priced chains around the
+    # synthetic close on as_of (default today), with yfinance's contractSymbol and inTheMoney
+    as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+    if spot is None:
+        spot = float(load_ticker_data(ticker_symbol, as_of - timedelta(days=10), as_of + timedelta(days=1),
+                                      seed=seed)['Close'].iloc[-1])
+    expirations = listed_expirations(as_of)
+    expiration = nearest_expiration(expirations, expiration_date) if expiration_date is not None else expirations[0]
+    chains = synthetic_chain_snapshot(spot, as_of, [expiration], volatility=volatility, rate=rate,
+                                      seed=ticker_seed(ticker_symbol, seed))
+    expiry = pd.Timestamp(expiration)
+    sides = {}
+    for side, option_type in (('calls', 'call'), ('puts', 'put')):
+        frame = chains[np.datetime64(expiration)][side]
+        in_the_money = frame['strike'] < spot if option_type == 'call' else frame['strike'] > spot
+        frame.insert(0, 'contractSymbol', [option_symbol(ticker_symbol, expiry, option_type, strike)
+                                           for strike in frame['strike']])
+        frame['inTheMoney'] = in_the_money
+        sides[side] = frame
+    return {
+        'calls': sides['calls'],
+        'puts': sides['puts'],
+        'expiration': expiration,
+        'expiration_dates': expiration
+    }
+
+def load_rate_curve(rate=0.04):
+    return RateCurve.flat(rate)
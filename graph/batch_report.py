@@ -0,0 +1,124 @@
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from graph.graph_model import chart_features
+
+STAT_COLUMNS = ['current_price', 'price_mean', 'price_std', 'return_mean', 'return_std', 'volatility', 'data_points']
+
+def build_panels(data):
+    # Close and log-return panels (dates x tickers) from a list of StockData objects,
+    # a dict of them, or a DataFrame of closes with one column per ticker
+    if isinstance(data, pd.DataFrame):
+        close = data.sort_index()
+        if close.notna().all().all():
+            return close, np.log(close / close.shift(1)).iloc[1:]
+        # Each ticker's returns skip its own missing bars, as StockData does
+        returns = pd.concat({ticker: np.log(column / column.shift(1)).dropna()
+                             for ticker, column in ((ticker, close[ticker].dropna()) for ticker in close.columns)}, axis=1)
+        return close, returns
+    if isinstance(data, dict):
+        data = list(data.values())
+    close = pd.concat({item.get_ticker: item.get_prices['Close'] for item in data}, axis=1).sort_index()
+    returns = pd.concat({item.get_ticker: item.get_log_returns for item in data}, axis=1).sort_index()
+    return close, returns
+
+def panel_features(returns, window=30):
+    # One column-wise pass over the whole panel when tickers share a calendar; otherwise each
+    # ticker's rolling window runs over its own bars only
+    if not returns.isna().any().any():
+        features = chart_features(returns, window)
+        return {ticker: {name: frame[ticker] for name, frame in features.items()} for ticker in returns.columns}
+    return {ticker: chart_features(returns[ticker].dropna(), window) for ticker in returns.columns}
+
+def panel_statistics(close, returns):
+    # Same fields as StockData.get_prices_stats(), for every ticker at once
+    return pd.DataFrame({
+        'current_price': close.ffill().iloc[-1],
+        'price_mean': close.mean(),
+        'price_std': close.std(),
+        'return_mean': returns.mean(),
+        'return_std': returns.std(),
+        'volatility': returns.std() * np.sqrt(252),
+        'data_points': close.count(),
+    })[STAT_COLUMNS]
+
+def _render_dashboard(task):
+    # Runs in a worker process; GraphModel reuses its figure across the tickers a worker renders
+    from data.stock_data import StockData
+    from graph.graph_model import GraphModel
+    ticker, close, features, path, dpi = task
+    start = time.perf_counter()
+    prices = close.to_frame('Close')
+    returns = features['returns']
+    stock = StockData(ticker=ticker, start_date=prices.index[0], end_date=prices.index[-1], prices=prices,
+                      log_returns=returns, volatility=returns.std() * np.sqrt(252))
+    GraphModel(stock, dpi=dpi, features=features).plot_summary_dashboard(save_path=path)
+    return ticker, path, time.perf_counter() - start
+
+def _format_stat(name, value):
+    if name in ('current_price', 'price_mean', 'price_std'):
+        return f"${value:,.2f}"
+    if name == 'volatility':
+        return f"{value:.2%}"
+    if name in ('return_mean', 'return_std'):
+        return f"{value:.4f}"
+    return f"{int(value)}"
+
+def write_index(path, statistics, images, timings):
+    rows = []
+    for ticker, stats in statistics.iterrows():
+        image = os.path.basename(images[ticker])
+        cells = ''.join(f"<td>{_format_stat(name, stats[name])}</td>" for name in STAT_COLUMNS)
+        rows.append(f'<tr><td><a href="{html.escape(image)}">{html.escape(str(ticker))}</a></td>{cells}</tr>')
+    header = ''.join(f"<th>{name}</th>" for name in ['ticker'] + STAT_COLUMNS)
+    figures = ''.join(
+        f'<figure><img src="{html.escape(os.path.basename(images[ticker]))}" loading="lazy" width="600">'
+        f'<figcaption>{html.escape(str(ticker))}</figcaption></figure>'
+        for ticker in statistics.index)
+    page = (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Ticker Reports</title></head><body>\n"
+        f"<h1>Ticker Reports</h1>\n<p>{len(images)} tickers in {timings['wall_seconds']:.2f}s "
+        f"({timings['seconds_per_ticker']:.3f}s per ticker, {timings['workers']} workers)</p>\n"
+        f"<table border=\"1\" cellspacing=\"0\" cellpadding=\"4\"><tr>{header}</tr>\n" + '\n'.join(rows) +
+        f"\n</table>\n{figures}\n</body></html>\n"
+    )
+    with open(path, 'w') as handle:
+        handle.write(page)
+    return path
+
+def generate_reports(data, output_dir, max_workers=None, image_format='png', window=30, dpi=100):
+    # Renders a summary dashboard per ticker in a process pool plus an index.html with
+    # every ticker's statistics. max_workers=1 renders in this process.
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    close, returns = build_panels(data)
+    features = panel_features(returns, window)
+    statistics = panel_statistics(close, returns)
+
+    tasks = [(ticker, close[ticker].dropna(), features[ticker],
+              os.path.join(output_dir, f"{ticker}_dashboard.{image_format}"), dpi)
+             for ticker in close.columns]
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_render_dashboard(task) for task in tasks]
+    else:
+        # Chunks amortize the pickling round trips over several tickers per message
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_dashboard, tasks, chunksize=chunksize))
+
+    images = {ticker: path for ticker, path, _ in results}
+    render_seconds = {ticker: seconds for ticker, _, seconds in results}
+    wall_seconds = time.perf_counter() - start
+    timings = {
+        'wall_seconds': wall_seconds,
+        'seconds_per_ticker': wall_seconds / len(tasks) if tasks else 0.0,
+        'render_seconds': render_seconds,
+        'workers': workers,
+    }
+    index = write_index(os.path.join(output_dir, 'index.html'), statistics, images, timings)
+    timings['wall_seconds'] = time.perf_counter() - start
+    return {'index': index, 'images': images, 'statistics': statistics, 'timings': timings}
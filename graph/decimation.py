@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+DECIMATION_METHODS = ('minmax', 'lttb')
+
+def _as_float(x):
+    x = pd.Index(x) if not isinstance(x, (pd.Index, np.ndarray)) else x
+    if isinstance(x, pd.DatetimeIndex):
+        return x.asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+def minmax_indices(x, y, n_bins):
+    # Splits the x range into n_bins equal-width bins (one per pixel column) and keeps the
+    # first, lowest, highest and last sample of each, so spikes survive decimation.
+    # x must be sorted; NaNs in y only win a bin that holds nothing else.
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * n_bins + 2:
+        return np.arange(n)
+    x = _as_float(x)
+    span = x[-1] - x[0]
+    if span > 0:
+        bins = np.minimum(((x - x[0]) / span * n_bins).astype(np.int64), n_bins - 1)
+    else:
+        bins = np.zeros(n, dtype=np.int64)
+    starts = np.flatnonzero(np.diff(bins, prepend=-1))
+    ends = np.append(starts[1:], n) - 1
+    group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    nan = np.isnan(y)
+    low = np.where(nan, np.inf, y)
+    high = np.where(nan, -np.inf, y)
+    minimum = np.flatnonzero(low == np.minimum.reduceat(low, starts)[group])
+    maximum = np.flatnonzero(high == np.maximum.reduceat(high, starts)[group])
+    # First match per bin; matches are sorted by position and therefore by bin
+    minimum = minimum[np.flatnonzero(np.diff(group[minimum], prepend=-1))]
+    maximum = maximum[np.flatnonzero(np.diff(group[maximum], prepend=-1))]
+    return np.unique(np.concatenate([starts, minimum, maximum, ends]))
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: keeps the point of each bucket that forms the largest
+    # triangle with the previous pick and the next bucket's mean
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y_filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y_filled[stop:next_stop].mean()
+        xs, ys = x[start:stop], y_filled[start:stop]
+        area = np.abs((x[previous] - next_x) * (ys - y_filled[previous])
+                      - (x[previous] - xs) * (next_y - y_filled[previous]))
+        previous = start + int(np.argmax(area))
+        picks[bucket + 1] = previous
+    return picks
+
+def decimate(series, max_points, method='minmax'):
+    # Returns a subset of a time-indexed Series with at most about max_points samples
+    if method is None or max_points is None or len(series) <= max_points:
+        return series
+    if method == 'minmax':
+        indices = minmax_indices(series.index, series.to_numpy(dtype=float), max(max_points // 4, 1))
+    elif method == 'lttb':
+        indices = lttb_indices(series.index, series.to_numpy(dtype=float), max_points)
+    else:
+        raise ValueError(f"Unknown decimation method {method!r}, expected one of {DECIMATION_METHODS}")
+    return series.iloc[indices]
@@ -1,57 +1,143 @@
-import matplotlib.pyplot as plt
+import threading
+import weakref
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from graph.decimation import decimate
+
+# Headless figures are reused per thread, keyed by chart and size, so batch rendering
+# pays for figure and axes construction once instead of once per ticker
+_figure_cache = threading.local()
+# Reused figures keep the subplot spacing from their first tight_layout; it is the
+# most expensive step of a render because it lays out every tick label
+_laid_out = weakref.WeakSet()
+
+def _reused_figure(key, figsize, layout):
+        cache = getattr(_figure_cache, 'figures', None)
+        if cache is None:
+                cache = _figure_cache.figures = {}
+        entry = cache.get((key, figsize))
+        if entry is None:
+                # matplotlib is imported on the first render; pyplot only for on-screen charts
+                from matplotlib.figure import Figure
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                fig = Figure(figsize=figsize)
+                FigureCanvasAgg(fig)
+                entry = cache[(key, figsize)] = (fig, layout(fig))
+        else:
+                for ax in entry[0].axes:
+                        ax.clear()
+        return entry
+
+def clear_figure_cache():
+        _figure_cache.figures = {}
+
+def chart_features(returns, window=30):
+        # Series derived from log returns that several charts share; works on a single
+        # Series or column-wise on a DataFrame panel of tickers
+        return {
+                'returns': returns,
+                'rolling_volatility': returns.rolling(window=window).std() * np.sqrt(252),
+                'cumulative_returns': (1 + returns).cumprod() - 1,
+        }
 
 class GraphModel:
         
-        def __init__(self, config_data):
+        def __init__(self, config_data, max_points=None, decimation='minmax', dpi=100, features=None):
+                # max_points=None decimates to the figure's pixel width; decimation=None plots every point.
+                # features: precomputed chart_features() output, e.g. one ticker's slice of a panel
                 self.config_data = config_data
+                self.max_points = max_points
+                self.decimation = decimation
+                self.dpi = dpi
+                self._features = features
+
+        def get_features(self):
+                if self._features is None:
+                        self._features = chart_features(self.config_data.get_log_returns)
+                return self._features
+
+        def _decimate(self, series, figsize):
+                max_points = self.max_points
+                if max_points is None:
+                        per_pixel = 4 if self.decimation == 'minmax' else 1
+                        max_points = int(figsize[0] * self.dpi) * per_pixel
+                return decimate(series.dropna(), max_points, self.decimation)
+
+        def _figure(self, key, figsize, save_path, layout):
+                # save_path renders off-screen on the Agg canvas; otherwise a pyplot window is used
+                if save_path is None:
+                        import matplotlib.pyplot as plt
+                        fig = plt.figure(figsize=figsize)
+                        return fig, layout(fig)
+                return _reused_figure(key, figsize, layout)
+
+        def _finish(self, fig, save_path):
+                if fig not in _laid_out:
+                        fig.tight_layout()
+                        if save_path is not None:
+                                # tight_layout leaves a placeholder layout engine that makes
+                                # savefig draw the whole figure twice
+                                fig.set_layout_engine(None)
+                                _laid_out.add(fig)
+                if save_path is None:
+                        import matplotlib.pyplot as plt
+                        plt.show()
+                        return None
+                # The format follows the extension (.png, .svg, .pdf); PNGs trade a little
+                # file size for much faster zlib compression
+                options = {'pil_kwargs': {'compress_level': 1}} if str(save_path).lower().endswith('.png') else {}
+                fig.savefig(save_path, dpi=self.dpi, **options)
+                return save_path
         
-        def plot_price_chart(self, figsize=(12, 6)):
-                plt.figure(figsize=figsize)
-                prices = self.config_data.get_prices
-                
-                plt.plot(prices.index, prices['Close'], linewidth=1.5, color='blue', label='Close Price')
-                plt.title(f'{self.config_data.get_ticker} Price Chart', fontsize=14, fontweight='bold')
-                plt.xlabel('Date', fontsize=12)
-                plt.ylabel('Price ($)', fontsize=12)
-                plt.grid(True, alpha=0.3)
-                plt.legend()
-                plt.tight_layout()
-                plt.show()
+        def plot_price_chart(self, figsize=(12, 6), save_path=None):
+                fig, (ax,) = self._figure('price_chart', figsize, save_path, lambda fig: (fig.add_subplot(),))
+                close = self._decimate(self.config_data.get_prices['Close'], figsize)
+                
+                ax.plot(close.index, close, linewidth=1.5, color='blue', label='Close Price')
+                ax.set_title(f'{self.config_data.get_ticker} Price Chart', fontsize=14, fontweight='bold')
+                ax.set_xlabel('Date', fontsize=12)
+                ax.set_ylabel('Price ($)', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                ax.legend()
+                return self._finish(fig, save_path)
         
-        def plot_returns_distribution(self, figsize=(10, 6)):
-                plt.figure(figsize=figsize)
-                returns = self.config_data.get_log_returns
+        def plot_returns_distribution(self, figsize=(10, 6), save_path=None):
+                fig, (ax,) = self._figure('returns_distribution', figsize, save_path, lambda fig: (fig.add_subplot(),))
+                returns = self.get_features()['returns']
                 
-                plt.hist(returns, bins=50, alpha=0.7, color='skyblue', edgecolor='black')
-                plt.axvline(returns.mean(), color='red', linestyle='--', linewidth=2, 
+                ax.hist(returns, bins=50, alpha=0.7, color='skyblue', edgecolor='black')
+                ax.axvline(returns.mean(), color='red', linestyle='--', linewidth=2, 
                    label=f'Mean: {returns.mean():.4f}')
-                plt.axvline(returns.mean() + returns.std(), color='orange', linestyle='--', linewidth=1)
-                plt.axvline(returns.mean() - returns.std(), color='orange', linestyle='--', linewidth=1)
-                
-                plt.title(f'{self.config_data.get_ticker} Log Returns Distribution', fontsize=14, fontweight='bold')
-                plt.xlabel('Log Returns', fontsize=12)
-                plt.ylabel('Frequency', fontsize=12)
-                plt.grid(True, alpha=0.3)
-                plt.legend()
-                plt.tight_layout()
-                plt.show()
+                ax.axvline(returns.mean() + returns.std(), color='orange', linestyle='--', linewidth=1)
+                ax.axvline(returns.mean() - returns.std(), color='orange', linestyle='--', linewidth=1)
+                
+                ax.set_title(f'{self.config_data.get_ticker} Log Returns Distribution', fontsize=14, fontweight='bold')
+                ax.set_xlabel('Log Returns', fontsize=12)
+                ax.set_ylabel('Frequency', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                ax.legend()
+                return self._finish(fig, save_path)
         
-        def plot_volatility_analysis(self, figsize=(12, 8)):
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize)
-                
-                prices = self.config_data.get_prices
-                returns = self.config_data.get_log_returns
-                rolling_vol = returns.rolling(window=30).std() * np.sqrt(252)
-                
-                ax1.plot(prices.index, prices['Close'], color='blue', linewidth=1, label='Close Price')
+        def plot_volatility_analysis(self, figsize=(12, 8), save_path=None):
+                def layout(fig):
+                        ax1, ax2 = fig.subplots(2, 1)
+                        return ax1, ax1.twinx(), ax2
+                fig, (ax1, ax1_twin, ax2) = self._figure('volatility_analysis', figsize, save_path, layout)
+                
+                features = self.get_features()
+                close = self._decimate(self.config_data.get_prices['Close'], figsize)
+                rolling_vol = self._decimate(features['rolling_volatility'], figsize)
+                returns = self._decimate(features['returns'], figsize)
+                
+                ax1.plot(close.index, close, color='blue', linewidth=1, label='Close Price')
                 ax1.set_ylabel('Price ($)', color='blue', fontsize=12)
                 ax1.tick_params(axis='y', labelcolor='blue')
                 ax1.legend(loc='upper left')
                 
-                ax1_twin = ax1.twinx()
+                # Clearing a reused twin axis moves its ticks back to the left
+                ax1_twin.yaxis.tick_right()
+                ax1_twin.yaxis.set_label_position('right')
                 ax1_twin.plot(rolling_vol.index, rolling_vol, color='red', linewidth=1, label='30D Rolling Vol')
                 ax1_twin.set_ylabel('Volatility', color='red', fontsize=12)
                 ax1_twin.tick_params(axis='y', labelcolor='red')
@@ -65,65 +151,61 @@ class GraphModel:
                 ax2.set_title('Daily Log Returns', fontsize=12)
                 ax2.grid(True, alpha=0.3)
                 
-                plt.tight_layout()
-                plt.show()
+                return self._finish(fig, save_path)
         
-        def plot_cumulative_returns(self, figsize=(12, 6)):
-                plt.figure(figsize=figsize)
-                returns = self.config_data.get_log_returns
-                cumulative_returns = (1 + returns).cumprod() - 1
+        def plot_cumulative_returns(self, figsize=(12, 6), save_path=None):
+                fig, (ax,) = self._figure('cumulative_returns', figsize, save_path, lambda fig: (fig.add_subplot(),))
+                cumulative_returns = self._decimate(self.get_features()['cumulative_returns'], figsize)
                 
-                plt.plot(cumulative_returns.index, cumulative_returns * 100, 
+                ax.plot(cumulative_returns.index, cumulative_returns * 100, 
                                 linewidth=2, color='green', label='Cumulative Returns')
-                plt.axhline(y=0, color='black', linestyle='-', linewidth=1)
-                
-                plt.title(f'{self.config_data.get_ticker} Cumulative Returns', fontsize=14, fontweight='bold')
-                plt.xlabel('Date', fontsize=12)
-                plt.ylabel('Cumulative Returns (%)', fontsize=12)
-                plt.grid(True, alpha=0.3)
-                plt.legend()
-                plt.tight_layout()
-                plt.show()
+                ax.axhline(y=0, color='black', linestyle='-', linewidth=1)
+                
+                ax.set_title(f'{self.config_data.get_ticker} Cumulative Returns', fontsize=14, fontweight='bold')
+                ax.set_xlabel('Date', fontsize=12)
+                ax.set_ylabel('Cumulative Returns (%)', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                ax.legend()
+                return self._finish(fig, save_path)
         
-        def plot_summary_dashboard(self):
+        def plot_summary_dashboard(self, figsize=(15, 10), save_path=None):
 
-                fig = plt.figure(figsize=(15, 10))
-                
-                gs = fig.add_gridspec(3, 2)
+                def layout(fig):
+                        gs = fig.add_gridspec(3, 2)
+                        return (fig.add_subplot(gs[0, :]), fig.add_subplot(gs[1, 0]),
+                                fig.add_subplot(gs[1, 1]), fig.add_subplot(gs[2, :]))
+                fig, (ax1, ax2, ax3, ax4) = self._figure('summary_dashboard', figsize, save_path, layout)
+                half_width = (figsize[0] / 2, figsize[1])
             
-                ax1 = fig.add_subplot(gs[0, :])
-                prices = self.config_data.get_prices
-                ax1.plot(prices.index, prices['Close'], linewidth=1.5, color='blue')
+                close = self._decimate(self.config_data.get_prices['Close'], figsize)
+                ax1.plot(close.index, close, linewidth=1.5, color='blue')
                 ax1.set_title('Price Chart', fontweight='bold')
                 ax1.set_ylabel('Price ($)')
                 ax1.grid(True, alpha=0.3)
                 
-                ax2 = fig.add_subplot(gs[1, 0])
-                returns = self.config_data.get_log_returns
+                features = self.get_features()
+                returns = features['returns']
                 ax2.hist(returns, bins=40, alpha=0.7, color='skyblue', edgecolor='black')
                 ax2.set_title('Returns Distribution', fontweight='bold')
                 ax2.set_xlabel('Log Returns')
                 ax2.set_ylabel('Frequency')
                 ax2.grid(True, alpha=0.3)
                 
-                ax3 = fig.add_subplot(gs[1, 1])
-                cumulative_returns = (1 + returns).cumprod() - 1
+                cumulative_returns = self._decimate(features['cumulative_returns'], half_width)
                 ax3.plot(cumulative_returns.index, cumulative_returns * 100, linewidth=2, color='green')
                 ax3.set_title('Cumulative Returns', fontweight='bold')
                 ax3.set_ylabel('Returns (%)')
                 ax3.grid(True, alpha=0.3)
                 
-                ax4 = fig.add_subplot(gs[2, :])
-                rolling_vol = returns.rolling(window=30).std() * np.sqrt(252)
+                rolling_vol = self._decimate(features['rolling_volatility'], figsize)
                 ax4.plot(rolling_vol.index, rolling_vol, linewidth=1.5, color='red')
                 ax4.set_title('30-Day Rolling Volatility', fontweight='bold')
                 ax4.set_xlabel('Date')
                 ax4.set_ylabel('Volatility')
                 ax4.grid(True, alpha=0.3)
                 
-                plt.suptitle(f'{self.config_data.get_ticker} Analysis Dashboard', fontsize=16, fontweight='bold')
-                plt.tight_layout()
-                plt.show()
+                fig.suptitle(f'{self.config_data.get_ticker} Analysis Dashboard', fontsize=16, fontweight='bold')
+                return self._finish(fig, save_path)
         
         def display_statistics(self):
                 stats = self.config_data.get_prices_stats()
@@ -0,0 +1,29 @@
+import os
+
+# The backend is chosen once, at import: numba when it is installed, otherwise NumPy.
+# ALGO_KERNEL_BACKEND=numpy forces the NumPy versions even with numba installed.
+_requested = os.environ.get('ALGO_KERNEL_BACKEND', 'auto').lower()
+if _requested not in ('auto', 'numba', 'numpy'):
+    raise ValueError(f"Unknown ALGO_KERNEL_BACKEND: {_requested}")
+
+try:
+    if _requested == 'numpy':
+        raise ImportError("NumPy kernels requested")
+    import numba
+    BACKEND = 'numba'
+except ImportError:
+    if _requested == 'numba':
+        raise
+    numba = None
+    BACKEND = 'numpy'
+
+# name -> (loop version, NumPy version), so tests can check every pair gives the same results
+KERNELS = {}
+
+def kernel(name, loop_version, numpy_version):
+    # The loop version is written for numba's nopython mode and compiled on first call; without
+    # numba the NumPy version, which vectorizes the same computation, is used instead
+    KERNELS[name] = (loop_version, numpy_version)
+    if BACKEND == 'numba':
+        return numba.njit(cache=True)(loop_version)
+    return numpy_version
@@ -0,0 +1,52 @@
+import numpy as np
+from kernels.backend import kernel
+
+# Cox-Ross-Rubinstein binomial tree for American options: backward induction with an
+# early-exercise check at every node. Inputs are (N,) float arrays (is_call as 0/1), steps is
+# the tree depth shared by all options. Node prices at each step come from the next step's
+# by one multiplication by u, so both versions do the same floating point operations.
+
+def _american_binomial_loop(spot, strike, years, rate, sigma, is_call, steps):
+    n_options = spot.shape[0]
+    prices = np.empty(n_options)
+    stock = np.empty(steps + 1)
+    values = np.empty(steps + 1)
+    for i in range(n_options):
+        dt = years[i] / steps
+        u = np.exp(sigma[i] * np.sqrt(dt))
+        d = 1.0 / u
+        growth = np.exp(rate[i] * dt)
+        discount = 1.0 / growth
+        p = (growth - d) / (u - d)
+        sign = 1.0 if is_call[i] else -1.0
+        for j in range(steps + 1):
+            stock[j] = spot[i] * np.exp(sigma[i] * np.sqrt(dt) * (2 * j - steps))
+            values[j] = max(sign * (stock[j] - strike[i]), 0.0)
+        for step in range(steps - 1, -1, -1):
+            for j in range(step + 1):
+                stock[j] = stock[j] * u
+                held = discount * (p * values[j + 1] + (1.0 - p) * values[j])
+                values[j] = max(held, sign * (stock[j] - strike[i]))
+        prices[i] = values[0]
+    return prices
+
+def _american_binomial_numpy(spot, strike, years, rate, sigma, is_call, steps):
+    # Vectorized over options and nodes; one pass per tree level
+    dt = (years / steps)[:, None]
+    vol = sigma[:, None] * np.sqrt(dt)
+    u = np.exp(vol)
+    d = 1.0 / u
+    growth = np.exp(rate[:, None] * dt)
+    discount = 1.0 / growth
+    p = (growth - d) / (u - d)
+    sign = np.where(is_call, 1.0, -1.0)[:, None]
+    strike = strike[:, None]
+    stock = spot[:, None] * np.exp(vol * (2 * np.arange(steps + 1) - steps))
+    values = np.maximum(sign * (stock - strike), 0.0)
+    for step in range(steps - 1, -1, -1):
+        stock = stock[:, :step + 1] * u
+        held = discount * (p * values[:, 1:step + 2] + (1.0 - p) * values[:, :step + 1])
+        values = np.maximum(held, sign * (stock - strike))
+    return values[:, 0]
+
+american_binomial = kernel('american_binomial', _american_binomial_loop, _american_binomial_numpy)
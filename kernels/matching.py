@@ -0,0 +1,84 @@
+import numpy as np
+from kernels.backend import kernel
+
+LIMIT, STOP, STOP_LIMIT = 0, 1, 2
+
+# First fill of each resting order against one symbol's OHLC bars, starting at bar start[i].
+#   limit:      buys fill when low <= limit at min(open, limit); sells when high >= limit at max(open, limit)
+#   stop:       as order.order.StopOrder, buys trigger when low <= stop and fill at min(open, stop); sells
+#               when high >= stop at max(open, stop)
+#   stop-limit: triggers like a stop and fills at the trigger price if it is within the limit,
+#               otherwise rests as a limit order from the next bar
+# Returns the fill bar (-1 if never filled) and fill price (NaN if never filled).
+
+def _bar_fills_loop(start, is_buy, kind, limit_price, stop_price, opens, highs, lows):
+    n_orders = start.shape[0]
+    n_bars = opens.shape[0]
+    fill_bar = np.full(n_orders, -1, dtype=np.int64)
+    fill_price = np.full(n_orders, np.nan)
+    for i in range(n_orders):
+        triggered = kind[i] == LIMIT
+        for t in range(start[i], n_bars):
+            if not triggered:
+                if is_buy[i] and lows[t] <= stop_price[i]:
+                    trigger = min(opens[t], stop_price[i])
+                elif not is_buy[i] and highs[t] >= stop_price[i]:
+                    trigger = max(opens[t], stop_price[i])
+                else:
+                    continue
+                triggered = True
+                if kind[i] == STOP or (is_buy[i] and trigger <= limit_price[i]) or \
+                        (not is_buy[i] and trigger >= limit_price[i]):
+                    fill_bar[i] = t
+                    fill_price[i] = trigger
+                    break
+                continue
+            if is_buy[i] and lows[t] <= limit_price[i]:
+                fill_bar[i] = t
+                fill_price[i] = min(opens[t], limit_price[i])
+                break
+            if not is_buy[i] and highs[t] >= limit_price[i]:
+                fill_bar[i] = t
+                fill_price[i] = max(opens[t], limit_price[i])
+                break
+    return fill_bar, fill_price
+
+def _bar_fills_numpy(start, is_buy, kind, limit_price, stop_price, opens, highs, lows):
+    # One vectorized step per bar over the orders still working
+    n_orders = start.shape[0]
+    fill_bar = np.full(n_orders, -1, dtype=np.int64)
+    fill_price = np.full(n_orders, np.nan)
+    triggered = kind == LIMIT
+    working = np.ones(n_orders, dtype=bool)
+    first = int(start.min()) if n_orders else 0
+    for t in range(first, len(opens)):
+        live = working & (start <= t)
+        if not live.any():
+            if not working.any():
+                break
+            continue
+        # Limit orders (and stop-limits triggered on an earlier bar)
+        resting = live & triggered
+        buy_fill = resting & is_buy & (lows[t] <= limit_price)
+        sell_fill = resting & ~is_buy & (highs[t] >= limit_price)
+        fill_price[buy_fill] = np.minimum(opens[t], limit_price[buy_fill])
+        fill_price[sell_fill] = np.maximum(opens[t], limit_price[sell_fill])
+        done = buy_fill | sell_fill
+
+        # Stops and stop-limits triggering on this bar
+        waiting = live & ~triggered
+        buy_trigger = waiting & is_buy & (lows[t] <= stop_price)
+        sell_trigger = waiting & ~is_buy & (highs[t] >= stop_price)
+        trigger = np.where(is_buy, np.minimum(opens[t], stop_price), np.maximum(opens[t], stop_price))
+        fires = buy_trigger | sell_trigger
+        within = (kind == STOP) | (is_buy & (trigger <= limit_price)) | (~is_buy & (trigger >= limit_price))
+        stop_fill = fires & within
+        fill_price[stop_fill] = trigger[stop_fill]
+        triggered = triggered | fires
+
+        done |= stop_fill
+        fill_bar[done] = t
+        working &= ~done
+    return fill_bar, fill_price
+
+bar_fills = kernel('bar_fills', _bar_fills_loop, _bar_fills_numpy)
@@ -0,0 +1,68 @@
+import numpy as np
+from kernels.backend import kernel
+
+# Fills for K portfolios over S symbols with the accounting of Portfolio._update_positions.
+# quantity, avg_price (K, S) and cash (K,) are updated in place; fills (K, S) are signed
+# share counts (0 = no fill), with prices and commissions of the same shape. Portfolios are
+# independent and each fills its symbols in column order, as if sent one order at a time.
+# Returns the (K, S) mask of applied fills and (K,) counts of buys rejected for lack of cash.
+
+def _apply_fills_loop(quantity, avg_price, cash, fills, prices, commission):
+    n_portfolios, n_symbols = fills.shape
+    filled = np.zeros((n_portfolios, n_symbols), dtype=np.bool_)
+    rejected = np.zeros(n_portfolios, dtype=np.int64)
+    for k in range(n_portfolios):
+        for s in range(n_symbols):
+            size = fills[k, s]
+            if size == 0:
+                continue
+            price = prices[k, s]
+            side = 1.0 if size > 0 else -1.0
+            size = abs(size)
+            cost = size * price
+            if side > 0 and cost + commission[k, s] > cash[k]:
+                rejected[k] += 1
+                continue
+            cash[k] -= side * cost + commission[k, s]
+
+            current = quantity[k, s]
+            new = current + side * size
+            if new == 0:
+                avg_price[k, s] = 0.0
+            elif current * new >= 0:
+                avg_price[k, s] = (avg_price[k, s] * abs(current) + price * size) / abs(new)
+            elif abs(new) > abs(current):
+                avg_price[k, s] = price
+            quantity[k, s] = new
+            filled[k, s] = True
+    return filled, rejected
+
+def _apply_fills_numpy(quantity, avg_price, cash, fills, prices, commission):
+    # Vectorized over portfolios; the loop over symbols keeps the sequential cash checks
+    filled = np.zeros(fills.shape, dtype=bool)
+    rejected = np.zeros(len(cash), dtype=np.int64)
+    for s in np.flatnonzero((fills != 0).any(axis=0)):
+        rows = np.flatnonzero(fills[:, s] != 0)
+        side = np.where(fills[rows, s] > 0, 1.0, -1.0)
+        size = np.abs(fills[rows, s])
+        price = prices[rows, s]
+        fee = commission[rows, s]
+        cost = size * price
+        short_of_cash = (side > 0) & (cost + fee > cash[rows])
+        rejected[rows[short_of_cash]] += 1
+        ok = ~short_of_cash
+        rows, side, size, price, fee, cost = rows[ok], side[ok], size[ok], price[ok], fee[ok], cost[ok]
+        cash[rows] -= side * cost + fee
+
+        current = quantity[rows, s]
+        avg = avg_price[rows, s]
+        new = current + side * size
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averaged = (avg * np.abs(current) + price * size) / np.abs(new)
+        flipped = np.where(np.abs(new) > np.abs(current), price, avg)
+        avg_price[rows, s] = np.where(new == 0, 0.0, np.where(current * new >= 0, averaged, flipped))
+        quantity[rows, s] = new
+        filled[rows, s] = True
+    return filled, rejected
+
+apply_fills = kernel('apply_fills', _apply_fills_loop, _apply_fills_numpy)
@@ -0,0 +1,193 @@
+import asyncio
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict, namedtuple
+import pandas as pd
+from monitoring.instrumentation import LatencyHistogram
+
+Quote = namedtuple('Quote', ['symbol', 'timestamp', 'price', 'bar', 'created_ns'])
+
+class CoalescingQuoteQueue:
+    # Bounded queue holding at most one pending quote per symbol. A newer quote for a
+    # symbol that is still waiting replaces the stale one in place; a quote for a new
+    # symbol waits for space when the queue is full (backpressure on the feed).
+
+    def __init__(self, maxsize=1000):
+        if maxsize <= 0:
+            raise ValueError(f"Queue size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self._pending = OrderedDict()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._closed = False
+        self.coalesced = 0
+        self.blocked = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def put(self, quote):
+        if quote.symbol in self._pending:
+            self._pending[quote.symbol] = quote
+            self.coalesced += 1
+            return
+        while len(self._pending) >= self.maxsize:
+            self.blocked += 1
+            self._not_full.clear()
+            await self._not_full.wait()
+            if quote.symbol in self._pending:
+                self._pending[quote.symbol] = quote
+                self.coalesced += 1
+                return
+        self._pending[quote.symbol] = quote
+        self._not_empty.set()
+
+    async def get(self):
+        # Returns None once the queue is closed and drained
+        while not self._pending:
+            if self._closed:
+                return None
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        _, quote = self._pending.popitem(last=False)
+        self._not_full.set()
+        return quote
+
+    def close(self):
+        self._closed = True
+        self._not_empty.set()
+
+class FeedAdapter(ABC):
+
+    @abstractmethod
+    async def run(self, queue):
+        # Puts Quote objects on the queue until the feed ends
+        ...
+
+class SimulatedFeed(FeedAdapter):
+    # Replays historical bars as quotes, sleeping the bar gap divided by speedup
+    # (speedup=None replays as fast as the consumer accepts them)
+
+    def __init__(self, data_by_symbol, speedup=None):
+        frames = []
+        for symbol, data in data_by_symbol.items():
+            prices = data.get_prices if hasattr(data, 'get_prices') else data
+            frame = prices.copy()
+            frame['_symbol'] = symbol
+            frames.append(frame)
+        self.events = pd.concat(frames).sort_index(kind='stable')
+        self.speedup = speedup
+        self.sent = 0
+
+    async def run(self, queue):
+        records = self.events.to_dict('records')
+        timestamps = self.events.index
+        previous = None
+        for timestamp, record in zip(timestamps, records):
+            if self.speedup and previous is not None:
+                gap = (timestamp - previous).total_seconds() / self.speedup
+                if gap > 0:
+                    await asyncio.sleep(gap)
+            previous = timestamp
+            symbol = record.pop('_symbol')
+            await queue.put(Quote(symbol, timestamp, record['Close'], record, time.perf_counter_ns()))
+            self.sent += 1
+            # Yield so consumers interleave with the feed even when no sleep is needed
+            await asyncio.sleep(0)
+
+class MarketDataPipeline:
+
+    def __init__(self, feeds, portfolio, stock_data=None, queue_size=1000, on_quote=None, mark_every=1,
+                 aggregator=None):
+        self.feeds = feeds
+        self.portfolio = portfolio
+        self.stock_data = stock_data or {}
+        self.queue_size = queue_size
+        self.on_quote = on_quote
+        self.mark_every = mark_every
+        # Optional BarAggregator fed with every quote, so subscribers get coarser bars live
+        self.aggregator = aggregator
+        self.last_prices = {}
+        # Bounded histograms, so a long-running feed does not keep every sample
+        self.quote_latency_ns = LatencyHistogram()
+        self.fill_latency_ns = LatencyHistogram()
+        self.processed = 0
+        self.queue = None
+
+    async def _consume(self):
+        portfolio = self.portfolio
+        while True:
+            quote = await self.queue.get()
+            if quote is None:
+                return
+            symbol, timestamp, price = quote.symbol, quote.timestamp, quote.price
+            data = self.stock_data.get(symbol)
+            if data is not None and timestamp > data.last_timestamp:
+                data.append_bar(timestamp, quote.bar)
+            self.last_prices[symbol] = price
+            if self.aggregator is not None:
+                if quote.bar and 'Close' in quote.bar:
+                    self.aggregator.on_bar(symbol, timestamp, quote.bar)
+                else:
+                    self.aggregator.on_tick(symbol, timestamp, price)
+            if self.on_quote is not None:
+                self.on_quote(quote, self)
+
+            fills = portfolio.check_pending_orders({symbol: price}, timestamp=timestamp)
+            self.processed += 1
+            if self.processed % self.mark_every == 0:
+                portfolio.update_portfolio_value(self.last_prices, timestamp)
+
+            latency = time.perf_counter_ns() - quote.created_ns
+            self.quote_latency_ns.record(latency)
+            for _ in fills:
+                self.fill_latency_ns.record(latency)
+
+    async def run(self):
+        self.queue = CoalescingQuoteQueue(self.queue_size)
+        start = time.perf_counter()
+        consumer = asyncio.create_task(self._consume())
+        feeds = asyncio.gather(*(feed.run(self.queue) for feed in self.feeds))
+        try:
+            # The consumer runs until the queue closes, so the first task to finish is either
+            # the feeds (done or failed) or a failed consumer
+            await asyncio.wait({feeds, consumer}, return_when=asyncio.FIRST_COMPLETED)
+            if consumer.done():
+                # Feeds may be blocked on the full queue waiting for the failed consumer
+                feeds.cancel()
+                await asyncio.gather(feeds, return_exceptions=True)
+                consumer.result()
+            feeds.result()
+        except BaseException:
+            consumer.cancel()
+            raise
+        finally:
+            self.queue.close()
+        await consumer
+        if self.aggregator is not None:
+            self.aggregator.flush()
+        return self.get_stats(time.perf_counter() - start)
+
+    def run_sync(self):
+        return asyncio.run(self.run())
+
+    def get_stats(self, elapsed):
+        def percentiles(histogram):
+            if not histogram.total_count:
+                return {'p50_us': None, 'p99_us': None, 'max_us': None}
+            return {'p50_us': histogram.percentile(50) / 1e3,
+                    'p99_us': histogram.percentile(99) / 1e3,
+                    'max_us': histogram.max_value / 1e3}
+
+        return {
+            'quotes_sent': sum(getattr(feed, 'sent', 0) for feed in self.feeds),
+            'quotes_processed': self.processed,
+            'quotes_coalesced': self.queue.coalesced,
+            'backpressure_waits': self.queue.blocked,
+            'elapsed_seconds': elapsed,
+            'quotes_per_second': self.processed / elapsed if elapsed > 0 else None,
+            'quote_latency': percentiles(self.quote_latency_ns),
+            'fill_latency': percentiles(self.fill_latency_ns),
+            'fills': self.fill_latency_ns.total_count,
+        }
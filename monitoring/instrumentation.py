@@ -0,0 +1,187 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from functools import wraps
+import numpy as np
+
+class LatencyHistogram:
+    # HDR-style log-linear buckets: values below 2**precision_bits are exact, larger
+    # values keep their top precision_bits bits, so each bucket is within 2**(1 - precision_bits)
+    # of the values it holds (under 2% with the default of 7 bits).
+
+    def __init__(self, precision_bits=7, max_value_ns=10 ** 12):
+        self.precision_bits = precision_bits
+        self.max_value_ns = max_value_ns
+        self.sub_buckets = 1 << precision_bits
+        self.half = self.sub_buckets >> 1
+        max_magnitude = max(1, int(max_value_ns).bit_length() - precision_bits)
+        self.counts = np.zeros(self.sub_buckets + max_magnitude * self.half, dtype=np.int64)
+        self.total_count = 0
+        self.max_value = 0
+        self.min_value = None
+        self.total = 0
+
+    def _index(self, value):
+        if value < self.sub_buckets:
+            return value
+        magnitude = value.bit_length() - self.precision_bits
+        index = self.sub_buckets + (magnitude - 1) * self.half + (value >> magnitude) - self.half
+        return min(index, len(self.counts) - 1)
+
+    def _value_at(self, index):
+        # Highest value that maps into the bucket
+        if index < self.sub_buckets:
+            return index
+        magnitude, offset = divmod(index - self.sub_buckets, self.half)
+        magnitude += 1
+        return ((offset + self.half + 1) << magnitude) - 1
+
+    def record(self, value):
+        value = int(value)
+        self.counts[self._index(value)] += 1
+        self.total_count += 1
+        self.total += value
+        if value > self.max_value:
+            self.max_value = value
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+
+    def percentile(self, pct):
+        if self.total_count == 0:
+            return None
+        target = max(1, math.ceil(self.total_count * pct / 100))
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        return min(self._value_at(index), self.max_value)
+
+    def snapshot(self):
+        if self.total_count == 0:
+            return {'count': 0}
+        return {
+            'count': self.total_count,
+            'mean_ns': self.total / self.total_count,
+            'min_ns': self.min_value,
+            'p50_ns': self.percentile(50),
+            'p90_ns': self.percentile(90),
+            'p99_ns': self.percentile(99),
+            'p999_ns': self.percentile(99.9),
+            'max_ns': self.max_value,
+        }
+
+class Instrumentation:
+    # Opt-in: enable() swaps the target methods for timed wrappers and disable()
+    # restores the originals, so nothing is added to the call path while disabled.
+
+    def __init__(self, track_allocations=True):
+        self.track_allocations = track_allocations
+        self.histograms = {}
+        self.allocations = {}
+        self._originals = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    def _wrap(self, name, function):
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        self.allocations.setdefault(name, 0)
+        track_allocations = self.track_allocations
+        lock = self._lock
+        clock = time.perf_counter_ns
+        blocks = sys.getallocatedblocks
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            before_blocks = blocks() if track_allocations else 0
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                with lock:
+                    histogram.record(elapsed)
+                    if track_allocations:
+                        # Net blocks still allocated when the call returns
+                        self.allocations[name] += max(blocks() - before_blocks, 0)
+        return timed
+
+    def instrument(self, owner, method_name, label=None):
+        label = label or f"{owner.__name__}.{method_name}"
+        raw = owner.__dict__[method_name]
+        if isinstance(raw, staticmethod):
+            wrapped = staticmethod(self._wrap(label, raw.__func__))
+        elif isinstance(raw, classmethod):
+            wrapped = classmethod(self._wrap(label, raw.__func__))
+        else:
+            wrapped = self._wrap(label, raw)
+        self._originals.append((owner, method_name, raw))
+        setattr(owner, method_name, wrapped)
+        return self
+
+    def enable(self, targets=None):
+        if self.enabled:
+            return self
+        for owner, method_name in (targets if targets is not None else default_targets()):
+            self.instrument(owner, method_name)
+        return self
+
+    def disable(self):
+        while self._originals:
+            owner, method_name, raw = self._originals.pop()
+            setattr(owner, method_name, raw)
+        return self
+
+    def reset(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.__init__(histogram.precision_bits, histogram.max_value_ns)
+            for name in self.allocations:
+                self.allocations[name] = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: dict(histogram.snapshot(), allocated_blocks=self.allocations[name])
+                for name, histogram in self.histograms.items()
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps({'timestamp': time.time(), 'metrics': self.snapshot()}, **kwargs)
+
+    def write_snapshot(self, path):
+        # Written to a temp file and renamed, so a scraper never reads a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as handle:
+            handle.write(self.to_json())
+        os.replace(tmp_path, path)
+        return path
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+        return False
+
+def default_targets():
+    # Imported here so that loading this module stays cheap
+    from portfolio.portfolio import Portfolio
+    from data.data_factory import DataLoader
+    from data.data_sources import DataSource
+    from data.option_data import OptionData
+    return [
+        (Portfolio, 'add_order'),
+        (Portfolio, 'check_pending_orders'),
+        (Portfolio, 'execute_market_order'),
+        (Portfolio, '_update_positions'),
+        (Portfolio, 'update_portfolio_value'),
+        (Portfolio, 'update_option_values'),
+        (DataLoader, 'load_data'),
+        (DataSource, 'fetch_bars'),
+        (DataSource, 'fetch_chain'),
+        (OptionData, 'calculate_greeks'),
+        (OptionData, 'get_option_price'),
+    ]
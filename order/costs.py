@@ -0,0 +1,129 @@
+import numpy as np
+
+# Every model works on scalars and on numpy arrays of fills alike, so the same
+# instance prices a single order or a whole batch in a few vectorized operations.
+
+class CostModel:
+
+    def fill_quantity(self, quantity, volume=None):
+        return quantity
+
+    def price_impact(self, price, quantity, volume=None):
+        # Adverse per-share price move; buys pay up, sells receive less
+        return 0.0
+
+    def commission(self, price, quantity):
+        return 0.0
+
+    def apply(self, price, quantity, side, volume=None):
+        # side is +1 for buys and -1 for sells
+        fill_qty = self.fill_quantity(quantity, volume)
+        fill_price = price + side * self.price_impact(price, fill_qty, volume)
+        commission = self.commission(fill_price, fill_qty)
+        if np.ndim(fill_price) == 0 and np.ndim(commission) == 0:
+            return float(fill_price), fill_qty, float(commission)
+        return fill_price, fill_qty, commission
+
+class FixedCommission(CostModel):
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def commission(self, price, quantity):
+        return np.where(np.asarray(quantity) > 0, float(self.amount), 0.0)
+
+class PerShareCommission(CostModel):
+
+    def __init__(self, rate, minimum=0.0, max_pct_of_value=None):
+        self.rate = rate
+        self.minimum = minimum
+        self.max_pct_of_value = max_pct_of_value
+
+    def commission(self, price, quantity):
+        quantity = np.abs(quantity)
+        fee = np.maximum(quantity * self.rate, self.minimum)
+        if self.max_pct_of_value is not None:
+            fee = np.minimum(fee, quantity * price * self.max_pct_of_value)
+        return np.where(quantity > 0, fee, 0.0)
+
+class SpreadCost(CostModel):
+
+    def __init__(self, spread_bps):
+        self.spread_bps = spread_bps
+
+    def price_impact(self, price, quantity, volume=None):
+        # Crossing the spread costs half of it on each side
+        return price * self.spread_bps / 2e4
+
+class SquareRootImpact(CostModel):
+
+    def __init__(self, coefficient=0.1, daily_volatility=0.02):
+        self.coefficient = coefficient
+        self.daily_volatility = daily_volatility
+
+    def price_impact(self, price, quantity, volume=None):
+        # impact = coefficient * sigma * sqrt(quantity / volume) * price
+        if volume is None:
+            return 0.0
+        volume = np.asarray(volume, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            participation = np.where(volume > 0, np.abs(quantity) / volume, 0.0)
+        return self.coefficient * self.daily_volatility * np.sqrt(participation) * price
+
+class VolumeParticipationCap(CostModel):
+
+    def __init__(self, max_participation=0.1):
+        if not 0.0 < max_participation <= 1.0:
+            raise ValueError(f"Participation must be in (0, 1], got {max_participation}")
+        self.max_participation = max_participation
+
+    def fill_quantity(self, quantity, volume=None):
+        # Fills above the cap are cut to a partial fill; the remainder stays open
+        if volume is None:
+            return quantity
+        volume = np.asarray(volume, dtype=float)
+        cap = np.floor(np.where(np.isnan(volume), np.inf, volume) * self.max_participation)
+        capped = np.minimum(quantity, cap)
+        return capped if np.ndim(capped) else type(quantity)(capped)
+
+class CompositeCostModel(CostModel):
+
+    def __init__(self, *models):
+        self.models = models
+
+    def fill_quantity(self, quantity, volume=None):
+        for model in self.models:
+            quantity = model.fill_quantity(quantity, volume)
+        return quantity
+
+    def price_impact(self, price, quantity, volume=None):
+        return sum(model.price_impact(price, quantity, volume) for model in self.models)
+
+    def commission(self, price, quantity):
+        return sum(model.commission(price, quantity) for model in self.models)
+
+def affordable_quantity(cash, price, cost_model=None):
+    # Most whole shares cash buys at price once the cost model's price impact and commission
+    # are added, so an all-in buy is never refused for the costs on top of it
+    cash = np.asarray(cash, dtype=float)
+    price = np.asarray(price, dtype=float)
+    quantity = np.floor(cash / price)
+    if cost_model is not None:
+        while True:
+            fill_price, _, commission = cost_model.apply(price, quantity, 1)
+            over = (quantity > 0) & (quantity * fill_price + commission > cash)
+            if not over.any():
+                break
+            # Costs grow with size, so stepping down always ends at an affordable quantity
+            quantity = np.where(over, np.minimum(quantity - 1, np.floor((cash - commission) / fill_price)), quantity)
+            quantity = np.maximum(quantity, 0.0)
+    return float(quantity) if quantity.ndim == 0 else quantity
+
+def bar_volumes(data_by_symbol, timestamp):
+    # Volume for each symbol's bar at timestamp, taken from BaseData.prices['Volume']
+    volumes = {}
+    for symbol, data in data_by_symbol.items():
+        prices = data.get_prices
+        if 'Volume' in prices.columns and timestamp in prices.index:
+            volumes[symbol] = float(prices.at[timestamp, 'Volume'])
+    return volumes
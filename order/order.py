@@ -1,6 +1,8 @@
 from enum import Enum
 from datetime import datetime
-import uuid
+from collections.abc import Mapping
+import itertools
+import numbers
 
 class OrderType(Enum):
     MARKET = "MARKET"
@@ -11,27 +13,76 @@ class OrderDirection(Enum):
     LONG = "LONG"
     SHORT = "SHORT"
 
+ORDER_FIELDS = ('order_id', 'symbol', 'order_type', 'direction', 'quantity', 'open_price', 'open_time',
+                'filled', 'fill_price', 'fill_time', 'commission', 'pnl')
+
+# Monotonic integer ids are far cheaper than uuid4(); pass order_id explicitly to use UUIDs
+_order_ids = itertools.count(1)
+
+def next_order_id():
+    return next(_order_ids)
+
+def reserve_order_ids(order_ids):
+    # Moves the counter past the largest integer id in order_ids, so orders created after a
+    # restore never reuse a restored id (the counter starts at 1 in every process)
+    global _order_ids
+    numeric = [int(order_id) for order_id in order_ids
+               if isinstance(order_id, numbers.Integral) and not isinstance(order_id, bool)]
+    if numeric:
+        upcoming = next(_order_ids)
+        _order_ids = itertools.count(max(upcoming, max(numeric) + 1))
+
+class OrderRecord(Mapping):
+    # Read-only dict view over an order's fields, built without copying
+    __slots__ = ('_order',)
+
+    def __init__(self, order):
+        self._order = order
+
+    def __getitem__(self, key):
+        if key not in ORDER_FIELDS:
+            raise KeyError(key)
+        return getattr(self._order, key)
+
+    def __iter__(self):
+        return iter(ORDER_FIELDS)
+
+    def __len__(self):
+        return len(ORDER_FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
 class Order:
+    __slots__ = ORDER_FIELDS
 
     def __init__(self, symbol, order_type, direction,
-                 quantity, open_price=None, timestamp=None):
+                 quantity, open_price=None, timestamp=None, order_id=None):
         self.symbol = symbol
         self.order_type = order_type
         self.direction = direction
         self.quantity = quantity
         self.open_price = open_price
-        self.open_time = timestamp or datetime.now()
+        # Callers on hot paths pass the bar timestamp; the clock is only read as a fallback
+        self.open_time = timestamp if timestamp is not None else datetime.now()
         self.filled = False
         self.fill_price = None
         self.fill_time = None
         self.pnl = None
-        self.order_id = uuid.uuid4()
+        self.commission = 0.0
+        self.order_id = order_id if order_id is not None else next(_order_ids)
 
     def __str__(self):
         return f"Order({self.symbol}, {self.order_type.value}, {self.direction.value}, {self.quantity})"
 
-    def execute_order(self, fill_price):
+    def execute_order(self, fill_price, timestamp=None):
+        return self.fill(fill_price, timestamp=timestamp)
+
+    def fill(self, fill_price, quantity=None, commission=0.0, timestamp=None):
+        # quantity below the order size records a partial fill
         try:
+            if quantity is not None:
+                self.quantity = quantity
             pnl = 0
             cost = self.quantity * fill_price
             if self.direction == OrderDirection.LONG:
@@ -40,58 +91,54 @@ class Order:
                 pnl = cost - self.open_price * self.quantity
             self.filled = True
             self.fill_price = fill_price
-            self.fill_time = datetime.now()
-            self.pnl = pnl
+            self.fill_time = timestamp if timestamp is not None else datetime.now()
+            self.commission = commission
+            self.pnl = pnl - commission
             return True
         except Exception as e:
-            raise Exception(f"Unexpected exception at execute_order: {e}")
+            raise Exception(f"Unexpected exception at fill: {e}")
         finally:
             pass
 
     def get_order(self):
-        return {
-            'order_id': self.order_id,
-            'symbol': self.symbol,
-            'order_type': self.order_type,
-            'direction': self.direction,
-            'quantity': self.quantity,
-            'open_price': self.open_price,
-            'open_time': self.open_time,
-            'filled': self.filled,
-            'fill_price': self.fill_price,
-            'fill_time': self.fill_time,
-            'pnl': self.pnl
-        }
+        # Snapshot dict of the order's fields; later fills do not change it
+        return dict(OrderRecord(self))
+
+    def get_record(self):
+        # Zero-copy read-only view that follows later fills and resizes
+        return OrderRecord(self)
 
 class LimitOrder(Order):
+    __slots__ = ('limit_price',)
 
-    def __init__(self, symbol, direction, quantity, limit_price, open_price=None, timestamp=None):
-        super().__init__(symbol, OrderType.LIMIT, direction, quantity, open_price, timestamp)
+    def __init__(self, symbol, direction, quantity, limit_price, open_price=None, timestamp=None, order_id=None):
+        super().__init__(symbol, OrderType.LIMIT, direction, quantity, open_price, timestamp, order_id)
         self.limit_price = limit_price
     
-    def execute_order(self, curr_price):
+    def execute_order(self, curr_price, timestamp=None):
         if self.order_type == OrderType.LIMIT:
             if self.direction == OrderDirection.LONG and curr_price <= self.limit_price:
-                return super().execute_order(curr_price)
+                return super().execute_order(curr_price, timestamp)
             elif self.direction == OrderDirection.SHORT and curr_price >= self.limit_price:
-                return super().execute_order(curr_price)
+                return super().execute_order(curr_price, timestamp)
         return False
 
 class StopOrder(Order):
+    __slots__ = ('stop_price', 'stop_trigger')
 
-    def __init__(self, symbol, direction, quantity, stop_price, open_price=None, timestamp=None):
-        super().__init__(symbol, OrderType.STOP, direction, quantity, open_price, timestamp)
+    def __init__(self, symbol, direction, quantity, stop_price, open_price=None, timestamp=None, order_id=None):
+        super().__init__(symbol, OrderType.STOP, direction, quantity, open_price, timestamp, order_id)
         self.stop_price = stop_price
         self.stop_trigger = False
     
-    def execute_order(self, curr_price):
+    def execute_order(self, curr_price, timestamp=None):
         if self.order_type == OrderType.STOP:
             if self.direction == OrderDirection.LONG:
                 if curr_price <= self.stop_price:
                     self.stop_trigger = True
-                    return super().execute_order(curr_price)
+                    return super().execute_order(curr_price, timestamp)
             else:
                 if curr_price >= self.stop_price:
                     self.stop_trigger = True
-                    return super().execute_order(curr_price)
+                    return super().execute_order(curr_price, timestamp)
         return False
@@ -0,0 +1,232 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import deque
+import pandas as pd
+from order.order import OrderDirection, OrderType, next_order_id
+
+TRADE_FIELDS = ('timestamp', 'symbol', 'price', 'quantity', 'buy_order_id', 'sell_order_id', 'aggressor')
+
+class OrderBook:
+    # Price levels are kept in ascending key lists with the best level last, so the
+    # top of book is list[-1] and emptying it is an O(1) pop. Bid keys are prices,
+    # ask keys are negated prices. Each level is [FIFO deque, live order count] of
+    # resting entries [order_id, remaining_qty, listener]. Cancels zero the entry in
+    # place (O(1)); matching discards dead entries when it reaches them.
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self._bid_keys = []
+        self._ask_keys = []
+        self._bids = {}
+        self._asks = {}
+        self._orders = {}
+        self._rising_stops = []
+        self._falling_stops = []
+        self._stop_seq = 0
+        self._notices = []
+        self.last_price = None
+        self.trades = []
+
+    @property
+    def best_bid(self):
+        return self._bid_keys[-1] if self._bid_keys else None
+
+    @property
+    def best_ask(self):
+        return -self._ask_keys[-1] if self._ask_keys else None
+
+    def depth(self, levels=5):
+        bids = [(key, sum(e[1] for e in self._bids[key][0])) for key in reversed(self._bid_keys[-levels:])]
+        asks = [(-key, sum(e[1] for e in self._asks[key][0])) for key in reversed(self._ask_keys[-levels:])]
+        return {'bids': bids, 'asks': asks}
+
+    def add_limit(self, is_buy, quantity, price, order_id=None, listener=None, timestamp=None):
+        if quantity <= 0:
+            raise ValueError(f"Order quantity must be positive, got {quantity}")
+        if order_id is None:
+            order_id = next_order_id()
+        remaining = self._match(is_buy, quantity, price, order_id, listener, timestamp)
+        if remaining > 0:
+            self._rest(is_buy, remaining, price, order_id, listener)
+        self._check_stops(timestamp)
+        self._notify()
+        return order_id
+
+    def add_market(self, is_buy, quantity, order_id=None, listener=None, timestamp=None):
+        # Unfilled market quantity is cancelled (immediate-or-cancel)
+        if quantity <= 0:
+            raise ValueError(f"Order quantity must be positive, got {quantity}")
+        if order_id is None:
+            order_id = next_order_id()
+        self._match(is_buy, quantity, None, order_id, listener, timestamp)
+        self._check_stops(timestamp)
+        self._notify()
+        return order_id
+
+    def add_stop(self, is_buy, quantity, stop_price, limit_price=None, order_id=None, listener=None, timestamp=None,
+                 trigger_above=None):
+        # By default buy stops trigger when a trade prints at or above the stop and sell stops
+        # at or below; trigger_above picks the direction explicitly (MatchingEngine uses it to
+        # follow StopOrder, whose LONG stops trigger at or below)
+        if quantity <= 0:
+            raise ValueError(f"Order quantity must be positive, got {quantity}")
+        if order_id is None:
+            order_id = next_order_id()
+        if trigger_above is None:
+            trigger_above = is_buy
+        self._stop_seq += 1
+        stop = (stop_price if trigger_above else -stop_price, self._stop_seq, order_id, quantity, limit_price,
+                listener, is_buy)
+        heapq.heappush(self._rising_stops if trigger_above else self._falling_stops, stop)
+        self._orders[order_id] = (None, trigger_above, stop)
+        self._check_stops(timestamp)
+        self._notify()
+        return order_id
+
+    def cancel(self, order_id):
+        location = self._orders.pop(order_id, None)
+        if location is None:
+            return False
+        key, is_buy, entry = location
+        if key is None:
+            # For stops the middle field is trigger_above rather than the side
+            stops = self._rising_stops if is_buy else self._falling_stops
+            stops.remove(entry)
+            heapq.heapify(stops)
+            return True
+        levels, keys = (self._bids, self._bid_keys) if is_buy else (self._asks, self._ask_keys)
+        entry[1] = 0
+        level = levels[key]
+        level[1] -= 1
+        if level[1] == 0:
+            del levels[key]
+            del keys[bisect_left(keys, key)]
+        return True
+
+    def _rest(self, is_buy, quantity, price, order_id, listener):
+        entry = [order_id, quantity, listener]
+        if is_buy:
+            key, levels, keys = price, self._bids, self._bid_keys
+        else:
+            key, levels, keys = -price, self._asks, self._ask_keys
+        level = levels.get(key)
+        if level is None:
+            level = levels[key] = [deque(), 0]
+            insort(keys, key)
+        level[0].append(entry)
+        level[1] += 1
+        self._orders[order_id] = (key, is_buy, entry)
+
+    def _match(self, is_buy, quantity, limit_price, order_id, listener, timestamp):
+        if is_buy:
+            keys, levels = self._ask_keys, self._asks
+        else:
+            keys, levels = self._bid_keys, self._bids
+        trades = self.trades
+        orders = self._orders
+        symbol = self.symbol
+        notices = self._notices
+
+        while quantity > 0 and keys:
+            key = keys[-1]
+            price = -key if is_buy else key
+            if limit_price is not None and (price > limit_price if is_buy else price < limit_price):
+                break
+            level = levels[key]
+            queue = level[0]
+            while quantity > 0 and level[1]:
+                entry = queue[0]
+                if entry[1] == 0:
+                    queue.popleft()
+                    continue
+                fill = entry[1] if entry[1] < quantity else quantity
+                entry[1] -= fill
+                quantity -= fill
+                if is_buy:
+                    trades.append((timestamp, symbol, price, fill, order_id, entry[0], 'BUY'))
+                else:
+                    trades.append((timestamp, symbol, price, fill, entry[0], order_id, 'SELL'))
+                if entry[2] is not None:
+                    notices.append((entry[2], entry[0], price, fill, timestamp))
+                if listener is not None:
+                    notices.append((listener, order_id, price, fill, timestamp))
+                if entry[1] == 0:
+                    queue.popleft()
+                    level[1] -= 1
+                    del orders[entry[0]]
+            if not level[1]:
+                del levels[key]
+                keys.pop()
+            self.last_price = price
+        return quantity
+
+    def _notify(self):
+        # Listeners run only once the incoming order has rested and triggered stops have been
+        # released, so one that raises (e.g. a portfolio out of cash) cannot leave the book half
+        # updated. Every fill is reported even if an earlier listener fails; the first error is
+        # re-raised. Listeners may send new orders, whose fills are reported in the same pass.
+        error = None
+        while self._notices:
+            notices, self._notices = self._notices, []
+            for callback, filled_id, price, fill, timestamp in notices:
+                try:
+                    callback(filled_id, price, fill, timestamp)
+                except Exception as e:
+                    if error is None:
+                        error = e
+        if error is not None:
+            raise error
+
+    def _check_stops(self, timestamp):
+        # Triggered stops become market (or limit) orders and may cascade further stops
+        last = self.last_price
+        while last is not None:
+            if self._rising_stops and self._rising_stops[0][0] <= last:
+                stop = heapq.heappop(self._rising_stops)
+            elif self._falling_stops and -self._falling_stops[0][0] >= last:
+                stop = heapq.heappop(self._falling_stops)
+            else:
+                break
+            _, _, order_id, quantity, limit_price, listener, is_buy = stop
+            del self._orders[order_id]
+            if limit_price is None:
+                self._match(is_buy, quantity, None, order_id, listener, timestamp)
+            else:
+                remaining = self._match(is_buy, quantity, limit_price, order_id, listener, timestamp)
+                if remaining > 0:
+                    self._rest(is_buy, remaining, limit_price, order_id, listener)
+            last = self.last_price
+
+    def get_trades_df(self):
+        return pd.DataFrame(self.trades, columns=list(TRADE_FIELDS))
+
+class MatchingEngine:
+    # One OrderBook per symbol, accepting the repo's Order/LimitOrder/StopOrder objects
+
+    def __init__(self):
+        self.books = {}
+
+    def get_book(self, symbol):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    def submit(self, order, listener=None, timestamp=None):
+        book = self.get_book(order.symbol)
+        is_buy = order.direction == OrderDirection.LONG
+        if order.order_type == OrderType.LIMIT:
+            return book.add_limit(is_buy, order.quantity, order.limit_price, order.order_id, listener, timestamp)
+        if order.order_type == OrderType.STOP:
+            # StopOrder semantics: LONG stops trigger once the price falls to the stop, SHORT once it rises
+            return book.add_stop(is_buy, order.quantity, order.stop_price, None, order.order_id, listener, timestamp,
+                                 trigger_above=not is_buy)
+        return book.add_market(is_buy, order.quantity, order.order_id, listener, timestamp)
+
+    def cancel(self, symbol, order_id):
+        book = self.books.get(symbol)
+        return book.cancel(order_id) if book is not None else False
+
+    def get_trades_df(self):
+        trades = [trade for book in self.books.values() for trade in book.trades]
+        return pd.DataFrame(trades, columns=list(TRADE_FIELDS))
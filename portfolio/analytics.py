@@ -0,0 +1,117 @@
+import pandas as pd
+import numpy as np
+
+METRIC_NAMES = ['total_return', 'annualized_return', 'annualized_volatility', 'sharpe_ratio',
+                'sortino_ratio', 'max_drawdown', 'max_drawdown_duration', 'calmar_ratio']
+
+def _as_matrix(equity):
+    # Curves are rows of a (K, T) matrix; DataFrames hold one curve per column
+    labels = None
+    if isinstance(equity, pd.DataFrame):
+        labels = equity.columns
+        values = equity.to_numpy(dtype=float).T
+    elif isinstance(equity, pd.Series):
+        values = equity.to_numpy(dtype=float)
+    else:
+        values = np.asarray(equity, dtype=float)
+    single = values.ndim == 1
+    values = np.atleast_2d(values)
+    if values.shape[1] < 2:
+        raise ValueError("At least two equity observations are required")
+    return values, single, labels
+
+def _safe_divide(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    return np.where(np.isfinite(result), result, np.nan)
+
+def period_returns(equity):
+    values, single, _ = _as_matrix(equity)
+    returns = values[:, 1:] / values[:, :-1] - 1
+    return returns[0] if single else returns
+
+def drawdown_series(equity):
+    values, single, _ = _as_matrix(equity)
+    running_max = np.maximum.accumulate(values, axis=1)
+    drawdown = values / running_max - 1
+    if isinstance(equity, pd.Series):
+        return pd.Series(drawdown[0], index=equity.index, name='drawdown')
+    return drawdown[0] if single else drawdown
+
+def compute_metrics(equity, periods_per_year=252, risk_free_rate=0.0):
+    values, single, labels = _as_matrix(equity)
+    n_curves, n_obs = values.shape
+    returns = values[:, 1:] / values[:, :-1] - 1
+    excess = returns - risk_free_rate / periods_per_year
+
+    total_return = values[:, -1] / values[:, 0] - 1
+    with np.errstate(invalid='ignore'):
+        annualized_return = np.power(values[:, -1] / values[:, 0], periods_per_year / (n_obs - 1)) - 1
+    mean_excess = excess.mean(axis=1)
+    volatility = returns.std(axis=1, ddof=1) if n_obs > 2 else np.full(n_curves, np.nan)
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=1))
+
+    # Running-max drawdown and the longest stretch spent below a prior peak
+    running_max = np.maximum.accumulate(values, axis=1)
+    max_drawdown = (values / running_max - 1).min(axis=1)
+    index = np.arange(n_obs)
+    last_peak = np.maximum.accumulate(np.where(values >= running_max, index, 0), axis=1)
+    max_duration = (index - last_peak).max(axis=1)
+
+    metrics = np.column_stack([
+        total_return,
+        annualized_return,
+        volatility * np.sqrt(periods_per_year),
+        _safe_divide(mean_excess, volatility) * np.sqrt(periods_per_year),
+        _safe_divide(mean_excess, downside) * np.sqrt(periods_per_year),
+        max_drawdown,
+        max_duration,
+        _safe_divide(annualized_return, np.abs(max_drawdown)),
+    ])
+
+    if single:
+        return {name: float(value) for name, value in zip(METRIC_NAMES, metrics[0])}
+    return pd.DataFrame(metrics, index=labels, columns=METRIC_NAMES)
+
+def rolling_metrics(equity, window, periods_per_year=252, risk_free_rate=0.0):
+    # Rolling mean/std from cumulative sums, so cost is O(n) regardless of window size
+    values, single, _ = _as_matrix(equity)
+    if window < 2 or window > values.shape[1] - 1:
+        raise ValueError(f"Window must be between 2 and the number of returns, got {window}")
+    returns = values[:, 1:] / values[:, :-1] - 1
+    excess = returns - risk_free_rate / periods_per_year
+
+    def window_sums(x):
+        cumulative = np.cumsum(np.pad(x, ((0, 0), (1, 0))), axis=1)
+        return cumulative[:, window:] - cumulative[:, :-window]
+
+    mean = window_sums(excess) / window
+    mean_returns = window_sums(returns) / window
+    variance = (window_sums(returns ** 2) - window * mean_returns ** 2) / (window - 1)
+    volatility = np.sqrt(np.clip(variance, 0.0, None))
+
+    running_max = np.maximum.accumulate(values, axis=1)
+    drawdown = (values / running_max - 1)[:, window:]
+    rolled = {
+        'rolling_return': values[:, window:] / values[:, :-window] - 1,
+        'rolling_volatility': volatility * np.sqrt(periods_per_year),
+        'rolling_sharpe': _safe_divide(mean, volatility) * np.sqrt(periods_per_year),
+        'drawdown': drawdown,
+    }
+
+    if single:
+        index = equity.index[window:] if isinstance(equity, pd.Series) else None
+        return pd.DataFrame({name: value[0] for name, value in rolled.items()}, index=index)
+    return rolled
+
+def resample_returns(history_df, freq='ME', column='total_value'):
+    # Per-period returns (e.g. monthly) from portfolio_history_df's equity column
+    equity = history_df[column].astype(float)
+    equity.index = pd.DatetimeIndex(equity.index)
+    period_end = equity.resample(freq).last().dropna()
+    return pd.concat([equity.iloc[:1], period_end]).pct_change().iloc[1:].rename('returns')
+
+def metrics_from_history(history_df, periods_per_year=252, risk_free_rate=0.0, column='total_value'):
+    if history_df.empty:
+        return {}
+    return compute_metrics(history_df[column].astype(float), periods_per_year, risk_free_rate)
@@ -0,0 +1,156 @@
+import copy
+import json
+import numpy as np
+import pandas as pd
+from order.order import OrderType, OrderDirection, reserve_order_ids
+from portfolio.portfolio import Portfolio
+
+CHECKPOINT_FORMAT = 'portfolio-checkpoint'
+CHECKPOINT_VERSION = 1
+TABLES = ('position_df', 'open_orders_df', 'filled_orders_df', 'portfolio_history_df', 'option_positions_df')
+# Tables Portfolio only ever appends to by concat, which allocates new arrays, so forks can share
+# the checkpoint's arrays for them instead of copying. History is not one of them: marking the
+# same timestamp twice overwrites that row in place through .loc
+SHARED_TABLES = ('filled_orders_df',)
+ENUMS = {'OrderType': OrderType, 'OrderDirection': OrderDirection}
+
+def _encode_column(values):
+    # One column as (kind, plain numpy array, categories) so it saves without pickle. Symbols,
+    # order ids held as strings and enums are dictionary encoded: small integer codes plus
+    # the distinct values in the header.
+    if values.dtype.kind in 'biuf':
+        return 'number', values.to_numpy(), None
+    if values.dtype.kind == 'M':
+        return 'time', values.to_numpy(dtype='datetime64[ns]'), None
+    nulls = values.isna().to_numpy()
+    first = values[~nulls].iloc[0] if not nulls.all() else None
+    if isinstance(first, (OrderType, OrderDirection)) and not nulls.any():
+        codes, uniques = pd.factorize(values)
+        return type(first).__name__, codes.astype(np.int32), [value.value for value in uniques]
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred in ('datetime', 'datetime64', 'date'):
+        return 'time', pd.to_datetime(values).to_numpy(dtype='datetime64[ns]'), None
+    if inferred == 'string' and not nulls.any():
+        codes, uniques = pd.factorize(values)
+        return 'category', codes.astype(np.int32), list(uniques)
+    if inferred == 'boolean' and not nulls.any():
+        return 'number', values.to_numpy(dtype=bool), None
+    if inferred == 'integer' and not nulls.any():
+        return 'number', values.to_numpy(dtype=np.int64), None
+    if inferred in ('integer', 'floating', 'mixed-integer-float', 'boolean', 'empty'):
+        return 'number', values.astype(float).to_numpy(), None
+    raise TypeError(f"Cannot checkpoint column {values.name!r} of {inferred} values")
+
+def _decode_column(kind, array, categories):
+    if kind == 'category':
+        return np.array(categories, dtype=object)[array]
+    if kind in ENUMS:
+        return np.array([ENUMS[kind](value) for value in categories], dtype=object)[array]
+    return array
+
+class Checkpoint:
+    # A Portfolio's cash and tables as read-only column arrays plus a JSON header. Save it with
+    # save(), load it in any process with Checkpoint.load(), and branch continuations with fork().
+
+    def __init__(self, header, arrays):
+        if header.get('format') != CHECKPOINT_FORMAT:
+            raise ValueError("Not a portfolio checkpoint")
+        if header.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {header.get('version')}, expected {CHECKPOINT_VERSION}")
+        self.header = header
+        self.arrays = arrays
+        self._columns = {}
+        self._template = None
+        for array in arrays.values():
+            array.flags.writeable = False
+
+    @classmethod
+    def capture(cls, portfolio):
+        if portfolio._routed_orders:
+            raise ValueError("Orders resting in a fill_source book cannot be checkpointed")
+        tables = {}
+        arrays = {}
+        for table in TABLES:
+            frame = getattr(portfolio, table)
+            columns = [('__index__', pd.Series(frame.index, name='__index__'))] + [(name, frame[name]) for name in frame.columns]
+            spec = []
+            for position, (name, values) in enumerate(columns):
+                kind, array, categories = _encode_column(values)
+                arrays[f'{table}.{position}'] = np.array(array, copy=True)
+                spec.append([name, kind, categories])
+            tables[table] = {'columns': spec, 'index_name': frame.index.name}
+        header = {
+            'format': CHECKPOINT_FORMAT,
+            'version': CHECKPOINT_VERSION,
+            'initial_capital': float(portfolio.initial_capital),
+            'current_cash': float(portfolio.current_cash),
+            'tables': tables,
+        }
+        return cls(header, arrays)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def save(self, path, compress=False):
+        header = np.frombuffer(json.dumps(self.header).encode(), dtype=np.uint8)
+        (np.savez_compressed if compress else np.savez)(path, __header__=header, **self.arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as archive:
+            header = json.loads(archive['__header__'].tobytes().decode())
+            arrays = {name: archive[name] for name in archive.files if name != '__header__'}
+        checkpoint = cls(header, arrays)
+        # Orders placed after a restore in a fresh process must not reuse a checkpointed id
+        reserve_order_ids([order_id for table in ('open_orders_df', 'filled_orders_df')
+                           for order_id in checkpoint._decoded(table).get('order_id', ())])
+        return checkpoint
+
+    def _decoded(self, table):
+        # Decoded once per checkpoint and shared read-only by every fork
+        columns = self._columns.get(table)
+        if columns is None:
+            spec = self.header['tables'][table]['columns']
+            columns = {}
+            for position, (name, kind, categories) in enumerate(spec):
+                column = _decode_column(kind, self.arrays[f'{table}.{position}'], categories)
+                column.flags.writeable = False
+                columns[name] = column
+            self._columns[table] = columns
+        return columns
+
+    def _frame(self, table, share):
+        columns = dict(self._decoded(table))
+        index = pd.Index(columns.pop('__index__'), name=self.header['tables'][table]['index_name'], copy=not share)
+        if not share:
+            columns = {name: np.array(values, copy=True) for name, values in columns.items()}
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def fork(self, cost_model=None, fill_source=None):
+        # A new Portfolio continuing from this state. The append-only fills table shares this
+        # checkpoint's read-only arrays until the fork appends to it; the tables Portfolio
+        # writes in place (positions, open orders, history) are copied, so forks never
+        # affect each other.
+        if self._template is None:
+            # Portfolio() builds five empty frames; copying a blank one skips that per fork
+            self._template = Portfolio(initial_capital=self.header['initial_capital'])
+        portfolio = copy.copy(self._template)
+        for name, value in vars(self._template).items():
+            if isinstance(value, (dict, list, set)):
+                setattr(portfolio, name, copy.copy(value))
+        portfolio.cost_model = cost_model
+        portfolio.fill_source = fill_source
+        portfolio.current_cash = self.header['current_cash']
+        for table in TABLES:
+            setattr(portfolio, table, self._frame(table, table in SHARED_TABLES))
+        if fill_source is not None:
+            portfolio.route_open_orders()
+        return portfolio
+
+def save_checkpoint(portfolio, path, compress=False):
+    return Checkpoint.capture(portfolio).save(path, compress)
+
+def load_checkpoint(path, cost_model=None, fill_source=None):
+    return Checkpoint.load(path).fork(cost_model, fill_source)
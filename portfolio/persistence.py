@@ -0,0 +1,345 @@
+import queue
+import threading
+import time
+import pandas as pd
+from peewee import (SqliteDatabase, Model, AutoField, CharField, IntegerField, BigIntegerField, FloatField,
+                    BooleanField, chunked)
+from order.order import OrderType, OrderDirection, reserve_order_ids
+from portfolio.portfolio import Portfolio
+
+FILL_COLUMNS = ['order_id', 'symbol', 'order_type', 'direction', 'quantity', 'open_price', 'open_time',
+                'fill_price', 'fill_time', 'commission', 'pnl']
+OPEN_ORDER_COLUMNS = ['order_id', 'symbol', 'order_type', 'direction', 'quantity', 'open_price', 'open_time',
+                      'limit_price', 'stop_price', 'filled']
+POSITION_COLUMNS = ['symbol', 'quantity', 'avg_price', 'market_value', 'unrealized_pnl']
+OPTION_COLUMNS = ['contract', 'underlying', 'option_type', 'strike_price', 'expiration_date', 'multiplier',
+                  'quantity', 'avg_price', 'market_price', 'market_value', 'unrealized_pnl',
+                  'delta', 'gamma', 'vega', 'theta', 'rho']
+HISTORY_COLUMNS = ['timestamp', 'total_value', 'cash', 'positions_value', 'returns']
+TIME_COLUMNS = {'open_time', 'fill_time', 'timestamp', 'expiration_date'}
+TABLE_COLUMNS = {'fills': FILL_COLUMNS, 'open_orders': OPEN_ORDER_COLUMNS, 'positions': POSITION_COLUMNS,
+                 'options': OPTION_COLUMNS, 'history': HISTORY_COLUMNS}
+
+def _build_models(db):
+    # One set of models per database, so several stores can be open at once.
+    # Times are stored as integer nanoseconds, which keeps range queries on the indexes cheap.
+    class BaseModel(Model):
+        class Meta:
+            database = db
+
+    class PortfolioState(BaseModel):
+        portfolio = CharField(primary_key=True)
+        initial_capital = FloatField()
+        current_cash = FloatField()
+        updated_at = BigIntegerField()
+
+    class Fill(BaseModel):
+        id = AutoField()
+        portfolio = CharField()
+        seq = IntegerField()
+        order_id = CharField()
+        symbol = CharField()
+        order_type = CharField()
+        direction = CharField()
+        quantity = FloatField()
+        open_price = FloatField(null=True)
+        open_time = BigIntegerField(null=True)
+        fill_price = FloatField(null=True)
+        fill_time = BigIntegerField(null=True)
+        commission = FloatField(null=True)
+        pnl = FloatField(null=True)
+
+        class Meta:
+            indexes = ((('portfolio', 'seq'), True), (('portfolio', 'symbol', 'fill_time'), False),
+                       (('portfolio', 'fill_time'), False))
+
+    class OpenOrder(BaseModel):
+        id = AutoField()
+        portfolio = CharField(index=True)
+        order_id = CharField()
+        symbol = CharField()
+        order_type = CharField()
+        direction = CharField()
+        quantity = FloatField()
+        open_price = FloatField(null=True)
+        open_time = BigIntegerField(null=True)
+        limit_price = FloatField(null=True)
+        stop_price = FloatField(null=True)
+        filled = BooleanField()
+
+    class Position(BaseModel):
+        id = AutoField()
+        portfolio = CharField(index=True)
+        symbol = CharField()
+        quantity = FloatField()
+        avg_price = FloatField()
+        market_value = FloatField(null=True)
+        unrealized_pnl = FloatField(null=True)
+
+    class OptionPosition(BaseModel):
+        id = AutoField()
+        portfolio = CharField(index=True)
+        contract = CharField()
+        underlying = CharField()
+        option_type = CharField()
+        strike_price = FloatField()
+        expiration_date = BigIntegerField()
+        multiplier = FloatField()
+        quantity = FloatField()
+        avg_price = FloatField()
+        market_price = FloatField(null=True)
+        market_value = FloatField(null=True)
+        unrealized_pnl = FloatField(null=True)
+        delta = FloatField(null=True)
+        gamma = FloatField(null=True)
+        vega = FloatField(null=True)
+        theta = FloatField(null=True)
+        rho = FloatField(null=True)
+
+    class History(BaseModel):
+        id = AutoField()
+        portfolio = CharField()
+        timestamp = BigIntegerField()
+        total_value = FloatField()
+        cash = FloatField()
+        positions_value = FloatField()
+        returns = FloatField()
+
+        class Meta:
+            indexes = ((('portfolio', 'timestamp'), True),)
+
+    return {'state': PortfolioState, 'fills': Fill, 'open_orders': OpenOrder, 'positions': Position,
+            'options': OptionPosition, 'history': History}
+
+def _ns(value):
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).value
+
+def _value(value, column):
+    if column in TIME_COLUMNS:
+        return _ns(value)
+    if column == 'order_id':
+        return str(value)
+    if isinstance(value, (OrderType, OrderDirection)):
+        return value.value
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def _rows(frame, columns, name, first_seq=None):
+    # DataFrame rows as plain tuples for insert_many, prefixed with the portfolio name (and a
+    # sequence number). Column-wise tolist() avoids pandas' per-row overhead on small frames.
+    values = [frame.index.tolist() if column == frame.index.name else frame[column].tolist() for column in columns]
+    rows = []
+    for position, record in enumerate(zip(*values)):
+        prefix = (name,) if first_seq is None else (name, first_seq + position)
+        rows.append(prefix + tuple(_value(value, column) for value, column in zip(record, columns)))
+    return rows
+
+def _order_id(value):
+    return int(value) if value.isdigit() else value
+
+class PortfolioStore:
+    # Persists Portfolio state to SQLite. sync() only queues what changed since the last call;
+    # a background thread turns it into rows and writes the queue in batched transactions, so
+    # the trading loop never waits on disk. Fills and history rows are appended, the small
+    # tables are replaced.
+
+    def __init__(self, path, batch_size=1000, flush_interval=0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.database = SqliteDatabase(path, pragmas={'journal_mode': 'wal', 'synchronous': 'normal'})
+        self.models = _build_models(self.database)
+        with self.database.connection_context():
+            self.database.create_tables(list(self.models.values()))
+        self._synced = {}
+        self._error = None
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name='portfolio-store-writer', daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sync(self, portfolio, name='default'):
+        if self._error is not None:
+            raise self._error
+        state = self._synced.setdefault(name, {'fills': 0, 'history': 0})
+        put = self._queue.put
+
+        # Frames are queued as copies (the Portfolio keeps writing to its own in place) and
+        # turned into rows on the writer thread
+        fills = portfolio.filled_orders_df
+        if len(fills) > state['fills']:
+            put(('fills', name, (fills.iloc[state['fills']:].copy(), state['fills'])))
+            state['fills'] = len(fills)
+
+        # The last history row is resent because a repeated timestamp overwrites it in place
+        history = portfolio.portfolio_history_df
+        start = max(state['history'] - 1, 0)
+        if len(history) > start:
+            put(('history', name, (history.iloc[start:].copy(), None)))
+            state['history'] = len(history)
+
+        # The small tables are only requeued when they differ from the copy sent last time
+        for kind, frame in (('open_orders', portfolio.open_orders_df), ('positions', portfolio.position_df),
+                            ('options', portfolio.option_positions_df)):
+            previous = state.get(kind)
+            if previous is None or not frame.equals(previous):
+                state[kind] = frame.copy()
+                put((kind, name, (state[kind], None)))
+
+        put(('state', name, (portfolio.initial_capital, portfolio.current_cash, time.time_ns())))
+
+    def _run(self):
+        self.database.connect(reuse_if_open=True)
+        try:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                # Whatever arrives within flush_interval shares one transaction
+                while len(batch) < self.batch_size and batch[-1][0] not in ('flush', 'stop'):
+                    try:
+                        batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                    except queue.Empty:
+                        break
+                if self._write_batch(batch):
+                    return
+        finally:
+            self.database.close()
+
+    def _write_batch(self, batch):
+        # Waiters are released and 'stop' is honoured whatever happens to the transaction. After
+        # a failed write the store is failed for good: sync() has already advanced past the lost
+        # rows, so later batches are dropped rather than committed with a gap, and sync(),
+        # flush() and close() raise the original error.
+        events = [payload for kind, _, payload in batch if kind in ('flush', 'stop')]
+        stop = any(kind == 'stop' for kind, _, _ in batch)
+        try:
+            if self._error is None:
+                with self.database.atomic():
+                    for kind, name, payload in batch:
+                        if kind not in ('flush', 'stop'):
+                            self._apply(kind, name, payload)
+        except Exception as e:
+            self._error = e
+        finally:
+            for event in events:
+                event.set()
+        return stop
+
+    def _apply(self, kind, name, payload):
+        model = self.models[kind]
+        if kind == 'state':
+            model.insert(portfolio=name, initial_capital=payload[0], current_cash=payload[1],
+                         updated_at=payload[2]).on_conflict_replace().execute()
+            return
+        frame, first_seq = payload
+        columns = TABLE_COLUMNS[kind]
+        rows = _rows(frame, columns, name, first_seq)
+        if kind == 'fills':
+            fields = [model.portfolio, model.seq] + [getattr(model, column) for column in columns]
+        else:
+            if kind != 'history':
+                model.delete().where(model.portfolio == name).execute()
+            fields = [model.portfolio] + [getattr(model, column) for column in columns]
+        for chunk in chunked(rows, max(1, 900 // len(fields))):
+            model.insert_many(chunk, fields=fields).on_conflict_replace().execute()
+
+    def flush(self, timeout=None):
+        # Blocks until everything queued so far is committed
+        event = threading.Event()
+        self._queue.put(('flush', None, event))
+        event.wait(timeout)
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self._writer.is_alive():
+            event = threading.Event()
+            self._queue.put(('stop', None, event))
+            event.wait()
+            self._writer.join()
+        if self._error is not None:
+            raise self._error
+
+    def _frame(self, kind, columns, where):
+        model = self.models[kind]
+        query = model.select(*[getattr(model, column) for column in columns]).where(where)
+        if kind in ('fills', 'history'):
+            query = query.order_by(model.seq if kind == 'fills' else model.timestamp)
+        with self.database.connection_context():
+            frame = pd.DataFrame(list(query.tuples()), columns=columns)
+        for column in TIME_COLUMNS.intersection(columns):
+            frame[column] = pd.to_datetime(frame[column].astype('Int64'), unit='ns')
+        if 'order_id' in columns:
+            frame['order_id'] = frame['order_id'].map(_order_id)
+        return frame
+
+    def fills(self, name='default', symbol=None, start=None, end=None):
+        # Uses the (portfolio, symbol, fill_time) or (portfolio, fill_time) index
+        model = self.models['fills']
+        where = model.portfolio == name
+        if symbol is not None:
+            where &= model.symbol == symbol
+        if start is not None:
+            where &= model.fill_time >= _ns(start)
+        if end is not None:
+            where &= model.fill_time <= _ns(end)
+        return self._frame('fills', FILL_COLUMNS, where)
+
+    def history(self, name='default', start=None, end=None):
+        model = self.models['history']
+        where = model.portfolio == name
+        if start is not None:
+            where &= model.timestamp >= _ns(start)
+        if end is not None:
+            where &= model.timestamp <= _ns(end)
+        return self._frame('history', HISTORY_COLUMNS, where).set_index('timestamp')
+
+    def portfolios(self):
+        model = self.models['state']
+        with self.database.connection_context():
+            return [row[0] for row in model.select(model.portfolio).order_by(model.portfolio).tuples()]
+
+    def load_portfolio(self, name='default', cost_model=None, fill_source=None):
+        # Rebuilds a Portfolio from its last synced state; later sync() calls continue incrementally
+        self.flush()
+        state_model = self.models['state']
+        with self.database.connection_context():
+            state = state_model.get_or_none(state_model.portfolio == name)
+        if state is None:
+            raise ValueError(f"No portfolio named {name} in {self.path}")
+        portfolio = Portfolio(initial_capital=state.initial_capital, cost_model=cost_model, fill_source=fill_source)
+        portfolio.current_cash = state.current_cash
+
+        portfolio.filled_orders_df = self.fills(name)
+        portfolio.portfolio_history_df = self.history(name)
+        open_orders = self._frame('open_orders', OPEN_ORDER_COLUMNS, self.models['open_orders'].portfolio == name)
+        open_orders['order_type'] = open_orders['order_type'].map(OrderType)
+        open_orders['direction'] = open_orders['direction'].map(OrderDirection)
+        portfolio.open_orders_df = open_orders
+        positions = self._frame('positions', POSITION_COLUMNS, self.models['positions'].portfolio == name)
+        if not positions.empty:
+            portfolio.position_df = positions.set_index('symbol')
+        options = self._frame('options', OPTION_COLUMNS, self.models['options'].portfolio == name)
+        if not options.empty:
+            portfolio.option_positions_df = options.set_index('contract')
+        reserve_order_ids(list(open_orders['order_id']) + list(portfolio.filled_orders_df['order_id']))
+
+        self._synced[name] = {
+            'fills': len(portfolio.filled_orders_df),
+            'history': len(portfolio.portfolio_history_df),
+            'open_orders': portfolio.open_orders_df.copy(),
+            'positions': portfolio.position_df.copy(),
+            'options': portfolio.option_positions_df.copy(),
+        }
+        if fill_source is not None:
+            # After the sync snapshot, so fills the restored orders make on entering the book are saved next sync
+            portfolio.route_open_orders()
+        return portfolio
@@ -6,19 +6,38 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 from order.order import Order, OrderDirection, OrderType, LimitOrder, StopOrder
+from data.option_pricer import black_scholes, option_symbol, GREEK_NAMES
 
 class Portfolio:
 
-    def __init__(self, initial_capital=10000):
+    def __init__(self, initial_capital=10000, cost_model=None, fill_source=None):
         self.initial_capital = initial_capital
+        self.cost_model = cost_model
+        # fill_source (e.g. order.order_book.MatchingEngine) replaces reference-price fills
+        self.fill_source = fill_source
+        self._routed_orders = {}
+        self._book_fills = []
         self.current_cash = initial_capital
         self.position_df = pd.DataFrame(columns=['symbol','quantity','avg_price','market_value','unrealized_pnl']).set_index('symbol')
         self.open_orders_df = pd.DataFrame(columns=['order_id','symbol','order_type','direction','quantity','open_price','open_time','limit_price','stop_price','filled'])
-        self.filled_orders_df = pd.DataFrame(columns=['order_id','symbol','order_type','direction','quantity','open_price','open_time','fill_price','fill_time','pnl'])
+        self.filled_orders_df = pd.DataFrame(columns=['order_id','symbol','order_type','direction','quantity','open_price','open_time','fill_price','fill_time','commission','pnl'])
         self.portfolio_history_df = pd.DataFrame(columns=['timestamp','total_value','cash','positions_value','returns']).set_index('timestamp')
+        self.option_positions_df = pd.DataFrame(columns=['contract','underlying','option_type','strike_price','expiration_date','multiplier',
+                                                         'quantity','avg_price','market_price','market_value','unrealized_pnl','delta','gamma','vega','theta','rho']).set_index('contract')
+        self._option_book = None
 
     def add_order(self, order, limit_price = None, stop_price = None):
-        
+        if self.fill_source is not None and order.direction == OrderDirection.LONG:
+            # Book fills can arrive inside submit(), so a buy the cash cannot cover at its
+            # limit (or reference) price is refused before it reaches the book
+            price = limit_price if limit_price is not None else order.open_price
+            if price is not None:
+                cost = order.quantity * price
+                if self.cost_model is not None:
+                    cost += float(self.cost_model.commission(price, order.quantity))
+                if cost > self.current_cash:
+                    raise ValueError(f"Insufficient cash to buy {order.quantity} shares of {order.symbol} at {price}")
+
         new_order = {
             'order_id': order.order_id,
             'symbol': order.symbol,
@@ -37,27 +56,100 @@ class Portfolio:
             pd.DataFrame([new_order])
         ], ignore_index=True)
 
-    def execute_market_order(self, order, current_price):
+        if self.fill_source is not None:
+            self._route_order(order)
+
+    def _route_order(self, order):
+        self._routed_orders[order.order_id] = order
+        try:
+            self.fill_source.submit(order, listener=self._on_book_fill, timestamp=order.open_time)
+        finally:
+            if order.order_type == OrderType.MARKET and order.order_id in self._routed_orders:
+                # Market orders are immediate-or-cancel against the book
+                del self._routed_orders[order.order_id]
+                self._drop_open_order(order.order_id)
+
+    def route_open_orders(self):
+        # Submits restored open orders to fill_source, e.g. after loading a saved portfolio
+        if self.fill_source is None:
+            raise ValueError("Portfolio has no fill_source to route orders to")
+        for _, order_row in self.open_orders_df.iterrows():
+            if not order_row['filled'] and order_row['order_id'] not in self._routed_orders:
+                self._route_order(self._create_order_from_row(order_row))
+
+    def cancel_order(self, order_id):
+        order = self._routed_orders.pop(order_id, None)
+        if order is not None:
+            self.fill_source.cancel(order.symbol, order_id)
+        return self._drop_open_order(order_id)
+
+    def _drop_open_order(self, order_id):
+        mask = self.open_orders_df['order_id'] == order_id
+        if not mask.any():
+            return False
+        self.open_orders_df = self.open_orders_df[~mask]
+        return True
+
+    def _on_book_fill(self, order_id, fill_price, quantity, timestamp):
+        order = self._routed_orders[order_id]
+        fill = Order(order.symbol, order.order_type, order.direction, quantity,
+                     order.open_price, order.open_time, order_id=order.order_id)
+        commission = 0.0
+        if self.cost_model is not None:
+            commission = float(self.cost_model.commission(fill_price, quantity))
+        fill.fill(fill_price, commission=commission, timestamp=timestamp)
+        try:
+            self._update_positions(fill, fill_price, commission)
+        except ValueError:
+            # The book has already traded this quantity, so the order cannot stay open for more
+            del self._routed_orders[order_id]
+            self.fill_source.cancel(order.symbol, order_id)
+            self._drop_open_order(order_id)
+            raise
+        self._record_fill(fill)
+        self._book_fills.append(fill)
+
+        row = self.open_orders_df.index[self.open_orders_df['order_id'] == order_id][0]
+        remaining = self.open_orders_df.at[row, 'quantity'] - quantity
+        if remaining > 0:
+            self.open_orders_df.at[row, 'quantity'] = remaining
+        else:
+            self.open_orders_df.at[row, 'filled'] = True
+            del self._routed_orders[order_id]
+
+    def _record_fill(self, order, symbol=None):
+        filled_order = {
+            'order_id': order.order_id,
+            'symbol': symbol or order.symbol,
+            'order_type': order.order_type.value,
+            'direction': order.direction.value,
+            'quantity': order.quantity,
+            'open_price': order.open_price,
+            'open_time': order.open_time,
+            'fill_price': order.fill_price,
+            'fill_time': order.fill_time,
+            'commission': order.commission,
+            'pnl': order.pnl
+        }
+        self.filled_orders_df = pd.concat([
+            self.filled_orders_df,
+            pd.DataFrame([filled_order])
+        ], ignore_index=True)
+
+    def execute_market_order(self, order, current_price, volume=None, timestamp=None):
         try:
-            success = order.execute_order(current_price)
+            success = order.execute_order(current_price, timestamp)
             if success:
-                self._update_positions(order, current_price)
-                filled_order = {
-                    'order_id': order.order_id,
-                    'symbol': order.symbol,
-                    'order_type': order.order_type.value,
-                    'direction': order.direction.value,
-                    'quantity': order.quantity,
-                    'open_price': order.open_price,
-                    'open_time': order.open_time,
-                    'fill_price': order.fill_price,
-                    'fill_time': order.fill_time,
-                    'pnl': order.pnl
-                }
-                self.filled_orders_df = pd.concat([
-                    self.filled_orders_df,
-                    pd.DataFrame([filled_order])
-                ], ignore_index=True)
+                fill_price, commission = current_price, 0.0
+                if self.cost_model is not None:
+                    side = 1 if order.direction == OrderDirection.LONG else -1
+                    fill_price, fill_qty, commission = self.cost_model.apply(current_price, order.quantity, side, volume)
+                    if fill_qty <= 0:
+                        self._reset_fill(order)
+                        return False
+                    order.fill(fill_price, fill_qty, commission, order.fill_time)
+                self._update_positions(order, fill_price, commission)
+                self._record_fill(order)
                 return success
         except ValueError as e:
             # Re-raise ValueError (like insufficient cash) without wrapping
@@ -67,7 +159,21 @@ class Portfolio:
         finally:
             pass
     
-    def check_pending_orders(self, market_data):
+    @staticmethod
+    def _reset_fill(order):
+        # Undo execute_order() when the cost model leaves nothing to fill
+        order.filled = False
+        order.fill_price = None
+        order.fill_time = None
+        order.commission = 0.0
+        order.pnl = None
+
+    def check_pending_orders(self, market_data, volume_data=None, timestamp=None):
+
+        if self.fill_source is not None:
+            # Fills arrive from the book as they match; report those since the last call
+            executed_orders, self._book_fills = self._book_fills, []
+            return executed_orders
 
         executed_orders = []
 
@@ -79,10 +185,17 @@ class Portfolio:
                 continue
             current_price = market_data[symbol]
             order = self._create_order_from_row(order_row)
-            order.execute_order(current_price)
+            order.execute_order(current_price, timestamp)
             if order.filled:
-                self.execute_market_order(order, current_price)
-                self.open_orders_df.at[idx, 'filled'] = True
+                volume = volume_data.get(symbol) if volume_data else None
+                if not self.execute_market_order(order, current_price, volume, timestamp):
+                    continue
+                # A partial fill leaves the remainder open for later bars
+                remaining = order_row['quantity'] - order.quantity
+                if remaining > 0:
+                    self.open_orders_df.at[idx, 'quantity'] = remaining
+                else:
+                    self.open_orders_df.at[idx, 'filled'] = True
                 executed_orders.append(order)
         
         return executed_orders
@@ -98,7 +211,8 @@ class Portfolio:
                 quantity=order_row['quantity'],
                 limit_price=order_row['limit_price'],
                 open_price=order_row['open_price'],
-                timestamp=order_row['open_time']
+                timestamp=order_row['open_time'],
+                order_id=order_row['order_id']
             )
         elif order_type == OrderType.STOP:
             return StopOrder(
@@ -107,7 +221,8 @@ class Portfolio:
                 quantity=order_row['quantity'],
                 stop_price=order_row['stop_price'],
                 open_price=order_row['open_price'],
-                timestamp=order_row['open_time']
+                timestamp=order_row['open_time'],
+                order_id=order_row['order_id']
             )
         else:
             return Order(
@@ -116,21 +231,22 @@ class Portfolio:
                 direction=direction,
                 quantity=order_row['quantity'],
                 open_price=order_row['open_price'],
-                timestamp=order_row['open_time']
+                timestamp=order_row['open_time'],
+                order_id=order_row['order_id']
             )
 
-    def _update_positions(self, order, current_price):
+    def _update_positions(self, order, current_price, commission=0.0):
         symbol = order.symbol
         quantity = order.quantity
         direction = order.direction
         cost = quantity * current_price
 
         if direction == OrderDirection.LONG:
-            if cost > self.current_cash:
+            if cost + commission > self.current_cash:
                 raise ValueError(f"Insufficient cash to buy {quantity} shares of {symbol} at {current_price}")
-            self.current_cash -= cost
+            self.current_cash -= cost + commission
         else:
-            self.current_cash += cost
+            self.current_cash += cost - commission
         
         current_qty = 0
         if symbol not in self.position_df.index:
@@ -153,13 +269,19 @@ class Portfolio:
             new_qty = 0.0
             if direction == OrderDirection.LONG:
                 new_qty = current_qty + quantity
-                if current_qty * new_qty >= 0:
+                if new_qty == 0:
+                    # Flat: no cost basis left to average
+                    new_avg = 0.0
+                elif current_qty * new_qty >= 0:
                     new_avg = (current_pos['avg_price'] * abs(current_qty) + current_price * quantity) / abs(new_qty)
                 else:
                     new_avg = current_price if abs(new_qty) > abs(current_qty) else current_pos['avg_price']
             else:
                 new_qty = current_qty - quantity
-                if current_qty * new_qty >= 0:
+                if new_qty == 0:
+                    # Flat: no cost basis left to average
+                    new_avg = 0.0
+                elif current_qty * new_qty >= 0:
                     new_avg = (current_pos['avg_price'] * abs(current_qty) + current_price * quantity) / abs(new_qty)
                 else:
                     new_avg = current_price if abs(new_qty) > abs(current_qty) else current_pos['avg_price']
@@ -184,6 +306,9 @@ class Portfolio:
             total_positions_value = market_values.sum()
         else:
             total_positions_value = 0.0
+
+        if not self.option_positions_df.empty:
+            total_positions_value += self.option_positions_df['market_value'].sum()
         
         total_value = self.current_cash + total_positions_value
         
@@ -196,6 +321,140 @@ class Portfolio:
         
         self.portfolio_history_df.loc[timestamp] = new_record
 
+    def execute_option_order(self, order, current_price, option_type, strike_price, expiration_date, multiplier=100,
+                             volume=None, timestamp=None):
+        # order.symbol is the underlying; the position is keyed by the OCC contract symbol
+        if option_type not in ('call', 'put'):
+            raise ValueError(f"Unknown option type: {option_type}")
+        contract = option_symbol(order.symbol, expiration_date, option_type, strike_price)
+        try:
+            success = order.execute_order(current_price, timestamp)
+            if success:
+                fill_price, commission = current_price, 0.0
+                if self.cost_model is not None:
+                    # Impact moves the premium; commission sees each contract's value (premium
+                    # times multiplier), so percentage-of-value caps apply to the notional
+                    cost_model = self.cost_model
+                    side = 1 if order.direction == OrderDirection.LONG else -1
+                    fill_qty = cost_model.fill_quantity(order.quantity, volume)
+                    if fill_qty <= 0:
+                        self._reset_fill(order)
+                        return False
+                    fill_price = float(current_price + side * cost_model.price_impact(current_price, fill_qty, volume))
+                    commission = float(cost_model.commission(fill_price * multiplier, fill_qty))
+                    order.fill(fill_price, fill_qty, commission, order.fill_time)
+                self._update_option_position(order, contract, fill_price, option_type,
+                                             strike_price, expiration_date, multiplier, commission)
+                self._record_fill(order, contract)
+                return success
+        except ValueError as e:
+            raise
+        except Exception as e:
+            raise Exception(f"Execute option order {order.order_id} with unexpect error {e}")
+
+    def _update_option_position(self, order, contract, current_price, option_type, strike_price, expiration_date,
+                                multiplier, commission=0.0):
+        quantity = order.quantity
+        cost = quantity * current_price * multiplier
+        signed_qty = quantity if order.direction == OrderDirection.LONG else -quantity
+
+        if order.direction == OrderDirection.LONG:
+            if cost + commission > self.current_cash:
+                raise ValueError(f"Insufficient cash to buy {quantity} contracts of {contract} at {current_price}")
+            self.current_cash -= cost + commission
+        else:
+            self.current_cash += cost - commission
+
+        if contract not in self.option_positions_df.index:
+            self.option_positions_df.loc[contract] = {
+                'underlying': order.symbol,
+                'option_type': option_type,
+                'strike_price': float(strike_price),
+                'expiration_date': pd.Timestamp(expiration_date),
+                'multiplier': multiplier,
+                'quantity': signed_qty,
+                'avg_price': current_price,
+                'market_price': current_price,
+                'market_value': signed_qty * current_price * multiplier,
+                'unrealized_pnl': 0.0,
+                'delta': 0.0, 'gamma': 0.0, 'vega': 0.0, 'theta': 0.0, 'rho': 0.0
+            }
+            self._option_book = None
+        else:
+            current_qty = self.option_positions_df.at[contract, 'quantity']
+            current_avg = self.option_positions_df.at[contract, 'avg_price']
+            new_qty = current_qty + signed_qty
+            if new_qty == 0:
+                new_avg = current_avg
+            elif current_qty * new_qty >= 0 and abs(new_qty) > abs(current_qty):
+                new_avg = (current_avg * abs(current_qty) + current_price * quantity) / abs(new_qty)
+            elif current_qty * new_qty < 0:
+                new_avg = current_price
+            else:
+                new_avg = current_avg
+            self.option_positions_df.at[contract, 'quantity'] = new_qty
+            self.option_positions_df.at[contract, 'avg_price'] = new_avg
+            self.option_positions_df.at[contract, 'market_price'] = current_price
+            self.option_positions_df.at[contract, 'market_value'] = new_qty * current_price * multiplier
+            self._option_book = None
+
+    def _get_option_book(self):
+        # Contract terms only change on fills, so they are cached as arrays between bars
+        if self._option_book is None:
+            book = self.option_positions_df
+            self._option_book = {
+                'groups': book.groupby('underlying').indices,
+                'strikes': book['strike_price'].to_numpy(dtype=float),
+                'expiry_ns': pd.DatetimeIndex(book['expiration_date']).asi8,
+                'is_call': (book['option_type'] == 'call').to_numpy(),
+                'multipliers': book['multiplier'].to_numpy(dtype=float),
+                'quantities': book['quantity'].to_numpy(dtype=float),
+                'avg_prices': book['avg_price'].to_numpy(dtype=float),
+            }
+        return self._option_book
+
+    def update_option_values(self, market_data, timestamp, volatility, risk_free_rate=0.05):
+        # Marks the option book with one vectorized pricer call per underlying
+        if self.option_positions_df.empty:
+            return
+        cache = self._get_option_book()
+        strikes = cache['strikes']
+        years = (cache['expiry_ns'] - pd.Timestamp(timestamp).value) / (365.25 * 86400e9)
+        is_call = cache['is_call']
+        multipliers = cache['multipliers']
+        quantities = cache['quantities']
+
+        book = self.option_positions_df
+        prices = np.array(book['market_price'], dtype=float)
+        greeks = {name: np.array(book[name], dtype=float) for name in GREEK_NAMES}
+        for underlying, rows in cache['groups'].items():
+            if underlying not in market_data:
+                continue
+            sigma = volatility[underlying] if isinstance(volatility, dict) else volatility
+            rate = risk_free_rate[underlying] if isinstance(risk_free_rate, dict) else risk_free_rate
+            if hasattr(rate, 'rate'):
+                # RateCurve or RateCurveCache: one rate per position maturity, as of this bar
+                rate = rate.rate(years[rows], as_of=timestamp)
+            results = black_scholes(market_data[underlying], strikes[rows], years[rows], rate, sigma, is_call[rows])
+            prices[rows] = results['price']
+            for name in GREEK_NAMES:
+                greeks[name][rows] = results[name] * quantities[rows] * multipliers[rows]
+
+        self.option_positions_df['market_price'] = prices
+        self.option_positions_df['market_value'] = quantities * prices * multipliers
+        self.option_positions_df['unrealized_pnl'] = (prices - cache['avg_prices']) * quantities * multipliers
+        for name in GREEK_NAMES:
+            self.option_positions_df[name] = greeks[name]
+
+    def get_option_greeks(self):
+        # Position greeks are already scaled by quantity and multiplier
+        columns = ['market_value', 'unrealized_pnl'] + list(GREEK_NAMES)
+        if self.option_positions_df.empty:
+            return pd.DataFrame(columns=columns)
+        by_underlying = self.option_positions_df.groupby('underlying')[columns].sum()
+        by_underlying.loc['TOTAL'] = by_underlying.sum()
+        return by_underlying
+
     def get_portfolio_summary(self):
         if self.portfolio_history_df.empty:
             return {}
@@ -213,9 +472,16 @@ class Portfolio:
             'positions_count': len(self.position_df),
             'open_orders_count': open_orders_count,
             'filled_orders_count': len(self.filled_orders_df),
+            'total_commission': self.filled_orders_df['commission'].sum() if not self.filled_orders_df.empty else 0.0,
             'unrealized_pnl_total': self.position_df['unrealized_pnl'].sum() if not self.position_df.empty else 0.0
         }
 
+    def get_performance_metrics(self, periods_per_year=252, risk_free_rate=0.0):
+        from portfolio.analytics import metrics_from_history
+        if len(self.portfolio_history_df) < 2:
+            return {}
+        return metrics_from_history(self.portfolio_history_df, periods_per_year, risk_free_rate)
+
     def get_position_analysis(self):
         if self.position_df.empty:
             return pd.DataFrame()
@@ -234,4 +500,11 @@ class Portfolio:
         
         analysis_df['pnl_pct'] = analysis_df['pnl_pct'].replace([np.inf, -np.inf], 0).fillna(0)
         
-        return analysis_df
\ No newline at end of file
+        return analysis_df
+
+    def get_risk_analysis(self, returns, confidence=0.95, shrinkage=None, benchmark_returns=None):
+        from portfolio.risk import PortfolioRisk
+        if self.position_df.empty:
+            raise ValueError("Cannot compute risk for an empty portfolio")
+        return PortfolioRisk(self.position_df, returns, confidence=confidence,
+                             shrinkage=shrinkage, benchmark_returns=benchmark_returns)
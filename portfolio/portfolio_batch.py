@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from portfolio.analytics import compute_metrics
+from kernels.positions import apply_fills
+
+HISTORY_FIELDS = ('total_value', 'cash', 'positions_value', 'returns')
+
+class PortfolioBatch:
+    # K independent portfolios over the same symbols, held as (K, symbols) position and average
+    # price arrays and (K,) cash. Every fill and mark is applied to all K portfolios at once with
+    # the accounting rules of Portfolio._update_positions and update_portfolio_value.
+
+    def __init__(self, n_portfolios, symbols, initial_capital=10000, cost_model=None):
+        self.symbols = list(symbols)
+        self.n_portfolios = n_portfolios
+        self.cost_model = cost_model
+        shape = (n_portfolios, len(self.symbols))
+        self.initial_capital = np.broadcast_to(np.asarray(initial_capital, dtype=float), (n_portfolios,)).copy()
+        self.cash = self.initial_capital.copy()
+        self.quantity = np.zeros(shape)
+        self.avg_price = np.zeros(shape)
+        self.market_value = np.zeros(shape)
+        self.unrealized_pnl = np.zeros(shape)
+        # Portfolio keeps a ledger row for every symbol it has traded, flat or not
+        self.traded = np.zeros(shape, dtype=bool)
+        self.trade_count = np.zeros(n_portfolios, dtype=np.int64)
+        self.rejected_count = np.zeros(n_portfolios, dtype=np.int64)
+        self.total_commission = np.zeros(n_portfolios)
+        self.timestamps = []
+        self._history = {field: [] for field in HISTORY_FIELDS}
+
+    def _symbol_array(self, values, name):
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 0 or values.shape[-1] != len(self.symbols):
+            raise ValueError(f"{name} must have one value per symbol ({len(self.symbols)}), got shape {values.shape}")
+        return values
+
+    def execute(self, quantities, prices, volumes=None):
+        # quantities: (K, symbols) signed shares, positive buys and negative sells; prices and
+        # volumes: (symbols,) or (K, symbols). Symbols are filled in column order, as if each
+        # portfolio sent its orders one symbol at a time. A buy the cash cannot cover is
+        # rejected (Portfolio raises ValueError instead) and counted in rejected_count.
+        quantities = np.broadcast_to(self._symbol_array(quantities, 'quantities'), self.quantity.shape)
+        prices = np.broadcast_to(self._symbol_array(prices, 'prices'), self.quantity.shape)
+        if volumes is not None:
+            volumes = np.broadcast_to(self._symbol_array(volumes, 'volumes'), self.quantity.shape)
+        fills = quantities.astype(float)
+        fill_prices = prices.copy()
+        commission = np.zeros(self.quantity.shape)
+        if self.cost_model is not None and fills.any():
+            # Cost models are elementwise, so every order in the batch is priced in one call
+            rows, columns = np.nonzero(fills)
+            side = np.sign(fills[rows, columns])
+            volume = volumes[rows, columns] if volumes is not None else None
+            price, size, fee = self.cost_model.apply(prices[rows, columns], np.abs(fills[rows, columns]), side, volume)
+            fill_prices[rows, columns] = price
+            fills[rows, columns] = side * size
+            commission[rows, columns] = fee
+
+        filled, rejected = apply_fills(self.quantity, self.avg_price, self.cash, fills, fill_prices, commission)
+        self.rejected_count += rejected
+        self.trade_count += filled.sum(axis=1)
+        self.total_commission += np.where(filled, commission, 0.0).sum(axis=1)
+        self.traded |= filled
+        return filled
+
+    def rebalance(self, target_quantities, prices, volumes=None):
+        # Trades each portfolio to target positions: (K, symbols) or (symbols,) targets
+        targets = np.broadcast_to(self._symbol_array(target_quantities, 'target_quantities'), self.quantity.shape)
+        return self.execute(targets - self.quantity, prices, volumes)
+
+    def mark(self, prices, timestamp):
+        # prices: (symbols,) or (K, symbols); NaN leaves a symbol unmarked. As in
+        # Portfolio.update_portfolio_value, only marked symbols count towards positions_value.
+        prices = np.broadcast_to(self._symbol_array(prices, 'prices'), self.quantity.shape)
+        marked = ~np.isnan(prices)
+        self.market_value = np.where(marked, self.quantity * prices, self.market_value)
+        self.unrealized_pnl = np.where(marked, (prices - self.avg_price) * self.quantity, self.unrealized_pnl)
+        positions_value = np.where(marked, self.market_value, 0.0).sum(axis=1)
+        total_value = self.cash + positions_value
+
+        self.timestamps.append(timestamp)
+        history = self._history
+        history['total_value'].append(total_value)
+        history['cash'].append(self.cash.copy())
+        history['positions_value'].append(positions_value)
+        history['returns'].append((total_value / self.initial_capital - 1) * 100)
+        return total_value
+
+    def history(self, field='total_value'):
+        # One column per portfolio, one row per mark()
+        if field not in self._history:
+            raise ValueError(f"Unknown history field: {field}")
+        values = np.array(self._history[field]).reshape(len(self.timestamps), self.n_portfolios)
+        return pd.DataFrame(values, index=pd.Index(self.timestamps, name='timestamp'))
+
+    def positions(self, portfolio):
+        # One portfolio's ledger in the shape of Portfolio.position_df (symbols it has traded)
+        frame = pd.DataFrame({
+            'quantity': self.quantity[portfolio],
+            'avg_price': self.avg_price[portfolio],
+            'market_value': self.market_value[portfolio],
+            'unrealized_pnl': self.unrealized_pnl[portfolio],
+        }, index=pd.Index(self.symbols, name='symbol'))
+        return frame[self.traded[portfolio]]
+
+    def get_performance_metrics(self, periods_per_year=252, risk_free_rate=0.0):
+        # One row of analytics.compute_metrics per portfolio, from a single (K, time) matrix
+        return compute_metrics(self.history('total_value'), periods_per_year, risk_free_rate)
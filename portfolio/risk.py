@@ -0,0 +1,244 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+
+
+class CovarianceEstimator:
+
+    def __init__(self, shrinkage=None):
+        # shrinkage: None (sample), a float in [0, 1], or 'oas'
+        if isinstance(shrinkage, str):
+            shrinkage = shrinkage.lower()
+            if shrinkage != 'oas':
+                raise ValueError(f"Unknown shrinkage method: {shrinkage}")
+        elif shrinkage is not None and not 0.0 <= shrinkage <= 1.0:
+            raise ValueError(f"Shrinkage intensity must be in [0, 1], got {shrinkage}")
+        self.shrinkage = shrinkage
+        self.symbols = pd.Index([])
+        self.n_obs = 0
+        self._sum = None
+        self._cross = None
+        self._cov = None
+        self.shrinkage_intensity = 0.0
+
+    def update(self, returns):
+        # Running sums make each update O(rows * names^2) instead of a full recompute
+        returns = returns.fillna(0.0)
+        if self._sum is None:
+            self.symbols = returns.columns
+            self._sum = np.zeros(len(self.symbols))
+            self._cross = np.zeros((len(self.symbols), len(self.symbols)))
+        elif not returns.columns.equals(self.symbols):
+            missing = returns.columns.difference(self.symbols)
+            if not missing.empty:
+                raise ValueError(f"Unknown symbols in returns update: {list(missing)}")
+            returns = returns.reindex(columns=self.symbols, fill_value=0.0)
+
+        values = returns.to_numpy(dtype=float)
+        self.n_obs += len(values)
+        self._sum += values.sum(axis=0)
+        self._cross += values.T @ values
+        self._cov = None
+        return self
+
+    @property
+    def mean(self):
+        if self.n_obs == 0:
+            raise ValueError("No returns have been added to the estimator")
+        return self._sum / self.n_obs
+
+    @property
+    def covariance(self):
+        if self._cov is None:
+            self._cov = self._compute_covariance()
+        return self._cov
+
+    def _compute_covariance(self):
+        if self.n_obs < 2:
+            raise ValueError("At least two observations are required for a covariance matrix")
+        mean = self.mean
+        sample = (self._cross - self.n_obs * np.outer(mean, mean)) / (self.n_obs - 1)
+
+        if self.shrinkage is None:
+            self.shrinkage_intensity = 0.0
+            return sample
+
+        p = sample.shape[0]
+        trace = np.trace(sample)
+        target_var = trace / p
+        if self.shrinkage == 'oas':
+            # Oracle Approximating Shrinkage only needs the sample matrix, so it stays incremental
+            trace_sq = np.einsum('ij,ij->', sample, sample)
+            numerator = (1 - 2 / p) * trace_sq + trace ** 2
+            denominator = (self.n_obs + 1 - 2 / p) * (trace_sq - trace ** 2 / p)
+            intensity = 1.0 if denominator <= 0 else min(1.0, numerator / denominator)
+        else:
+            intensity = float(self.shrinkage)
+
+        self.shrinkage_intensity = intensity
+        shrunk = (1 - intensity) * sample
+        shrunk[np.diag_indices(p)] += intensity * target_var
+        return shrunk
+
+    def get_covariance_df(self):
+        return pd.DataFrame(self.covariance, index=self.symbols, columns=self.symbols)
+
+
+class PortfolioRisk:
+
+    def __init__(self, position_df, returns, confidence=0.95, shrinkage=None, benchmark_returns=None):
+        if not 0.0 < confidence < 1.0:
+            raise ValueError(f"Confidence must be between 0 and 1, got {confidence}")
+        self.confidence = confidence
+        self.estimator = CovarianceEstimator(shrinkage=shrinkage)
+        self._returns = None
+        self._benchmark = None
+        self.set_positions(position_df)
+        self.update_returns(returns, benchmark_returns)
+
+    @staticmethod
+    def build_returns_panel(stock_data_list):
+        # Aligns StockData.log_returns into one date x symbol panel
+        return pd.concat({data.get_ticker: data.get_log_returns for data in stock_data_list}, axis=1)
+
+    def set_positions(self, position_df):
+        if 'market_value' not in position_df.columns:
+            raise ValueError("position_df must contain a 'market_value' column")
+        self.position_df = position_df
+        self._exposure_cache = None
+        self._pnl_cache = None
+
+    def update_returns(self, returns, benchmark_returns=None):
+        # returns are log returns (as StockData.log_returns). They are stored and estimated as
+        # simple returns, the ones dollar exposures scale linearly, so the historical,
+        # parametric and Monte Carlo measures all describe the same P&L.
+        if isinstance(returns, pd.Series):
+            returns = returns.to_frame()
+        returns = np.expm1(returns)
+        if benchmark_returns is not None:
+            benchmark_returns = np.expm1(benchmark_returns)
+        self.estimator.update(returns)
+        returns = returns.reindex(columns=self.estimator.symbols, fill_value=0.0).fillna(0.0)
+        self._returns = returns if self._returns is None else pd.concat([self._returns, returns])
+        if benchmark_returns is not None:
+            self._benchmark = benchmark_returns if self._benchmark is None else pd.concat([self._benchmark, benchmark_returns])
+        self._exposure_cache = None
+        self._pnl_cache = None
+        return self
+
+    @property
+    def exposures(self):
+        if self._exposure_cache is None:
+            values = self.position_df['market_value'].astype(float)
+            missing = values.index.difference(self.estimator.symbols)
+            if not missing.empty:
+                raise ValueError(f"No returns available for positions: {list(missing)}")
+            self._exposure_cache = values.reindex(self.estimator.symbols, fill_value=0.0).to_numpy()
+        return self._exposure_cache
+
+    @property
+    def portfolio_pnl(self):
+        if self._pnl_cache is None:
+            self._pnl_cache = self._returns.to_numpy(dtype=float) @ self.exposures
+        return self._pnl_cache
+
+    @property
+    def portfolio_std(self):
+        w = self.exposures
+        return float(np.sqrt(max(w @ self.estimator.covariance @ w, 0.0)))
+
+    def historical_var(self):
+        pnl = self.portfolio_pnl
+        return float(-np.quantile(pnl, 1 - self.confidence))
+
+    def historical_cvar(self):
+        pnl = self.portfolio_pnl
+        cutoff = np.quantile(pnl, 1 - self.confidence)
+        return float(-pnl[pnl <= cutoff].mean())
+
+    def parametric_var(self):
+        z = NormalDist().inv_cdf(self.confidence)
+        mu = float(self.estimator.mean @ self.exposures)
+        return float(z * self.portfolio_std - mu)
+
+    def parametric_cvar(self):
+        z = NormalDist().inv_cdf(self.confidence)
+        mu = float(self.estimator.mean @ self.exposures)
+        pdf = np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+        return float(self.portfolio_std * pdf / (1 - self.confidence) - mu)
+
+    def monte_carlo_var(self, n_sims=10000, seed=None, df=None):
+        pnl = self._simulate_pnl(n_sims, seed, df)
+        return float(-np.quantile(pnl, 1 - self.confidence))
+
+    def monte_carlo_cvar(self, n_sims=10000, seed=None, df=None):
+        pnl = self._simulate_pnl(n_sims, seed, df)
+        cutoff = np.quantile(pnl, 1 - self.confidence)
+        return float(-pnl[pnl <= cutoff].mean())
+
+    def _simulate_pnl(self, n_sims, seed, df):
+        rng = np.random.default_rng(seed)
+        cov = self.estimator.covariance
+        w = self.exposures
+        # Project the Cholesky factor onto the exposures once: z @ (L.T @ w) avoids an
+        # (n_sims x names) @ (names x names) product
+        try:
+            loadings = np.linalg.cholesky(cov).T @ w
+        except np.linalg.LinAlgError:
+            # Sample covariance is singular when names outnumber observations
+            eigvals, eigvecs = np.linalg.eigh(cov)
+            loadings = (eigvecs * np.sqrt(np.clip(eigvals, 0.0, None))).T @ w
+        draws = rng.standard_normal((n_sims, len(loadings))) @ loadings
+        if df is not None:
+            # Multivariate Student-t scaling for fat tails
+            draws *= np.sqrt(df / rng.chisquare(df, size=n_sims))
+        return float(self.estimator.mean @ w) + draws
+
+    def marginal_var(self):
+        w = self.exposures
+        sigma = self.portfolio_std
+        if sigma == 0:
+            return pd.Series(0.0, index=self.estimator.symbols)
+        marginal = NormalDist().inv_cdf(self.confidence) * (self.estimator.covariance @ w) / sigma
+        return pd.Series(marginal, index=self.estimator.symbols)
+
+    def component_var(self):
+        # Components sum to the parametric VaR (excluding the mean term)
+        return self.marginal_var() * self.exposures
+
+    def beta(self):
+        if self._benchmark is not None:
+            bench = self._benchmark.reindex(self._returns.index).fillna(0.0).to_numpy(dtype=float)
+            rets = self._returns.to_numpy(dtype=float)
+            bench_c = bench - bench.mean()
+            betas = (rets - rets.mean(axis=0)).T @ bench_c / (bench_c @ bench_c)
+            return pd.Series(betas, index=self.estimator.symbols)
+
+        # Without a benchmark, beta is measured against the portfolio itself
+        w = self.exposures
+        variance = w @ self.estimator.covariance @ w
+        if variance == 0:
+            return pd.Series(0.0, index=self.estimator.symbols)
+        total = w.sum()
+        return pd.Series((self.estimator.covariance @ w) * total / variance, index=self.estimator.symbols)
+
+    def get_risk_report(self, n_sims=10000, seed=None):
+        return {
+            'confidence': self.confidence,
+            'portfolio_std': self.portfolio_std,
+            'historical_var': self.historical_var(),
+            'historical_cvar': self.historical_cvar(),
+            'parametric_var': self.parametric_var(),
+            'parametric_cvar': self.parametric_cvar(),
+            'monte_carlo_var': self.monte_carlo_var(n_sims, seed),
+            'monte_carlo_cvar': self.monte_carlo_cvar(n_sims, seed),
+            'shrinkage_intensity': float(self.estimator.shrinkage_intensity),
+        }
+
+    def get_position_risk(self):
+        return pd.DataFrame({
+            'exposure': self.exposures,
+            'marginal_var': self.marginal_var(),
+            'component_var': self.component_var(),
+            'beta': self.beta(),
+        }, index=self.estimator.symbols)
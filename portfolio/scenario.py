@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from data.option_pricer import black_scholes
+
+YEAR_NS = 365.25 * 86400e9
+# Scenario x contract prices evaluated per chunk. black_scholes keeps about a dozen float64
+# temporaries of this size alive, so a chunk stays near 25 MB (larger chunks were no faster)
+CHUNK_ELEMENTS = 1 << 18
+
+def _axis(values, name):
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    if values.ndim != 1 or len(values) == 0:
+        raise ValueError(f"{name} must be a non-empty 1-D sequence")
+    return values
+
+def _per_contract(value, underlyings, name):
+    # A scalar, or {underlying: value}, as one value per contract
+    if not isinstance(value, dict):
+        return np.full(len(underlyings), float(value))
+    missing = sorted(set(underlyings) - set(value))
+    if missing:
+        raise ValueError(f"No {name} for underlyings {missing}")
+    return np.array([value[underlying] for underlying in underlyings], dtype=float)
+
+class ScenarioCube:
+    # Option book P&L over a spot x vol x time grid, shaped (spots, vols, days, underlyings) in
+    # by_underlying. P&L is against the book revalued with no shock, so the (0, 0, 0) scenario
+    # is zero whatever the positions' last marks were.
+
+    def __init__(self, spot_shocks, vol_shocks, day_shifts, underlyings, by_underlying, base_value,
+                 contracts=None, contract_pnl=None):
+        self.spot_shocks = spot_shocks
+        self.vol_shocks = vol_shocks
+        self.day_shifts = day_shifts
+        self.underlyings = list(underlyings)
+        self.by_underlying = by_underlying
+        self.base_value = base_value
+        self.contracts = contracts
+        self.contract_pnl = contract_pnl
+
+    @property
+    def shape(self):
+        return self.by_underlying.shape[:3]
+
+    @property
+    def total(self):
+        # (spots, vols, days) P&L of the whole book
+        return self.by_underlying.sum(axis=-1)
+
+    def _scenario(self, flat_index):
+        spot, vol, day = np.unravel_index(flat_index, self.shape)
+        return {'spot_shock': float(self.spot_shocks[spot]), 'vol_shock': float(self.vol_shocks[vol]),
+                'day_shift': float(self.day_shifts[day])}
+
+    def worst_case(self):
+        # The scenario with the largest book loss and its P&L per underlying
+        total = self.total
+        flat_index = int(np.argmin(total))
+        result = self._scenario(flat_index)
+        result['pnl'] = float(total.flat[flat_index])
+        result['by_underlying'] = dict(zip(self.underlyings, self.by_underlying.reshape(-1, len(self.underlyings))
+                                           [flat_index].tolist()))
+        return result
+
+    def worst_by_underlying(self):
+        # Each underlying's own worst scenario, with a TOTAL row for the whole book
+        pnl = self.by_underlying.reshape(-1, len(self.underlyings))
+        rows = []
+        for position, underlying in enumerate(self.underlyings):
+            flat_index = int(np.argmin(pnl[:, position]))
+            rows.append({'underlying': underlying, 'base_value': float(self.base_value[position]),
+                         'worst_pnl': float(pnl[flat_index, position]), **self._scenario(flat_index)})
+        worst = self.worst_case()
+        rows.append({'underlying': 'TOTAL', 'base_value': float(self.base_value.sum()), 'worst_pnl': worst['pnl'],
+                     'spot_shock': worst['spot_shock'], 'vol_shock': worst['vol_shock'], 'day_shift': worst['day_shift']})
+        return pd.DataFrame(rows).set_index('underlying')
+
+    def to_frame(self):
+        # One row per scenario, one column per underlying plus TOTAL
+        index = pd.MultiIndex.from_product([self.spot_shocks, self.vol_shocks, self.day_shifts],
+                                           names=['spot_shock', 'vol_shock', 'day_shift'])
+        frame = pd.DataFrame(self.by_underlying.reshape(-1, len(self.underlyings)), index=index,
+                             columns=self.underlyings)
+        frame['TOTAL'] = frame.sum(axis=1)
+        return frame
+
+    def surface(self, underlying=None, day_shift=0):
+        # Spot x vol P&L grid at one day shift, for the book or one underlying
+        day = int(np.argmin(np.abs(self.day_shifts - day_shift)))
+        values = self.total if underlying is None else self.by_underlying[..., self.underlyings.index(underlying)]
+        return pd.DataFrame(values[:, :, day], index=pd.Index(self.spot_shocks, name='spot_shock'),
+                            columns=pd.Index(self.vol_shocks, name='vol_shock'))
+
+def stress_option_book(book, spots, volatility, as_of, spot_shocks, vol_shocks=(0.0,), day_shifts=(0,),
+                       risk_free_rate=0.05, chunk_size=None, keep_contracts=False):
+    # Revalues every option position under every combination of a relative spot shock (-0.1 is
+    # a 10% fall, applied to all underlyings together), an additive volatility shock (0.05 is
+    # five vol points, floored at zero) and a forward move of day_shifts calendar days.
+    # book is a Portfolio or its option_positions_df; spots and volatility are scalars or
+    # {underlying: value}; risk_free_rate may also be a RateCurve. Contracts are priced in
+    # chunks of chunk_size, each one a single broadcast black_scholes call over the whole grid,
+    # and summed per underlying as they go. keep_contracts=True also keeps the full
+    # (spots, vols, days, contracts) cube in contract_pnl.
+    book = getattr(book, 'option_positions_df', book)
+    if book.empty:
+        raise ValueError("The option book has no positions")
+    spot_shocks = _axis(spot_shocks, 'spot_shocks')
+    vol_shocks = _axis(vol_shocks, 'vol_shocks')
+    day_shifts = _axis(day_shifts, 'day_shifts')
+    if (spot_shocks <= -1).any():
+        raise ValueError("Spot shocks must be greater than -1 (a 100% fall)")
+
+    # Contracts sorted by underlying, so each chunk sums into a few contiguous segments
+    codes, underlyings = pd.factorize(book['underlying'], sort=True)
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    names = book['underlying'].to_numpy()[order]
+    strikes = book['strike_price'].to_numpy(dtype=float)[order]
+    years = (pd.DatetimeIndex(book['expiration_date']).asi8[order] - pd.Timestamp(as_of).value) / YEAR_NS
+    is_call = (book['option_type'] == 'call').to_numpy()[order]
+    scale = (book['quantity'].to_numpy(dtype=float) * book['multiplier'].to_numpy(dtype=float))[order]
+    spot = _per_contract(spots, names, 'spot')
+    sigma = _per_contract(volatility, names, 'volatility')
+    if hasattr(risk_free_rate, 'rate'):
+        rates = np.asarray(risk_free_rate.rate(years, as_of=as_of), dtype=float)
+    else:
+        rates = _per_contract(risk_free_rate, names, 'risk_free_rate')
+
+    base = black_scholes(spot, strikes, years, rates, sigma, is_call, greeks=False)['price']
+    base_value = np.bincount(codes, weights=base * scale, minlength=len(underlyings))
+
+    # Grid axes laid out as (spots, vols, days, contracts)
+    spot_factor = (1 + spot_shocks)[:, None, None, None]
+    vol_shift = vol_shocks[None, :, None, None]
+    year_shift = (day_shifts / 365.25)[None, None, :, None]
+    n_scenarios = len(spot_shocks) * len(vol_shocks) * len(day_shifts)
+    chunk_size = chunk_size or max(1, CHUNK_ELEMENTS // n_scenarios)
+    grid = (len(spot_shocks), len(vol_shocks), len(day_shifts))
+    by_underlying = np.zeros(grid + (len(underlyings),))
+    contract_pnl = np.empty(grid + (len(book),)) if keep_contracts else None
+
+    for start in range(0, len(book), chunk_size):
+        rows = slice(start, start + chunk_size)
+        price = black_scholes(spot[rows] * spot_factor, strikes[rows], years[rows] - year_shift, rates[rows],
+                              np.maximum(sigma[rows] + vol_shift, 0.0), is_call[rows], greeks=False)['price']
+        pnl = (price - base[rows]) * scale[rows]
+        chunk_codes = codes[rows]
+        starts = np.flatnonzero(np.r_[True, chunk_codes[1:] != chunk_codes[:-1]])
+        by_underlying[..., chunk_codes[starts]] += np.add.reduceat(pnl, starts, axis=-1)
+        if keep_contracts:
+            contract_pnl[..., order[rows]] = pnl
+
+    return ScenarioCube(spot_shocks, vol_shocks, day_shifts, underlyings, by_underlying, base_value,
+                        contracts=list(book.index) if keep_contracts else None, contract_pnl=contract_pnl)
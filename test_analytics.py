@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from portfolio.analytics import compute_metrics, drawdown_series, rolling_metrics, resample_returns, METRIC_NAMES
+from portfolio.portfolio import Portfolio
+
+
+class TestAnalytics(unittest.TestCase):
+    """Test cases for the performance analytics module"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.curves = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, (50, 300)), axis=1)
+
+    def test_max_drawdown(self):
+        """Test running-max drawdown on a known curve"""
+        metrics = compute_metrics([100, 120, 90, 110, 130, 65])
+        self.assertAlmostEqual(metrics['max_drawdown'], -0.5)
+        self.assertEqual(metrics['max_drawdown_duration'], 2)
+        drawdown = drawdown_series(np.array([100, 120, 90]))
+        np.testing.assert_allclose(drawdown, [0.0, 0.0, -0.25])
+
+    def test_drawdown_duration(self):
+        """Test the longest stretch below a prior peak"""
+        metrics = compute_metrics([100, 90, 95, 99, 101, 100])
+        self.assertEqual(metrics['max_drawdown_duration'], 3)
+
+    def test_sharpe_matches_definition(self):
+        """Test Sharpe ratio against a direct calculation"""
+        curve = self.curves[0]
+        returns = curve[1:] / curve[:-1] - 1
+        expected = returns.mean() / returns.std(ddof=1) * np.sqrt(252)
+        self.assertAlmostEqual(compute_metrics(curve)['sharpe_ratio'], expected)
+
+    def test_batch_matches_single(self):
+        """Test that batch metrics equal per-curve metrics"""
+        batch = compute_metrics(self.curves)
+        self.assertListEqual(list(batch.columns), METRIC_NAMES)
+        self.assertEqual(len(batch), 50)
+        for k in (0, 17, 49):
+            single = compute_metrics(self.curves[k])
+            for name in METRIC_NAMES:
+                self.assertAlmostEqual(batch.iloc[k][name], single[name])
+
+    def test_dataframe_columns_are_curves(self):
+        """Test that a DataFrame of curves keeps its column labels"""
+        frame = pd.DataFrame(self.curves[:3].T, columns=['a', 'b', 'c'])
+        self.assertListEqual(list(compute_metrics(frame).index), ['a', 'b', 'c'])
+
+    def test_rolling_metrics(self):
+        """Test rolling volatility against pandas rolling std"""
+        series = pd.Series(self.curves[0], index=pd.bdate_range("2020-01-01", periods=300))
+        rolled = rolling_metrics(series, window=20)
+        expected = series.pct_change().rolling(20).std().dropna() * np.sqrt(252)
+        np.testing.assert_allclose(rolled['rolling_volatility'].to_numpy(), expected.to_numpy())
+        self.assertEqual(rolled.index[0], expected.index[0])
+
+    def test_resample_returns(self):
+        """Test monthly returns compound back to the total return"""
+        history = pd.DataFrame({'total_value': self.curves[0]},
+                               index=pd.bdate_range("2020-01-01", periods=300))
+        monthly = resample_returns(history, freq='ME')
+        self.assertAlmostEqual((1 + monthly).prod() - 1, self.curves[0][-1] / self.curves[0][0] - 1)
+
+    def test_portfolio_performance_metrics(self):
+        """Test metrics computed from a portfolio's history"""
+        portfolio = Portfolio(initial_capital=10000)
+        self.assertEqual(portfolio.get_performance_metrics(), {})
+        for day, value in enumerate([10000, 10100, 9900, 10200]):
+            portfolio.current_cash = value
+            portfolio.update_portfolio_value({}, datetime(2024, 1, day + 1))
+        metrics = portfolio.get_performance_metrics()
+        self.assertAlmostEqual(metrics['total_return'], 0.02)
+        self.assertAlmostEqual(metrics['max_drawdown'], 9900 / 10100 - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
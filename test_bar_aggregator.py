@@ -0,0 +1,162 @@
+import unittest
+import tempfile
+import os
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.bar_aggregator import BarAggregator, stock_data_appender, portfolio_marker
+from data.replay import BinaryTickReader, merge_streams, write_binary_ticks
+from data.stock_data import StockData
+from live.market_data import MarketDataPipeline, SimulatedFeed
+from portfolio.portfolio import Portfolio
+
+
+def make_ticks(n, seed, start="2024-01-02 09:30"):
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(1, 20_000_000_000, n)
+    index = pd.to_datetime(pd.Timestamp(start).value + np.cumsum(steps))
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return pd.DataFrame({'price': price, 'size': rng.integers(1, 100, n).astype(float)}, index=index)
+
+
+def resampled(ticks, timeframe):
+    bars = ticks['price'].resample(timeframe).ohlc().dropna()
+    bars['volume'] = ticks['size'].resample(timeframe).sum()
+    return bars
+
+
+class TestBarAggregator(unittest.TestCase):
+    """Test cases for the streaming multi-timeframe bar aggregator"""
+
+    def test_ticks_match_resample(self):
+        """Test that bars built tick by tick match a pandas resample of the full history"""
+        ticks = make_ticks(5000, 1)
+        timeframes = ['1min', '5min', '15min', '1h']
+        aggregator = BarAggregator(timeframes)
+        for timestamp, row in ticks.iterrows():
+            aggregator.on_tick("AAPL", timestamp, row['price'], row['size'])
+        aggregator.flush()
+        for timeframe in timeframes:
+            expected = resampled(ticks, timeframe)
+            bars = aggregator.bars("AAPL", timeframe)
+            self.assertEqual(list(bars.columns), ['Close', 'High', 'Low', 'Open', 'Volume'])
+            self.assertTrue(bars.index.equals(expected.index))
+            np.testing.assert_allclose(bars[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(),
+                                       expected.to_numpy())
+        self.assertEqual(aggregator.events, len(ticks))
+
+    def test_fine_bars_roll_up(self):
+        """Test that one-minute bars roll up into the same bars as the ticks they came from"""
+        ticks = make_ticks(3000, 2)
+        minute = resampled(ticks, '1min')
+        aggregator = BarAggregator(['5min', '30min'])
+        for timestamp, row in minute.iterrows():
+            aggregator.on_bar("AAPL", timestamp, {'Open': row['open'], 'High': row['high'], 'Low': row['low'],
+                                                  'Close': row['close'], 'Volume': row['volume']})
+        aggregator.flush()
+        for timeframe in ['5min', '30min']:
+            expected = resampled(ticks, timeframe)
+            np.testing.assert_allclose(aggregator.bars("AAPL", timeframe)[['Open', 'High', 'Low', 'Close', 'Volume']]
+                                       .to_numpy(), expected.to_numpy())
+
+    def test_bars_emit_when_bucket_closes(self):
+        """Test that a bar is emitted only once a later bucket starts, on advance or on flush"""
+        aggregator = BarAggregator(['1min', '5min'])
+        received = []
+        aggregator.subscribe(lambda *args: received.append(args))
+        aggregator.on_tick("AAPL", "2024-01-02 09:30:05", 10.0, 1)
+        aggregator.on_tick("AAPL", "2024-01-02 09:30:40", 12.0, 2)
+        self.assertEqual(received, [])
+        self.assertEqual(aggregator.current("AAPL", "1min")[1],
+                         {'Open': 10.0, 'High': 12.0, 'Low': 10.0, 'Close': 12.0, 'Volume': 3})
+        aggregator.on_tick("AAPL", "2024-01-02 09:31:10", 11.0, 1)
+        self.assertEqual([(timeframe, timestamp) for _, timeframe, timestamp, _ in received],
+                         [("1min", pd.Timestamp("2024-01-02 09:30"))])
+
+        aggregator.advance("2024-01-02 09:35")
+        self.assertEqual([(timeframe, timestamp) for _, timeframe, timestamp, _ in received[1:]],
+                         [("1min", pd.Timestamp("2024-01-02 09:31")), ("5min", pd.Timestamp("2024-01-02 09:30"))])
+        self.assertEqual(received[-1][3]['Volume'], 4)
+        aggregator.on_tick("AAPL", "2024-01-02 09:34:59", 9.0, 1)
+        self.assertEqual(aggregator.late, 1)
+        self.assertIsNone(aggregator.current("AAPL", "1min"))
+
+    def test_subscriber_filters(self):
+        """Test that subscribers only receive the timeframes and symbols they asked for"""
+        aggregator = BarAggregator(['1min', '5min'])
+        five_minute_aapl, everything = [], []
+        aggregator.subscribe(lambda *args: five_minute_aapl.append(args), timeframes='5min', symbols=['AAPL'])
+        callback = aggregator.subscribe(lambda *args: everything.append(args))
+        for symbol, seed in (("AAPL", 3), ("MSFT", 4)):
+            for timestamp, row in make_ticks(200, seed).iterrows():
+                aggregator.on_tick(symbol, timestamp, row['price'], row['size'])
+        aggregator.unsubscribe(callback)
+        aggregator.flush()
+        self.assertTrue(five_minute_aapl)
+        self.assertTrue(all(symbol == "AAPL" and timeframe == "5min" for symbol, timeframe, _, _ in five_minute_aapl))
+        self.assertEqual({(symbol, timeframe) for symbol, timeframe, _, _ in everything},
+                         {("AAPL", "1min"), ("AAPL", "5min"), ("MSFT", "1min"), ("MSFT", "5min")})
+        self.assertEqual(len(everything) + 2 * 2, aggregator.emitted)
+
+    def test_stock_data_and_portfolio_subscribers(self):
+        """Test that completed bars extend StockData like a reload and mark the portfolio"""
+        ticks = make_ticks(4000, 5)
+        hourly = resampled(ticks, '1h').rename(columns=str.capitalize)
+        seed_bars = hourly.iloc[:3]
+        stock = StockData("AAPL", seed_bars.index[0], seed_bars.index[-1], seed_bars.copy())
+        portfolio = Portfolio(initial_capital=1000)
+        aggregator = BarAggregator(['1h'])
+        aggregator.subscribe(stock_data_appender(stock))
+        aggregator.subscribe(portfolio_marker(portfolio))
+        for timestamp, row in ticks.iterrows():
+            aggregator.on_tick("AAPL", timestamp, row['price'], row['size'])
+        aggregator.flush()
+
+        full = StockData("AAPL", hourly.index[0], hourly.index[-1], hourly)
+        self.assertEqual(len(stock.get_prices), len(hourly))
+        np.testing.assert_allclose(stock.get_log_returns.to_numpy(), full.get_log_returns.to_numpy())
+        self.assertAlmostEqual(stock.get_volatility, full.get_volatility)
+        self.assertEqual(len(portfolio.portfolio_history_df), len(hourly))
+
+    def test_consume_replay_events(self):
+        """Test that merged replay streams aggregate per symbol"""
+        with tempfile.TemporaryDirectory() as directory:
+            streams = {"AAPL": make_ticks(1500, 6), "MSFT": make_ticks(1500, 7)}
+            readers = []
+            for symbol, ticks in streams.items():
+                path = os.path.join(directory, f"{symbol}.bin")
+                write_binary_ticks(path, ticks)
+                readers.append(BinaryTickReader(path, symbol, chunksize=256))
+            aggregator = BarAggregator(['5min']).consume(merge_streams(readers))
+        aggregator.flush()
+        self.assertEqual(aggregator.late, 0)
+        for symbol, ticks in streams.items():
+            np.testing.assert_allclose(aggregator.bars(symbol, '5min')[['Open', 'High', 'Low', 'Close', 'Volume']]
+                                       .to_numpy(), resampled(ticks, '5min').to_numpy())
+
+    def test_pipeline_feeds_aggregator(self):
+        """Test that the live pipeline rolls replayed minute bars into coarser bars"""
+        ticks = make_ticks(2000, 8)
+        minute = resampled(ticks, '1min').rename(columns=str.capitalize)
+        aggregator = BarAggregator(['15min'])
+        pipeline = MarketDataPipeline([SimulatedFeed({"AAPL": minute})], Portfolio(), aggregator=aggregator)
+        pipeline.run_sync()
+        expected = resampled(ticks, '15min')
+        np.testing.assert_allclose(aggregator.bars("AAPL", '15min')[['Open', 'High', 'Low', 'Close', 'Volume']]
+                                   .to_numpy(), expected.to_numpy())
+
+    def test_invalid_timeframes(self):
+        """Test that empty or non-positive timeframes are rejected"""
+        with self.assertRaises(ValueError):
+            BarAggregator([])
+        with self.assertRaises(ValueError):
+            BarAggregator(['0min'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from graph.batch_report import build_panels, panel_features, panel_statistics, generate_reports
+from graph.graph_model import chart_features
+from data.stock_data import StockData
+from data.synthetic_data import generate_prices
+
+
+def make_stock(ticker, n_days=300, seed=0, start='2023-01-02'):
+    prices = generate_prices(start, n_bars=n_days, drift=0.0, volatility=0.16, seed=seed)
+    return StockData(ticker=ticker, start_date=prices.index[0], end_date=prices.index[-1], prices=prices)
+
+
+class TestBatchReport(unittest.TestCase):
+    """Test cases for batch dashboard generation"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # MSFT starts later, so the panel has a ragged calendar
+        self.stocks = [make_stock('AAPL', seed=1), make_stock('MSFT', n_days=250, seed=2, start='2023-03-01'),
+                       make_stock('GOOG', seed=3)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_statistics_match_stock_data(self):
+        """Test that panel statistics equal each StockData's own statistics"""
+        close, returns = build_panels(self.stocks)
+        statistics = panel_statistics(close, returns)
+        for stock in self.stocks:
+            expected = stock.get_prices_stats()
+            for name, value in expected.items():
+                self.assertAlmostEqual(statistics.loc[stock.get_ticker, name], value, places=10)
+
+    def test_features_match_per_ticker(self):
+        """Test that shared panel features equal per-ticker computations"""
+        close, returns = build_panels(self.stocks)
+        features = panel_features(returns)
+        for stock in self.stocks:
+            expected = chart_features(stock.get_log_returns)
+            for name in expected:
+                pd.testing.assert_series_equal(features[stock.get_ticker][name], expected[name],
+                                               check_names=False, check_freq=False)
+
+    def test_close_panel_input(self):
+        """Test that a DataFrame of closes gives StockData-equivalent returns"""
+        panel = pd.DataFrame({stock.get_ticker: stock.get_prices['Close'] for stock in self.stocks[::2]})
+        _, returns = build_panels(panel)
+        np.testing.assert_allclose(returns['AAPL'].to_numpy(), self.stocks[0].get_log_returns.to_numpy())
+
+    def test_generate_reports_in_process(self):
+        """Test rendering dashboards and the index page without a pool"""
+        report = generate_reports(self.stocks, self.tmp.name, max_workers=1)
+        self.assertEqual(set(report['images']), {'AAPL', 'MSFT', 'GOOG'})
+        for path in report['images'].values():
+            self.assertGreater(os.path.getsize(path), 0)
+        with open(report['index']) as handle:
+            page = handle.read()
+        self.assertIn('AAPL_dashboard.png', page)
+        self.assertIn('<table', page)
+        timings = report['timings']
+        self.assertGreater(timings['wall_seconds'], 0)
+        self.assertEqual(set(timings['render_seconds']), {'AAPL', 'MSFT', 'GOOG'})
+
+    def test_generate_reports_process_pool(self):
+        """Test rendering in worker processes"""
+        report = generate_reports(self.stocks[:2], self.tmp.name, max_workers=2, image_format='svg')
+        self.assertEqual(report['timings']['workers'], 2)
+        self.assertTrue(report['images']['MSFT'].endswith('.svg'))
+        self.assertTrue(os.path.exists(report['images']['MSFT']))
+
+
+if __name__ == '__main__':
+    unittest.main()
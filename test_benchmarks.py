@@ -0,0 +1,68 @@
+import unittest
+import json
+import os
+import tempfile
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from benchmarks.run_benchmarks import (synthetic_prices, build_cases, run_suite,
+                                       compare_to_baseline, main)
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test cases for the offline benchmark suite"""
+
+    def test_synthetic_prices_are_reproducible(self):
+        """Test that synthetic bars are seeded and well formed"""
+        first = synthetic_prices(100, seed=3)
+        second = synthetic_prices(100, seed=3)
+        self.assertTrue(first.equals(second))
+        self.assertEqual(list(first.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+        self.assertTrue((first['High'] >= first['Low']).all())
+
+    def test_cases_cover_order_sizes(self):
+        """Test that Portfolio cases are generated per order size"""
+        cases = build_cases(order_sizes=(10, 20), n_days=50)
+        self.assertIn('portfolio.add_order[10]', cases)
+        self.assertIn('portfolio.check_pending_orders[20]', cases)
+        self.assertIn('graph.plot_summary_dashboard[50d]', cases)
+
+    def test_run_suite_small(self):
+        """Test timing a filtered subset of cases"""
+        results = run_suite(build_cases(order_sizes=(20,), n_days=60), repeat=2, pattern='portfolio.')
+        self.assertEqual(len(results), 3)
+        for result in results.values():
+            self.assertEqual(result['repeats'], 2)
+            self.assertGreater(result['median_s'], 0)
+
+    def test_compare_to_baseline(self):
+        """Test regression, improvement and new-case classification"""
+        results = {'a': {'median_s': 1.5}, 'b': {'median_s': 0.5}, 'c': {'median_s': 1.05}, 'd': {'median_s': 1.0}}
+        baseline = {'a': {'median_s': 1.0}, 'b': {'median_s': 1.0}, 'c': {'median_s': 1.0}}
+        comparison = compare_to_baseline(results, baseline, threshold=0.2)
+        self.assertEqual(comparison['a']['status'], 'regression')
+        self.assertEqual(comparison['b']['status'], 'improvement')
+        self.assertEqual(comparison['c']['status'], 'ok')
+        self.assertEqual(comparison['d']['status'], 'new')
+
+    def test_main_fails_on_regression(self):
+        """Test that main returns a failing exit code against a much faster baseline"""
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline_path = os.path.join(tmp, 'baseline.json')
+            with open(baseline_path, 'w') as handle:
+                json.dump({'results': {'stock_data.construct[60d]': {'median_s': 1e-9}}}, handle)
+            output_path = os.path.join(tmp, 'results.json')
+            code = main(['--days', '60', '--filter', 'stock_data', '--repeat', '1',
+                         '--baseline', baseline_path, '--output', output_path, '--json'])
+            with open(output_path) as handle:
+                report = json.load(handle)
+        self.assertEqual(code, 1)
+        self.assertEqual(report['comparison']['stock_data.construct[60d]']['status'], 'regression')
+        self.assertIn('environment', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.chain_store import ChainStore, nearest_expiration, synthetic_chain_snapshot
+from data.data_factory import DataLoader
+from data.download_data import load_strike_data
+
+
+class TestChainStore(unittest.TestCase):
+    """Test cases for the option chain snapshot store"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ChainStore(self.tmp.name)
+        self.expirations = ['2024-02-16', '2024-03-15', '2024-06-21']
+        self.days = pd.bdate_range('2024-01-02', periods=10)
+        for day in self.days:
+            self.store.save_snapshot('AAPL', day, synthetic_chain_snapshot(190.0, day, self.expirations))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_nearest_expiration_matches_linear_search(self):
+        """Test that the bisect lookup agrees with the min() scan it replaces"""
+        expirations = sorted(str(day.date()) for day in pd.date_range('2024-01-05', periods=40, freq='7D'))
+        for requested in pd.date_range('2023-12-01', '2024-12-31', freq='3D'):
+            expected = min(expirations, key=lambda exp: abs((datetime.strptime(exp, '%Y-%m-%d') - requested).days))
+            self.assertEqual(nearest_expiration(expirations, requested), expected)
+
+    def test_round_trip_from_disk(self):
+        """Test that a fresh store reads the same columns back"""
+        snapshot = ChainStore(self.tmp.name).load('AAPL', self.days[3])
+        self.assertEqual([str(day) for day in snapshot.expirations], self.expirations)
+        calls = snapshot.chain('2024-03-15', 'call')
+        original = synthetic_chain_snapshot(190.0, self.days[3], self.expirations)[np.datetime64('2024-03-15')]['calls']
+        np.testing.assert_allclose(calls['lastPrice'].to_numpy(), original['lastPrice'].to_numpy())
+        self.assertTrue(calls['contractSymbol'].iloc[0].startswith('AAPL240315C'))
+
+    def test_strike_range_lookup(self):
+        """Test strike range slicing for one expiry and side"""
+        puts = self.store.as_of('AAPL', self.days[-1]).chain('2024-02-16', 'put', low=180, high=200)
+        self.assertTrue(((puts['strike'] >= 180) & (puts['strike'] <= 200)).all())
+        self.assertTrue(puts['contractSymbol'].str.contains('P').all())
+        self.assertTrue(puts['strike'].is_monotonic_increasing)
+
+    def test_as_of_uses_latest_earlier_snapshot(self):
+        """Test as-of lookup over snapshot dates"""
+        snapshot = self.store.as_of('AAPL', '2024-01-07')
+        self.assertEqual(str(snapshot.snapshot_date), '2024-01-05')
+        with self.assertRaises(ValueError):
+            self.store.as_of('AAPL', '2023-12-31')
+
+    def test_add_chain_keeps_other_expiries(self):
+        """Test adding a single expiry to an existing snapshot"""
+        extra = synthetic_chain_snapshot(190.0, self.days[0], ['2024-09-20'])[np.datetime64('2024-09-20')]
+        self.store.add_chain('AAPL', self.days[0], '2024-09-20', extra['calls'], extra['puts'])
+        snapshot = ChainStore(self.tmp.name).load('AAPL', self.days[0])
+        self.assertEqual(len(snapshot.expirations), 4)
+        self.assertEqual(len(snapshot.chain('2024-09-20', 'put')), len(extra['puts']))
+
+    def test_load_history_batch(self):
+        """Test loading a range of snapshots as one long frame"""
+        history = self.store.load_history('AAPL', self.days[2], self.days[5], option_type='call')
+        self.assertEqual(history['snapshot_date'].nunique(), 4)
+        self.assertTrue((history['option_type'] == 'call').all())
+        self.assertEqual(len(history), 4 * 3 * 25)
+
+    def test_strike_data_feeds_option_loader(self):
+        """Test that stored chains build OptionData offline"""
+        strike_data = self.store.load_strike_data('AAPL', '2024-03-01', snapshot_date=self.days[-1])
+        self.assertEqual(strike_data['expiration'], '2024-02-16')
+        index = pd.bdate_range('2023-06-01', periods=100)
+        prices = pd.DataFrame({'Close': np.linspace(150, 190, 100)}, index=index)
+        option = DataLoader.build_option_data('AAPL', index[0], index[-1], prices, strike_data, 0.04, 'call')
+        self.assertEqual(option.strike_price, strike_data['calls'].iloc[len(strike_data['calls']) // 2]['strike'])
+
+    def test_todays_snapshot_serves_load_strike_data_offline(self):
+        """Test that a store-backed load does not import or call yfinance"""
+        today = datetime.now()
+        expirations = [(today + timedelta(days=days)).strftime('%Y-%m-%d') for days in (10, 40)]
+        self.store.save_snapshot('MSFT', today, synthetic_chain_snapshot(400.0, today, expirations))
+        with patch.dict(sys.modules, {'yfinance': None}):
+            strike_data = load_strike_data('MSFT', expirations[1], store=self.store)
+        self.assertEqual(strike_data['expiration'], expirations[1])
+        self.assertEqual(len(strike_data['calls']), 25)
+
+    def test_expiry_missing_from_snapshot_is_downloaded(self):
+        """Test that an expiry today's snapshot lacks is fetched and added to it"""
+        today = datetime.now()
+        expirations = [(today + timedelta(days=days)).strftime('%Y-%m-%d') for days in (10, 40, 365)]
+        self.store.save_snapshot('MSFT', today, synthetic_chain_snapshot(400.0, today, expirations[:1]))
+        listed = synthetic_chain_snapshot(400.0, today, expirations)
+        ticker = MagicMock(options=expirations)
+        ticker.option_chain.side_effect = lambda expiration: SimpleNamespace(
+            calls=listed[np.datetime64(expiration)]['calls'], puts=listed[np.datetime64(expiration)]['puts'])
+        with patch.dict(sys.modules, {'yfinance': SimpleNamespace(Ticker=lambda symbol: ticker)}):
+            strike_data = load_strike_data('MSFT', today + timedelta(days=360), store=self.store)
+        self.assertEqual(strike_data['expiration'], expirations[2])
+        ticker.option_chain.assert_called_once_with(expirations[2])
+        stored = self.store.load('MSFT', today)
+        self.assertEqual([str(expiry) for expiry in stored.expirations], [expirations[0], expirations[2]])
+        with patch.dict(sys.modules, {'yfinance': None}):
+            self.assertEqual(load_strike_data('MSFT', expirations[2], store=self.store)['expiration'], expirations[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import os
+import json
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from portfolio.portfolio import Portfolio
+from portfolio.checkpoint import Checkpoint, save_checkpoint, load_checkpoint
+from order.order import Order, OrderType, OrderDirection, LimitOrder
+from order.order_book import MatchingEngine
+
+
+def run_bars(portfolio, bars):
+    index = pd.bdate_range('2024-01-02', periods=120)
+    for i in bars:
+        timestamp = index[i]
+        price = 100.0 + 10 * np.sin(i / 7)
+        if i % 4 == 0:
+            direction = OrderDirection.LONG if i % 8 == 0 else OrderDirection.SHORT
+            order = Order('AAPL', OrderType.MARKET, direction, 10, open_price=price, timestamp=timestamp)
+            portfolio.execute_market_order(order, price, timestamp=timestamp)
+        if i % 30 == 0:
+            portfolio.add_order(LimitOrder('AAPL', OrderDirection.LONG, 5, limit_price=price - 5,
+                                           open_price=price, timestamp=timestamp), limit_price=price - 5)
+        portfolio.check_pending_orders({'AAPL': price}, timestamp=timestamp)
+        portfolio.update_portfolio_value({'AAPL': price}, timestamp)
+    return portfolio
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test cases for portfolio checkpoint, restore and fork"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.portfolio = run_bars(Portfolio(initial_capital=100000), range(60))
+        order = Order('AAPL', OrderType.MARKET, OrderDirection.LONG, 2, open_price=5.0)
+        self.portfolio.execute_option_order(order, 5.0, 'call', 150.0, pd.Timestamp('2024-06-21'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_same_state(self, restored, original, check_ids=True):
+        self.assertEqual(restored.current_cash, original.current_cash)
+        self.assertEqual(restored.initial_capital, original.initial_capital)
+        for table in ('position_df', 'open_orders_df', 'filled_orders_df', 'portfolio_history_df', 'option_positions_df'):
+            left, right = getattr(restored, table), getattr(original, table)
+            if not check_ids and 'order_id' in left.columns:
+                # Order ids come from a process-wide counter, so two runs number orders differently
+                left, right = left.drop(columns='order_id'), right.drop(columns='order_id')
+            pd.testing.assert_frame_equal(left, right, check_dtype=False, check_index_type=False)
+
+    def test_save_and_load(self):
+        """Test that a checkpoint file restores the same state, compressed or not"""
+        sizes = []
+        for compress in (False, True):
+            path = os.path.join(self.tmp.name, f'checkpoint_{compress}.npz')
+            save_checkpoint(self.portfolio, path, compress=compress)
+            self.assert_same_state(load_checkpoint(path), self.portfolio)
+            sizes.append(os.path.getsize(path))
+        self.assertLess(sizes[1], sizes[0])
+
+    def test_restore_in_fresh_process(self):
+        """Test loading a checkpoint in a new interpreter"""
+        path = save_checkpoint(self.portfolio, os.path.join(self.tmp.name, 'checkpoint.npz'))
+        code = ("import sys; sys.path.insert(0, '.'); from portfolio.checkpoint import load_checkpoint; "
+                f"p = load_checkpoint({path!r}); print(p.current_cash, len(p.filled_orders_df))")
+        completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                   cwd=str(Path(__file__).parent), check=True)
+        cash, fills = completed.stdout.split()
+        self.assertEqual(float(cash), self.portfolio.current_cash)
+        self.assertEqual(int(fills), len(self.portfolio.filled_orders_df))
+
+    def test_restore_reserves_order_ids(self):
+        """Test that orders placed after a restore in a fresh process get unused ids"""
+        path = save_checkpoint(self.portfolio, os.path.join(self.tmp.name, 'run.npz'))
+        used = {int(order_id) for table in (self.portfolio.open_orders_df, self.portfolio.filled_orders_df)
+                for order_id in table['order_id']}
+        code = (f"from portfolio.checkpoint import load_checkpoint; from order.order import LimitOrder, OrderDirection\n"
+                f"portfolio = load_checkpoint({path!r})\n"
+                f"new = LimitOrder('MSFT', OrderDirection.LONG, 1, limit_price=1.0)\n"
+                f"portfolio.add_order(new, limit_price=1.0); print(new.order_id)")
+        completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                   cwd=str(Path(__file__).parent), check=True)
+        self.assertGreater(int(completed.stdout), max(used))
+
+    def test_fork_routes_open_orders_to_fill_source(self):
+        """Test that a fork given a fill_source rests the checkpoint's open orders in its book"""
+        open_ids = list(self.portfolio.open_orders_df.loc[~self.portfolio.open_orders_df['filled'].astype(bool), 'order_id'])
+        self.assertTrue(open_ids)
+        fork = Checkpoint.capture(self.portfolio).fork(fill_source=MatchingEngine())
+        self.assertEqual(sorted(fork._routed_orders), sorted(open_ids))
+
+    def test_version_header(self):
+        """Test that checkpoints from another format version are rejected"""
+        checkpoint = Checkpoint.capture(self.portfolio)
+        header = json.loads(json.dumps(checkpoint.header))
+        header['version'] = 99
+        with self.assertRaises(ValueError):
+            Checkpoint(header, dict(checkpoint.arrays))
+
+    def test_continuation_matches_uninterrupted_run(self):
+        """Test that a forked continuation reproduces running straight through"""
+        fork = run_bars(Checkpoint.capture(self.portfolio).fork(), range(60, 120))
+        straight = run_bars(self.portfolio, range(60, 120))
+        self.assert_same_state(fork, straight, check_ids=False)
+
+    def test_forks_are_independent(self):
+        """Test copy-on-write forks share fills but never each other's changes"""
+        checkpoint = Checkpoint.capture(self.portfolio)
+        first, second = checkpoint.fork(), checkpoint.fork()
+        self.assertTrue(np.shares_memory(first.filled_orders_df['fill_price'].to_numpy(),
+                                         second.filled_orders_df['fill_price'].to_numpy()))
+        self.assertFalse(np.shares_memory(first.portfolio_history_df['cash'].to_numpy(),
+                                          second.portfolio_history_df['cash'].to_numpy()))
+        run_bars(first, range(60, 90))
+        self.assertEqual(len(second.portfolio_history_df), 60)
+        self.assertEqual(second.current_cash, self.portfolio.current_cash)
+        self.assertEqual(list(second.position_df['quantity']), list(self.portfolio.position_df['quantity']))
+        self.assertEqual(len(checkpoint.fork().filled_orders_df), len(self.portfolio.filled_orders_df))
+
+    def test_fork_can_remark_last_timestamp(self):
+        """Test that a fork can revalue the last recorded bar in place"""
+        checkpoint = Checkpoint.capture(self.portfolio)
+        fork = checkpoint.fork()
+        timestamp = fork.portfolio_history_df.index[-1]
+        fork.update_portfolio_value({'AAPL': 250.0}, timestamp)
+        self.assertEqual(len(fork.portfolio_history_df), 60)
+        self.assertNotEqual(fork.portfolio_history_df['total_value'].iloc[-1],
+                            self.portfolio.portfolio_history_df['total_value'].iloc[-1])
+        self.assertEqual(checkpoint.fork().portfolio_history_df['total_value'].iloc[-1],
+                         self.portfolio.portfolio_history_df['total_value'].iloc[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
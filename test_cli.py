@@ -0,0 +1,109 @@
+import unittest
+import io
+import json
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import sys
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+import cli
+
+
+class TestCli(unittest.TestCase):
+    """Test cases for the command line runner with offline loaders"""
+
+    def setUp(self):
+        self.downloads = []
+        self.lock = threading.Lock()
+
+    def price_loader(self, ticker, start_date, end_date):
+        with self.lock:
+            self.downloads.append(ticker)
+        rng = np.random.default_rng(len(ticker))
+        index = pd.bdate_range('2024-01-02', periods=260)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6}, index=index)
+
+    def session(self):
+        return cli.Session(pd.Timestamp('2024-01-01'), pd.Timestamp('2025-01-01'), price_loader=self.price_loader,
+                           rate_loader=lambda: 0.04,
+                           chain_loader=lambda ticker, expiration: {
+                               'calls': pd.DataFrame({'strike': [90.0, 100.0, 110.0]}),
+                               'puts': pd.DataFrame({'strike': [90.0, 95.0, 110.0]}),
+                               'expiration': '2030-01-18'})
+
+    def run_cli(self, argv, session=None):
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            code = cli.main(argv, session=session or self.session())
+        return code, output.getvalue()
+
+    def test_stats_json(self):
+        """Test the stats subcommand JSON output"""
+        code, output = self.run_cli(['stats', 'AAPL', '--json'])
+        self.assertEqual(code, 0)
+        result = json.loads(output)
+        self.assertEqual(result['data_points'], 260)
+        self.assertIn('volatility', result)
+
+    def test_price_option_uses_chain_and_rate(self):
+        """Test option pricing with the ATM strike from the chain"""
+        code, output = self.run_cli(['price-option', 'AAPL', '--type', 'put', '--json'])
+        self.assertEqual(code, 0)
+        result = json.loads(output)
+        self.assertEqual(result['strike_price'], 95.0)
+        self.assertEqual(result['option_type'], 'put')
+        self.assertEqual(result['risk_free_rate'], 0.04)
+        self.assertLess(result['greeks']['delta'], 0)
+
+    def test_run_downloads_once(self):
+        """Test that all steps of a run share one history download"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code, output = self.run_cli(['run', 'AAPL', '--headless', '--json', '--strike', '100',
+                                         '--expiration', '2030-01-18', '--rate', '0.03',
+                                         '--output-dir', tmp, '--workers', '1'])
+            result = json.loads(output)
+            self.assertTrue(Path(result['report']['index']).exists())
+        self.assertEqual(code, 0)
+        self.assertEqual(self.downloads, ['AAPL'])
+        self.assertEqual(set(result), {'load', 'stats', 'price-option', 'backtest', 'report'})
+        self.assertEqual(result['price-option']['strike_price'], 100.0)
+        self.assertIn('sharpe_ratio', result['backtest'])
+
+    def test_errors_return_nonzero(self):
+        """Test that failures and unknown steps exit with status 1"""
+        code, _ = self.run_cli(['run', 'AAPL', '--steps', 'stats,bogus'])
+        self.assertEqual(code, 1)
+        failing = cli.Session(None, None, price_loader=lambda *args: (_ for _ in ()).throw(ValueError("offline")))
+        code, _ = self.run_cli(['load', 'AAPL'], session=failing)
+        self.assertEqual(code, 1)
+
+    def test_synthetic_source_runs_offline(self):
+        """Test that --source synthetic loads prices, chains and rates without downloads"""
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            code = cli.main(['price-option', 'AAPL', '--source', 'synthetic', '--start', '2024-01-02',
+                             '--end', '2024-06-03', '--json'])
+        self.assertEqual(code, 0)
+        result = json.loads(output.getvalue())
+        self.assertEqual(result['risk_free_rate'], 0.04)
+        self.assertGreater(result['option_price'], 0)
+
+    def test_help_does_not_import_heavy_modules(self):
+        """Test that the CLI module itself imports only the standard library"""
+        import subprocess
+        code = ("import sys, cli; heavy = {'pandas', 'matplotlib', 'scipy', 'yfinance'} & set(sys.modules); "
+                "print(sorted(heavy))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=str(Path(__file__).parent)).stdout.strip()
+        self.assertEqual(output, '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from order.order import Order, OrderType, OrderDirection, LimitOrder
+from order.costs import (CompositeCostModel, FixedCommission, PerShareCommission, SpreadCost,
+                         SquareRootImpact, VolumeParticipationCap, affordable_quantity, bar_volumes)
+from portfolio.portfolio import Portfolio
+
+
+class TestCostModels(unittest.TestCase):
+    """Test cases for transaction cost and slippage models"""
+
+    def test_fixed_commission(self):
+        """Test a flat fee per filled order"""
+        price, qty, commission = FixedCommission(1.5).apply(100.0, 10, 1)
+        self.assertEqual((price, qty, commission), (100.0, 10, 1.5))
+
+    def test_per_share_commission_minimum(self):
+        """Test per-share fees with a minimum ticket"""
+        model = PerShareCommission(0.005, minimum=1.0)
+        self.assertEqual(model.apply(100.0, 100, 1)[2], 1.0)
+        self.assertEqual(model.apply(100.0, 1000, 1)[2], 5.0)
+
+    def test_spread_cost_direction(self):
+        """Test that buys pay and sells give up half the spread"""
+        model = SpreadCost(10)
+        self.assertAlmostEqual(model.apply(100.0, 10, 1)[0], 100.05)
+        self.assertAlmostEqual(model.apply(100.0, 10, -1)[0], 99.95)
+
+    def test_square_root_impact(self):
+        """Test square-root impact scales with participation"""
+        model = SquareRootImpact(coefficient=1.0, daily_volatility=0.02)
+        price = model.apply(100.0, 100, 1, volume=10000)[0]
+        self.assertAlmostEqual(price, 100.0 + 0.02 * np.sqrt(0.01) * 100.0)
+        self.assertEqual(model.apply(100.0, 100, 1)[0], 100.0)
+
+    def test_participation_cap(self):
+        """Test that the volume cap produces a partial fill"""
+        model = VolumeParticipationCap(0.1)
+        self.assertEqual(model.apply(100.0, 500, 1, volume=2000)[1], 200)
+        self.assertEqual(model.apply(100.0, 50, 1, volume=2000)[1], 50)
+
+    def test_vectorized_batch(self):
+        """Test that a composite model prices arrays of fills at once"""
+        model = CompositeCostModel(PerShareCommission(0.01), SpreadCost(20), VolumeParticipationCap(0.5))
+        prices, qtys, commissions = model.apply(np.array([10.0, 20.0]), np.array([100, 300]),
+                                                np.array([1, -1]), volume=np.array([1000, 400]))
+        np.testing.assert_allclose(prices, [10.01, 19.98])
+        np.testing.assert_allclose(qtys, [100, 200])
+        np.testing.assert_allclose(commissions, [1.0, 2.0])
+
+    def test_bar_volumes(self):
+        """Test reading bar volume from price data"""
+        class FakeData:
+            get_prices = pd.DataFrame({'Close': [1.0], 'Volume': [5000]}, index=[pd.Timestamp("2024-01-02")])
+        self.assertEqual(bar_volumes({"AAPL": FakeData()}, pd.Timestamp("2024-01-02")), {"AAPL": 5000.0})
+
+    def test_affordable_quantity(self):
+        """Test all-in sizing leaves room for impact and commission"""
+        self.assertEqual(affordable_quantity(1000.0, 10.0), 100)
+        model = CompositeCostModel(SpreadCost(20), FixedCommission(5.0))
+        quantity = affordable_quantity(1000.0, 10.0, model)
+        price, _, commission = model.apply(10.0, quantity, 1)
+        self.assertLessEqual(quantity * price + commission, 1000.0)
+        self.assertGreater((quantity + 1) * price + commission, 1000.0)
+        np.testing.assert_array_equal(affordable_quantity([1000.0, 3.0], 10.0, model), [quantity, 0])
+
+
+
+class TestPortfolioCosts(unittest.TestCase):
+    """Test cases for cost models applied to Portfolio fills"""
+
+    def test_commission_and_spread_charged(self):
+        """Test that fills pay spread and commission out of cash"""
+        portfolio = Portfolio(10000, cost_model=CompositeCostModel(FixedCommission(1.0), SpreadCost(20)))
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 10, open_price=100.0)
+        self.assertTrue(portfolio.execute_market_order(order, 100.0))
+        self.assertAlmostEqual(portfolio.current_cash, 10000 - 10 * 100.1 - 1.0)
+        self.assertAlmostEqual(portfolio.position_df.loc["AAPL", 'avg_price'], 100.1)
+        self.assertEqual(portfolio.filled_orders_df.iloc[0]['commission'], 1.0)
+
+    def test_partial_fill_keeps_remainder_open(self):
+        """Test that a capped fill leaves the rest of the order pending"""
+        portfolio = Portfolio(100000, cost_model=VolumeParticipationCap(0.1))
+        order = LimitOrder("AAPL", OrderDirection.LONG, 300, limit_price=100.0, open_price=100.0)
+        portfolio.add_order(order, limit_price=100.0)
+
+        executed = portfolio.check_pending_orders({"AAPL": 99.0}, volume_data={"AAPL": 1000})
+        self.assertEqual(executed[0].quantity, 100)
+        self.assertEqual(portfolio.open_orders_df.iloc[0]['quantity'], 200)
+        self.assertFalse(portfolio.open_orders_df.iloc[0]['filled'])
+
+        portfolio.check_pending_orders({"AAPL": 99.0}, volume_data={"AAPL": 5000})
+        self.assertTrue(portfolio.open_orders_df.iloc[0]['filled'])
+        self.assertEqual(portfolio.position_df.loc["AAPL", 'quantity'], 300)
+
+    def test_zero_volume_does_not_fill(self):
+        """Test that no volume means no fill"""
+        portfolio = Portfolio(10000, cost_model=VolumeParticipationCap(0.1))
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 10, open_price=100.0)
+        self.assertFalse(portfolio.execute_market_order(order, 100.0, volume=0))
+        self.assertTrue(portfolio.position_df.empty)
+        self.assertFalse(order.filled)
+        self.assertIsNone(order.fill_price)
+        self.assertIsNone(order.fill_time)
+
+    def test_option_fills_pay_costs(self):
+        """Test that option fills pay spread on the premium and commission on the contract value"""
+        portfolio = Portfolio(10000, cost_model=CompositeCostModel(PerShareCommission(0.65, max_pct_of_value=0.01),
+                                                                   SpreadCost(200)))
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 2, open_price=0.5)
+        self.assertTrue(portfolio.execute_option_order(order, 0.5, 'call', 150.0, datetime(2025, 6, 20)))
+        # 1% of a 50.5 contract caps the 0.65 fee at 0.505 per contract
+        self.assertAlmostEqual(portfolio.current_cash, 10000 - 2 * 0.505 * 100 - 2 * 0.505)
+        self.assertAlmostEqual(portfolio.option_positions_df.iloc[0]['avg_price'], 0.505)
+        self.assertAlmostEqual(portfolio.filled_orders_df.iloc[0]['commission'], 1.01)
+
+        capped = Portfolio(10000, cost_model=VolumeParticipationCap(0.1))
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 2, open_price=0.5)
+        self.assertFalse(capped.execute_option_order(order, 0.5, 'call', 150.0, datetime(2025, 6, 20), volume=5))
+        self.assertTrue(capped.option_positions_df.empty)
+        self.assertIsNone(order.fill_price)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.data_sources import (DataSource, DataSourceError, YFinanceSource, LocalFileSource, MemmapSource,
+                               SyntheticSource, source_from_env)
+from data.data_factory import DataLoader, SOURCES
+from data.chain_store import ChainStore, synthetic_chain_snapshot
+from data.rate_curve import RateCurve
+from data.synthetic_data import generate_panel
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class SlowSource(DataSource):
+    name = 'slow'
+
+    def __init__(self, max_concurrency=None):
+        super().__init__(max_concurrency)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _fetch_ticker(self, ticker, start, end):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        if ticker == 'BAD':
+            raise RuntimeError("connection reset")
+        return pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex(['2024-01-02'], name='Date'))
+
+
+class FakeYFinance(YFinanceSource):
+    # yf.download's (Price, Ticker) layout without the network
+    def __init__(self, frames):
+        super().__init__()
+        self.frames = frames
+        self.calls = []
+
+    def _download(self, tickers, start, end):
+        self.calls.append(tickers)
+        tickers = [tickers] if isinstance(tickers, str) else tickers
+        present = {ticker: self.frames[ticker] for ticker in tickers if ticker in self.frames}
+        data = pd.concat(present, axis=1).swaplevel(axis=1)
+        data.columns.names = ['Price', 'Ticker']
+        return data
+
+
+class TestDataSources(unittest.TestCase):
+    """Test cases for the pluggable data source backends"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.frames = generate_panel(['AAPL', 'MSFT', 'GOOG'], '2024-01-01', n_bars=120, seed=2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        for name in ('local', 'memmap'):
+            SOURCES.pop(name, None)
+
+    def assert_bars_equal(self, actual, expected):
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_freq=False)
+
+    def test_local_csv(self):
+        """Test single and batch fetches, date windows and reloads of changed files"""
+        source = LocalFileSource(self.root)
+        for ticker, frame in self.frames.items():
+            source.write(ticker, frame)
+        self.assert_bars_equal(source.fetch_bars('AAPL'), self.frames['AAPL'])
+        batch = source.fetch_bars(['MSFT', 'GOOG'], '2024-02-01', '2024-03-01')
+        self.assertEqual(list(batch), ['MSFT', 'GOOG'])
+        self.assert_bars_equal(batch['GOOG'], self.frames['GOOG'].loc['2024-02-01':'2024-02-29'])
+
+        changed = self.frames['AAPL'].iloc[:10]
+        source.write('AAPL', changed)
+        os.utime(source.path('AAPL'), ns=(0, time.time_ns() + 10 ** 9))
+        self.assertEqual(len(source.fetch_bars('AAPL')), 10)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_local_parquet(self):
+        """Test Parquet files in the same directory layout"""
+        source = LocalFileSource(self.root, file_format='parquet')
+        source.write('AAPL', self.frames['AAPL'], file_format='parquet')
+        self.assert_bars_equal(source.fetch_bars('AAPL'), self.frames['AAPL'])
+
+    def test_memmap(self):
+        """Test memory-mapped bar files with binary searched ranges"""
+        source = MemmapSource(self.root)
+        for ticker, frame in self.frames.items():
+            source.write(ticker, frame)
+        self.assert_bars_equal(source.fetch_bars('MSFT'), self.frames['MSFT'])
+        window = source.fetch_bars('AAPL', '2024-03-01', '2024-04-01')
+        self.assert_bars_equal(window, self.frames['AAPL'].loc['2024-03-01':'2024-03-31'])
+        self.assertEqual(window.index.name, 'Date')
+
+    def test_errors(self):
+        """Test that failed tickers are collected in one DataSourceError"""
+        source = LocalFileSource(self.root)
+        source.write('AAPL', self.frames['AAPL'])
+        with self.assertRaises(DataSourceError) as context:
+            source.fetch_bars(['AAPL', 'TSLA', 'NVDA'])
+        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual(set(context.exception.errors), {'TSLA', 'NVDA'})
+        self.assertEqual(context.exception.source, 'local')
+        with self.assertRaises(DataSourceError):
+            source.fetch_bars('AAPL', '2030-01-01', '2031-01-01')
+        with self.assertRaises(DataSourceError):
+            source.fetch_chain('AAPL')
+        with self.assertRaises(DataSourceError) as context:
+            SlowSource().fetch_bars(['AAPL', 'BAD'])
+        self.assertIn('connection reset', context.exception.errors['BAD'])
+
+    def test_source_must_implement_fetch(self):
+        """Test that a backend without _fetch_ticker cannot be built"""
+        class EmptySource(DataSource):
+            name = 'empty'
+        with self.assertRaises(TypeError):
+            EmptySource()
+
+    def test_concurrency_limit(self):
+        """Test that the semaphore bounds requests across batches and threads"""
+        source = SlowSource(max_concurrency=2)
+        tickers = [f'T{i}' for i in range(8)]
+        threads = [threading.Thread(target=source.fetch_bars, args=(tickers,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(source.peak, 2)
+        with self.assertRaises(ValueError):
+            SlowSource(max_concurrency=0)
+
+    def test_yfinance_batch_is_one_download(self):
+        """Test splitting one multi-ticker download into per-ticker frames"""
+        frames = {ticker: frame.astype(float) for ticker, frame in self.frames.items()}
+        frames['GOOG'] = frames['GOOG'].iloc[50:]
+        source = FakeYFinance(frames)
+        batch = source.fetch_bars(['AAPL', 'GOOG'], '2024-01-01', '2024-12-31')
+        self.assertEqual(len(source.calls), 1)
+        self.assertEqual(list(batch['GOOG'].columns), ['Close', 'High', 'Low', 'Open', 'Volume'])
+        self.assert_bars_equal(batch['GOOG'], frames['GOOG'])
+        self.assert_bars_equal(source.fetch_bars('AAPL'), frames['AAPL'])
+        with self.assertRaises(DataSourceError) as context:
+            source.fetch_bars(['AAPL', 'ZZZZ'])
+        self.assertEqual(list(context.exception.errors), ['ZZZZ'])
+
+    def test_data_loader_uses_configured_source(self):
+        """Test DataLoader with a local data directory chosen from the environment"""
+        source = LocalFileSource(self.root)
+        source.write('AAPL', self.frames['AAPL'])
+        store = ChainStore(os.path.join(self.root, 'chains'))
+        store.save_snapshot('AAPL', '2024-06-14', synthetic_chain_snapshot(150.0, '2024-06-14', ['2024-07-19']))
+        RateCurve.flat(0.031).to_csv(os.path.join(self.root, 'rates.csv'))
+
+        environment = {'ALGO_DATA_SOURCE': 'local', 'ALGO_DATA_DIR': self.root}
+        original = {name: os.environ.get(name) for name in environment}
+        os.environ.update(environment)
+        try:
+            self.assertIsInstance(DataLoader.source(), LocalFileSource)
+            stock = DataLoader.load_data('AAPL', '2024-01-01', '2024-04-01')
+        finally:
+            for name, value in original.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        self.assertEqual(stock.get_prices.index[-1], pd.Timestamp('2024-03-29'))
+
+        configured = LocalFileSource(self.root, chain_store=store)
+        option = DataLoader.load_data('AAPL', '2024-01-01', '2024-04-01', data_type='option', source=configured)
+        self.assertEqual(option.strike_price, 150.0)
+        self.assertAlmostEqual(option.risk_free_rate, 0.031)
+        with self.assertRaises(DataSourceError):
+            DataLoader.load_data('MSFT', '2024-01-01', '2024-04-01', source=configured)
+
+    def test_load_batch(self):
+        """Test building StockData for several tickers from one fetch"""
+        batch = DataLoader.load_batch(['AAPL', 'MSFT'], '2024-01-01', '2024-06-01', source=SyntheticSource(seed=4))
+        self.assertEqual(list(batch), ['AAPL', 'MSFT'])
+        self.assertGreater(batch['MSFT'].get_volatility, 0)
+
+    def test_source_from_env(self):
+        """Test building backends by name"""
+        self.assertIsInstance(source_from_env('synthetic'), SyntheticSource)
+        self.assertIsInstance(source_from_env('yfinance'), YFinanceSource)
+        with self.assertRaises(ValueError):
+            source_from_env('bloomberg')
+
+
+if __name__ == '__main__':
+    unittest.main()
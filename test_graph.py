@@ -0,0 +1,102 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from graph.decimation import minmax_indices, lttb_indices, decimate
+from graph.graph_model import GraphModel, _figure_cache
+from data.stock_data import StockData
+from data.synthetic_data import generate_prices
+
+
+def make_stock(n_bars, freq='1min', seed=0):
+    prices = generate_prices('2024-01-02', n_bars=n_bars, freq=freq, seed=seed)
+    return StockData(ticker='SYN', start_date=prices.index[0], end_date=prices.index[-1], prices=prices)
+
+
+class TestDecimation(unittest.TestCase):
+    """Test cases for series decimation"""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.series = pd.Series(np.cumsum(rng.normal(size=100000)),
+                                index=pd.date_range('2024-01-01', periods=100000, freq='min'))
+        self.series.iloc[54321] = 1e6
+
+    def test_minmax_keeps_extremes_and_endpoints(self):
+        """Test that min/max decimation keeps spikes, first and last points"""
+        indices = minmax_indices(self.series.index, self.series.to_numpy(), 500)
+        self.assertLessEqual(len(indices), 4 * 500)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        for position in (0, len(self.series) - 1, 54321, int(self.series.to_numpy().argmin())):
+            self.assertIn(position, indices)
+
+    def test_minmax_handles_nans(self):
+        """Test that leading NaNs do not hide the real extremes"""
+        values = self.series.to_numpy().copy()
+        values[:5000] = np.nan
+        indices = minmax_indices(self.series.index, values, 100)
+        self.assertIn(54321, indices)
+
+    def test_lttb_output_size(self):
+        """Test that LTTB returns exactly n_out sorted points including endpoints"""
+        indices = lttb_indices(self.series.index, self.series.to_numpy(), 1000)
+        self.assertEqual(len(indices), 1000)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], len(self.series) - 1)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(54321, indices)
+
+    def test_decimate_short_series_unchanged(self):
+        """Test that series below the point budget are returned as is"""
+        short = self.series.iloc[:100]
+        self.assertIs(decimate(short, 1000), short)
+        with self.assertRaises(ValueError):
+            decimate(self.series, 1000, method='bogus')
+
+
+class TestHeadlessRendering(unittest.TestCase):
+    """Test cases for GraphModel file rendering"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.graph = GraphModel(make_stock(50000))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_png_and_svg(self):
+        """Test that every chart renders to a file without a GUI"""
+        for method in ('plot_price_chart', 'plot_returns_distribution', 'plot_volatility_analysis',
+                       'plot_cumulative_returns', 'plot_summary_dashboard'):
+            for extension in ('png', 'svg'):
+                path = os.path.join(self.tmp.name, f'{method}.{extension}')
+                self.assertEqual(getattr(self.graph, method)(save_path=path), path)
+                self.assertGreater(os.path.getsize(path), 0)
+
+    def test_figure_reused_and_decimated(self):
+        """Test that repeated renders reuse one figure and plot a bounded number of points"""
+        path = os.path.join(self.tmp.name, 'price.png')
+        self.graph.plot_price_chart(save_path=path)
+        fig, (ax,) = _figure_cache.figures[('price_chart', (12, 6))]
+        GraphModel(make_stock(60000, seed=2)).plot_price_chart(save_path=path)
+        fig_again, (ax_again,) = _figure_cache.figures[('price_chart', (12, 6))]
+        self.assertIs(fig, fig_again)
+        self.assertLessEqual(len(ax_again.lines[0].get_xdata()), 4 * 1200)
+
+    def test_decimation_disabled_plots_every_point(self):
+        """Test that decimation=None keeps the full series"""
+        path = os.path.join(self.tmp.name, 'price.png')
+        GraphModel(make_stock(5000), decimation=None).plot_price_chart(save_path=path)
+        _, (ax,) = _figure_cache.figures[('price_chart', (12, 6))]
+        self.assertEqual(len(ax.lines[0].get_xdata()), 5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import subprocess
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+
+def loaded_heavy_modules(statement):
+    code = f"{statement}; import sys; print(','.join(sorted({{'scipy', 'matplotlib', 'yfinance'}} & set(sys.modules))))"
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                               cwd=str(Path(__file__).parent), check=True)
+    return completed.stdout.strip()
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test that heavy dependencies load only on first use"""
+
+    def test_data_package_import_is_light(self):
+        """Test that importing the data loaders does not load yfinance or scipy"""
+        self.assertEqual(loaded_heavy_modules("import data.data_factory, data.option_data"), '')
+
+    def test_graph_and_portfolio_import_is_light(self):
+        """Test that GraphModel and Portfolio do not load matplotlib or scipy"""
+        self.assertEqual(loaded_heavy_modules("import graph.graph_model, graph.batch_report, portfolio.portfolio, portfolio.risk"), '')
+
+    def test_pricing_loads_scipy_on_first_call(self):
+        """Test that scipy is imported when an option is first priced"""
+        statement = "from data.option_pricer import black_scholes; black_scholes(100, 100, 1, 0.05, 0.2, True)"
+        self.assertEqual(loaded_heavy_modules(statement), 'scipy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import json
+import os
+import tempfile
+from datetime import datetime
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from monitoring.instrumentation import Instrumentation, LatencyHistogram
+from order.order import Order, OrderType, OrderDirection, LimitOrder
+from portfolio.portfolio import Portfolio
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for the HDR-style latency histogram"""
+
+    def test_percentiles_within_precision(self):
+        """Test that percentiles stay within the bucket precision"""
+        values = np.random.default_rng(0).lognormal(10, 1.5, 20000).astype(int)
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        for pct in (50, 99):
+            self.assertAlmostEqual(histogram.percentile(pct) / np.percentile(values, pct), 1.0, delta=0.02)
+        self.assertEqual(histogram.snapshot()['max_ns'], values.max())
+
+    def test_small_values_are_exact(self):
+        """Test that values below the sub-bucket count are exact"""
+        histogram = LatencyHistogram()
+        for value in (3, 5, 7, 9):
+            histogram.record(value)
+        self.assertEqual(histogram.percentile(50), 5)
+        self.assertEqual(histogram.snapshot()['min_ns'], 3)
+
+    def test_empty_snapshot(self):
+        """Test the snapshot of an empty histogram"""
+        self.assertEqual(LatencyHistogram().snapshot(), {'count': 0})
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for opt-in hot path instrumentation"""
+
+    def setUp(self):
+        self.original = Portfolio.__dict__['update_portfolio_value']
+
+    def tearDown(self):
+        Portfolio.update_portfolio_value = self.original
+
+    def _trade(self):
+        portfolio = Portfolio(initial_capital=10000)
+        portfolio.add_order(LimitOrder("AAPL", OrderDirection.LONG, 10, limit_price=150.0, open_price=150.0),
+                            limit_price=150.0)
+        portfolio.check_pending_orders({"AAPL": 149.0})
+        portfolio.update_portfolio_value({"AAPL": 149.0}, datetime(2024, 1, 2))
+
+    def test_records_hot_paths(self):
+        """Test that enabled instrumentation counts calls per method"""
+        with Instrumentation() as instrumentation:
+            self._trade()
+            self._trade()
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot['Portfolio.add_order']['count'], 2)
+        self.assertEqual(snapshot['Portfolio._update_positions']['count'], 2)
+        self.assertEqual(snapshot['Portfolio.update_portfolio_value']['count'], 2)
+        self.assertGreater(snapshot['Portfolio.check_pending_orders']['p99_ns'], 0)
+        self.assertIn('allocated_blocks', snapshot['Portfolio.add_order'])
+
+    def test_disable_restores_methods(self):
+        """Test that disabling leaves the original methods in place"""
+        instrumentation = Instrumentation().enable()
+        self.assertIsNot(Portfolio.__dict__['update_portfolio_value'], self.original)
+        instrumentation.disable()
+        self.assertIs(Portfolio.__dict__['update_portfolio_value'], self.original)
+        self._trade()
+        self.assertEqual(instrumentation.snapshot()['Portfolio.add_order']['count'], 0)
+
+    def test_custom_targets_and_json_export(self):
+        """Test instrumenting chosen methods and exporting a JSON snapshot"""
+        instrumentation = Instrumentation(track_allocations=False)
+        instrumentation.enable([(Order, 'execute_order')])
+        try:
+            Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 1, open_price=1.0).execute_order(1.0)
+        finally:
+            instrumentation.disable()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = instrumentation.write_snapshot(os.path.join(tmp, "metrics.json"))
+            with open(path) as handle:
+                exported = json.load(handle)
+        self.assertEqual(exported['metrics']['Order.execute_order']['count'], 1)
+
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot()['Order.execute_order']['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from kernels.backend import BACKEND, KERNELS
+from kernels.positions import apply_fills
+from kernels.lattice import american_binomial
+from kernels.matching import bar_fills, LIMIT, STOP, STOP_LIMIT
+from data.option_pricer import american_option, black_scholes
+from backtest.backtester import simulate_bar_fills
+from order.order import OrderType, OrderDirection, LimitOrder, StopOrder
+from portfolio.portfolio import Portfolio
+
+
+def fill_inputs(rng, n_portfolios=40, n_symbols=4):
+    fills = rng.integers(-30, 31, (n_portfolios, n_symbols)).astype(float) * (rng.random((n_portfolios, n_symbols)) < 0.6)
+    prices = rng.uniform(50, 150, (n_portfolios, n_symbols))
+    commission = rng.uniform(0, 2, (n_portfolios, n_symbols))
+    quantity = rng.integers(-20, 21, (n_portfolios, n_symbols)).astype(float)
+    avg_price = np.where(quantity != 0, rng.uniform(50, 150, quantity.shape), 0.0)
+    cash = rng.uniform(0, 3000, n_portfolios)
+    return quantity, avg_price, cash, fills, prices, commission
+
+def lattice_inputs(rng, n_options=30):
+    return (rng.uniform(80, 120, n_options), rng.uniform(80, 120, n_options), rng.uniform(0.05, 2.0, n_options),
+            rng.uniform(0.0, 0.08, n_options), rng.uniform(0.1, 0.6, n_options), rng.random(n_options) < 0.5)
+
+def matching_inputs(rng, n_orders=200, n_bars=120):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    opens = close * np.exp(rng.normal(0, 0.005, n_bars))
+    highs = np.maximum(opens, close) * (1 + rng.uniform(0, 0.01, n_bars))
+    lows = np.minimum(opens, close) * (1 - rng.uniform(0, 0.01, n_bars))
+    kind = rng.integers(0, 3, n_orders)
+    levels = rng.uniform(70, 130, n_orders)
+    limit_price = np.where(kind == STOP, np.nan, levels * rng.uniform(0.98, 1.02, n_orders))
+    stop_price = np.where(kind == LIMIT, np.nan, levels)
+    return (rng.integers(0, n_bars, n_orders), rng.random(n_orders) < 0.5, kind, limit_price, stop_price,
+            opens, highs, lows)
+
+
+class TestKernels(unittest.TestCase):
+    """Test cases for the kernel backends"""
+
+    def run_pair(self, name, inputs):
+        loop_version, numpy_version = KERNELS[name]
+        copies = [tuple(np.array(value, copy=True) if isinstance(value, np.ndarray) else value for value in inputs)
+                  for _ in range(3)]
+        return loop_version(*copies[0]), numpy_version(*copies[1]), copies
+
+    def test_backend_is_known(self):
+        """Test that a backend was selected at import"""
+        self.assertIn(BACKEND, ('numba', 'numpy'))
+        self.assertEqual(set(KERNELS), {'apply_fills', 'american_binomial', 'bar_fills'})
+
+    def test_apply_fills_versions_agree(self):
+        """Test loop and NumPy position updates give identical ledgers"""
+        for seed in range(5):
+            (loop_filled, loop_rejected), (numpy_filled, numpy_rejected), copies = self.run_pair(
+                'apply_fills', fill_inputs(np.random.default_rng(seed)))
+            np.testing.assert_array_equal(loop_filled, numpy_filled)
+            np.testing.assert_array_equal(loop_rejected, numpy_rejected)
+            for left, right in zip(copies[0][:3], copies[1][:3]):
+                np.testing.assert_array_equal(left, right)
+            self.assertGreater(loop_rejected.sum(), 0)
+
+    def test_american_binomial_versions_agree(self):
+        """Test loop and NumPy lattices give the same prices"""
+        inputs = lattice_inputs(np.random.default_rng(1)) + (60,)
+        loop_prices, numpy_prices, _ = self.run_pair('american_binomial', inputs)
+        np.testing.assert_allclose(loop_prices, numpy_prices, rtol=1e-12, atol=1e-12)
+
+    def test_bar_fills_versions_agree(self):
+        """Test loop and NumPy bar matching give identical fills"""
+        for seed in range(5):
+            (loop_bar, loop_price), (numpy_bar, numpy_price), _ = self.run_pair(
+                'bar_fills', matching_inputs(np.random.default_rng(seed)))
+            np.testing.assert_array_equal(loop_bar, numpy_bar)
+            np.testing.assert_array_equal(loop_price, numpy_price)
+            self.assertTrue((loop_bar >= 0).any() and (loop_bar < 0).any())
+
+    def test_active_backend_matches_numpy(self):
+        """Test that the selected kernels agree with the NumPy versions"""
+        rng = np.random.default_rng(9)
+        inputs = fill_inputs(rng)
+        expected = KERNELS['apply_fills'][1](*[np.array(value, copy=True) for value in inputs])
+        actual = apply_fills(*[np.array(value, copy=True) for value in inputs])
+        np.testing.assert_array_equal(actual[0], expected[0])
+        inputs = lattice_inputs(rng)
+        np.testing.assert_allclose(american_binomial(*inputs, 50), KERNELS['american_binomial'][1](*inputs, 50), rtol=1e-12)
+        inputs = matching_inputs(rng)
+        np.testing.assert_array_equal(bar_fills(*inputs)[0], KERNELS['bar_fills'][1](*inputs)[0])
+
+    def test_american_option_prices(self):
+        """Test early exercise premium and convergence to Black-Scholes for calls"""
+        call = american_option(100.0, 100.0, 1.0, 0.05, 0.2, True, steps=400)
+        european_call = black_scholes(100.0, 100.0, 1.0, 0.05, 0.2, True)['price']
+        self.assertAlmostEqual(float(call), float(european_call), places=2)
+        put = american_option(100.0, 110.0, 1.0, 0.05, 0.3, False)
+        self.assertGreater(float(put), float(black_scholes(100.0, 110.0, 1.0, 0.05, 0.3, False)['price']))
+        np.testing.assert_array_equal(american_option([100.0, 100.0], [90.0, 110.0], 0.0, 0.05, 0.3, False), [0.0, 10.0])
+
+    def test_simulate_bar_fills(self):
+        """Test limit, stop and stop-limit orders against OHLC bars"""
+        index = pd.bdate_range('2024-01-01', periods=5)
+        bars = pd.DataFrame({'Open': [100, 101, 98, 97, 105], 'High': [102, 103, 99, 99, 107],
+                             'Low': [99, 100, 96, 95, 104], 'Close': [101, 99, 97, 98, 106]}, index=index, dtype=float)
+        orders = pd.DataFrame({
+            'order_id': [1, 2, 3, 4, 5],
+            'order_type': [OrderType.LIMIT, OrderType.STOP, OrderType.STOP, OrderType.LIMIT, OrderType.STOP],
+            'direction': [OrderDirection.LONG, OrderDirection.LONG, OrderDirection.SHORT, OrderDirection.SHORT,
+                          OrderDirection.LONG],
+            'limit_price': [97.0, None, 104.5, 200.0, None],
+            'stop_price': [None, 98.5, 104.0, None, 96.5],
+            'open_time': [index[0]] * 5,
+        })
+        fills = simulate_bar_fills(orders, bars)
+        self.assertEqual(list(fills['filled']), [True, True, True, False, True])
+        self.assertEqual(list(fills['fill_time'][[0, 1, 2, 4]]), [index[2], index[2], index[4], index[2]])
+        # Gapping through the stop fills at the open
+        np.testing.assert_array_equal(fills['fill_price'][[0, 1, 2, 4]], [97.0, 98.0, 105.0, 96.5])
+
+    def test_bar_fills_match_check_pending_orders(self):
+        """Test that limit and stop orders fill as Portfolio.check_pending_orders fills them"""
+        rng = np.random.default_rng(4)
+        index = pd.bdate_range('2024-01-01', periods=60)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+        # One price per bar, the only price check_pending_orders sees
+        bars = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close}, index=index)
+        portfolio = Portfolio(initial_capital=1e9)
+        fills = {}
+        for t, timestamp in enumerate(index):
+            for order in portfolio.check_pending_orders({'AAPL': close[t]}, timestamp=timestamp):
+                fills[order.order_id] = (timestamp, order.fill_price)
+            if t % 3 == 0:
+                for direction in (OrderDirection.LONG, OrderDirection.SHORT):
+                    level = close[t] * rng.uniform(0.9, 1.1)
+                    if rng.random() < 0.5:
+                        portfolio.add_order(LimitOrder('AAPL', direction, 1, level, close[t], timestamp),
+                                            limit_price=level)
+                    else:
+                        portfolio.add_order(StopOrder('AAPL', direction, 1, level, close[t], timestamp),
+                                            stop_price=level)
+        simulated = simulate_bar_fills(portfolio.open_orders_df, bars).set_index('order_id')
+        self.assertEqual(set(simulated.index[simulated['filled']]), set(fills))
+        for order_id, (timestamp, price) in fills.items():
+            self.assertEqual(simulated.loc[order_id, 'fill_time'], timestamp)
+            self.assertAlmostEqual(simulated.loc[order_id, 'fill_price'], price)
+        self.assertTrue(fills and (~simulated['filled']).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
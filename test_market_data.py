@@ -0,0 +1,165 @@
+import unittest
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from monitoring.instrumentation import LatencyHistogram
+from live.market_data import CoalescingQuoteQueue, FeedAdapter, MarketDataPipeline, Quote, SimulatedFeed
+from data.stock_data import StockData
+from order.order import OrderDirection, LimitOrder
+from portfolio.portfolio import Portfolio
+
+
+def make_prices(n, price, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2024-01-01", periods=n)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': 1e6}, index=index)
+
+
+class TestStockDataAppendBar(unittest.TestCase):
+    """Test cases for incremental bar appends on StockData"""
+
+    def test_append_matches_full_recompute(self):
+        """Test that appended bars give the same returns and volatility as a reload"""
+        prices = make_prices(50, 100.0, 4)
+        stock = StockData("AAPL", prices.index[0], prices.index[29], prices.iloc[:30].copy())
+        for timestamp, row in prices.iloc[30:].iterrows():
+            stock.append_bar(timestamp, row.to_dict())
+        full = StockData("AAPL", prices.index[0], prices.index[-1], prices)
+        self.assertAlmostEqual(stock.get_volatility, full.get_volatility)
+        np.testing.assert_allclose(stock.get_log_returns.to_numpy(), full.get_log_returns.to_numpy())
+
+    def test_append_cost_does_not_grow_with_history(self):
+        """Test that appends are buffered instead of copying the history each bar"""
+        def append_seconds(n_history):
+            prices = make_prices(n_history + 500, 100.0, 6)
+            stock = StockData("AAPL", prices.index[0], prices.index[n_history - 1], prices.iloc[:n_history].copy())
+            frame = stock.prices
+            rows = prices.iloc[n_history:].to_dict('records')
+            start = time.perf_counter()
+            for timestamp, row in zip(prices.index[n_history:], rows):
+                stock.append_bar(timestamp, row)
+            elapsed = time.perf_counter() - start
+            self.assertIs(stock.prices, frame)
+            self.assertEqual(stock.last_timestamp, prices.index[-1])
+            self.assertEqual(len(stock.get_prices), n_history + 500)
+            return elapsed
+
+        small, large = append_seconds(1_000), append_seconds(50_000)
+        self.assertLess(large, 5 * small + 0.01)
+
+    def test_append_requires_close(self):
+        """Test that a bar without a close price is rejected"""
+        prices = make_prices(5, 100.0, 5)
+        stock = StockData("AAPL", prices.index[0], prices.index[-1], prices.copy())
+        with self.assertRaises(ValueError):
+            stock.append_bar(pd.Timestamp("2025-01-01"), {'Open': 1.0})
+
+
+class TestCoalescingQuoteQueue(unittest.TestCase):
+    """Test cases for the bounded coalescing quote queue"""
+
+    def test_stale_quotes_are_coalesced(self):
+        """Test that a newer quote replaces a pending one for the same symbol"""
+        async def scenario():
+            queue = CoalescingQuoteQueue(maxsize=10)
+            await queue.put(Quote("AAPL", 1, 100.0, {}, 0))
+            await queue.put(Quote("MSFT", 1, 400.0, {}, 0))
+            await queue.put(Quote("AAPL", 2, 101.0, {}, 0))
+            first, second = await queue.get(), await queue.get()
+            return queue, first, second
+        queue, first, second = asyncio.run(scenario())
+        self.assertEqual((first.symbol, first.price), ("AAPL", 101.0))
+        self.assertEqual(second.symbol, "MSFT")
+        self.assertEqual(queue.coalesced, 1)
+
+    def test_backpressure_when_full(self):
+        """Test that a full queue makes the producer wait for the consumer"""
+        async def scenario():
+            queue = CoalescingQuoteQueue(maxsize=1)
+            await queue.put(Quote("AAPL", 1, 100.0, {}, 0))
+            producer = asyncio.create_task(queue.put(Quote("MSFT", 1, 400.0, {}, 0)))
+            await asyncio.sleep(0)
+            waiting = not producer.done()
+            await queue.get()
+            await producer
+            return queue, waiting
+        queue, waiting = asyncio.run(scenario())
+        self.assertTrue(waiting)
+        self.assertEqual(queue.blocked, 1)
+        self.assertEqual(len(queue), 1)
+
+
+class TestMarketDataPipeline(unittest.TestCase):
+    """Test cases for the asyncio paper-trading pipeline"""
+
+    def test_end_to_end_replay(self):
+        """Test that replayed quotes append bars, fill orders and mark the portfolio"""
+        history = {"AAPL": make_prices(60, 150.0, 1), "MSFT": make_prices(60, 400.0, 2)}
+        stock = StockData("AAPL", history["AAPL"].index[0], history["AAPL"].index[29],
+                          history["AAPL"].iloc[:30].copy())
+        portfolio = Portfolio(initial_capital=100000)
+        limit = history["AAPL"]['Close'].iloc[30:].max() + 1.0
+        portfolio.add_order(LimitOrder("AAPL", OrderDirection.LONG, 10, limit_price=limit, open_price=limit),
+                            limit_price=limit)
+
+        feed = SimulatedFeed({"AAPL": history["AAPL"].iloc[30:], "MSFT": history["MSFT"]})
+        pipeline = MarketDataPipeline([feed], portfolio, stock_data={"AAPL": stock})
+        stats = pipeline.run_sync()
+
+        self.assertEqual(stats['quotes_sent'], 90)
+        self.assertEqual(stats['quotes_processed'] + stats['quotes_coalesced'], 90)
+        self.assertEqual(stats['fills'], 1)
+        self.assertIsNotNone(stats['fill_latency']['p99_us'])
+        self.assertEqual(len(stock.get_prices), 60)
+        self.assertEqual(portfolio.position_df.loc["AAPL", 'quantity'], 10)
+        self.assertEqual(pipeline.last_prices["MSFT"], history["MSFT"]['Close'].iloc[-1])
+
+    def test_latency_is_kept_in_bounded_histograms(self):
+        """Test that latency samples do not grow with the number of quotes"""
+        feed = SimulatedFeed({"AAPL": make_prices(500, 100.0, 4)})
+        pipeline = MarketDataPipeline([feed], Portfolio())
+        stats = pipeline.run_sync()
+        self.assertEqual(pipeline.quote_latency_ns.total_count, 500)
+        self.assertEqual(pipeline.quote_latency_ns.counts.size, LatencyHistogram().counts.size)
+        self.assertLessEqual(stats['quote_latency']['p50_us'], stats['quote_latency']['max_us'])
+
+    def test_consumer_error_stops_the_feeds(self):
+        """Test that a failing consumer is re-raised instead of leaving feeds blocked on a full queue"""
+        history = {f"S{i}": make_prices(50, 100.0, i) for i in range(5)}
+        feed = SimulatedFeed(history)
+
+        def fail(quote, pipeline):
+            raise RuntimeError("bad quote")
+
+        pipeline = MarketDataPipeline([feed], Portfolio(), queue_size=2, on_quote=fail)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(asyncio.wait_for(pipeline.run(), timeout=5))
+        self.assertLess(feed.sent, 250)
+
+    def test_feed_must_implement_run(self):
+        """Test that a feed without run() cannot be built"""
+        class SilentFeed(FeedAdapter):
+            pass
+        with self.assertRaises(TypeError):
+            SilentFeed()
+
+    def test_speedup_paces_the_feed(self):
+        """Test that a finite speed-up sleeps between bars"""
+        prices = make_prices(3, 100.0, 3)
+        prices.index = pd.date_range("2024-01-02 09:30", periods=3, freq="1s")
+        feed = SimulatedFeed({"AAPL": prices}, speedup=20)
+        stats = MarketDataPipeline([feed], Portfolio()).run_sync()
+        self.assertGreaterEqual(stats['elapsed_seconds'], 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import unittest
+from datetime import datetime
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from order.order import Order, OrderType, OrderDirection, LimitOrder, StopOrder
+from order.order_book import OrderBook, MatchingEngine
+from order.costs import FixedCommission
+from portfolio.portfolio import Portfolio
+
+
+class TestOrderBook(unittest.TestCase):
+    """Test cases for the price-time priority order book"""
+
+    def setUp(self):
+        self.book = OrderBook("AAPL")
+
+    def test_resting_orders_and_top_of_book(self):
+        """Test that non-crossing limits rest at the best levels"""
+        self.book.add_limit(True, 10, 99.0)
+        self.book.add_limit(True, 5, 99.5)
+        self.book.add_limit(False, 7, 100.5)
+        self.assertEqual(self.book.best_bid, 99.5)
+        self.assertEqual(self.book.best_ask, 100.5)
+        self.assertEqual(self.book.depth()['bids'], [(99.5, 5), (99.0, 10)])
+        self.assertEqual(self.book.trades, [])
+
+    def test_price_time_priority(self):
+        """Test that the earliest order at the best price fills first"""
+        first = self.book.add_limit(False, 5, 100.0)
+        second = self.book.add_limit(False, 5, 100.0)
+        self.book.add_limit(False, 5, 99.0)
+        self.book.add_market(True, 8)
+        trades = self.book.get_trades_df()
+        self.assertListEqual(list(trades['price']), [99.0, 100.0])
+        self.assertListEqual(list(trades['quantity']), [5, 3])
+        self.assertEqual(trades.iloc[1]['sell_order_id'], first)
+        self.assertEqual(self.book.depth()['asks'], [(100.0, 7)])
+        self.book.add_market(True, 3)
+        self.assertEqual(self.book.trades[-1][5], second)
+
+    def test_partial_fill_rests_remainder(self):
+        """Test that a crossing limit fills what it can and rests the rest"""
+        self.book.add_limit(False, 4, 100.0)
+        self.book.add_limit(True, 10, 100.0)
+        self.assertEqual(self.book.best_bid, 100.0)
+        self.assertIsNone(self.book.best_ask)
+        self.assertEqual(self.book.depth()['bids'], [(100.0, 6)])
+
+    def test_cancel(self):
+        """Test cancelling resting orders and unknown ids"""
+        order_id = self.book.add_limit(True, 10, 99.0)
+        other = self.book.add_limit(True, 10, 99.0)
+        self.assertTrue(self.book.cancel(order_id))
+        self.assertFalse(self.book.cancel(order_id))
+        self.book.add_market(False, 4)
+        self.assertEqual(self.book.trades[-1][4], other)
+        self.assertTrue(self.book.cancel(other))
+        self.assertIsNone(self.book.best_bid)
+
+    def test_market_order_is_immediate_or_cancel(self):
+        """Test that unfilled market quantity does not rest"""
+        self.book.add_limit(False, 3, 100.0)
+        self.book.add_market(True, 10)
+        self.assertIsNone(self.book.best_bid)
+        self.assertEqual(sum(t[3] for t in self.book.trades), 3)
+
+    def test_stop_orders_trigger_on_trades(self):
+        """Test that stops trigger from trade prints and can cascade"""
+        self.book.add_limit(True, 10, 98.0)
+        self.book.add_limit(True, 10, 99.0)
+        self.book.add_stop(False, 12, stop_price=99.0)
+        self.book.add_stop(False, 5, stop_price=98.5)
+        self.assertEqual(self.book.trades, [])
+        self.book.add_limit(False, 1, 99.0)
+        trades = self.book.get_trades_df()
+        self.assertListEqual(list(trades['price']), [99.0, 99.0, 98.0, 98.0])
+        self.assertListEqual(list(trades['quantity']), [1, 9, 3, 5])
+        self.assertEqual(self.book.depth()['bids'], [(98.0, 2)])
+
+    def test_listener_error_leaves_book_consistent(self):
+        """Test that a raising listener does not corrupt the book or hide other fills"""
+        maker_fills = []
+        self.book.add_limit(False, 50, 100.0, listener=lambda *fill: maker_fills.append(fill))
+
+        def reject(order_id, price, quantity, timestamp):
+            raise ValueError("rejected")
+        with self.assertRaises(ValueError):
+            self.book.add_market(True, 50, listener=reject)
+        self.assertEqual(len(maker_fills), 1)
+        self.assertIsNone(self.book.best_ask)
+        self.book.add_limit(False, 5, 101.0)
+        self.book.add_market(True, 5)
+        self.assertEqual(self.book.trades[-1][2:4], (101.0, 5))
+        self.assertIsNone(self.book.best_ask)
+
+    def test_listener_error_still_rests_and_releases_stops(self):
+        """Test that a raising listener does not skip resting the remainder or triggering stops"""
+        self.book.add_limit(False, 5, 100.0)
+        self.book.add_limit(True, 20, 95.0)
+        stop = self.book.add_stop(False, 3, stop_price=100.0)
+
+        def reject(order_id, price, quantity, timestamp):
+            raise ValueError("rejected")
+        rejected = []
+        with self.assertRaises(ValueError):
+            self.book.add_limit(True, 8, 100.0, listener=lambda *fill: rejected.append(fill) or reject(*fill))
+        # The unfilled 3 rested at 100 and the sell stop, triggered by the 100 print, traded against them
+        self.assertEqual([trade[2:4] for trade in self.book.trades], [(100.0, 5), (100.0, 3)])
+        self.assertEqual(self.book.trades[-1][5], stop)
+        self.assertEqual(len(rejected), 2)
+        self.assertEqual(self.book.depth()['bids'], [(95.0, 20)])
+        self.assertEqual(self.book._orders.keys() & {stop, rejected[0][0]}, set())
+
+
+class TestPortfolioWithOrderBook(unittest.TestCase):
+    """Test cases for using the matching engine as the portfolio's fill source"""
+
+    def setUp(self):
+        self.engine = MatchingEngine()
+        self.portfolio = Portfolio(initial_capital=10000, fill_source=self.engine)
+        self.book = self.engine.get_book("AAPL")
+        self.now = datetime(2024, 1, 2, 10, 0)
+
+    def test_limit_order_partial_fills(self):
+        """Test that book liquidity produces partial fills on the portfolio"""
+        self.book.add_limit(False, 4, 100.0)
+        order = LimitOrder("AAPL", OrderDirection.LONG, 10, limit_price=100.0, open_price=100.0, timestamp=self.now)
+        self.portfolio.add_order(order, limit_price=100.0)
+
+        self.assertEqual(self.portfolio.position_df.loc["AAPL", 'quantity'], 4)
+        self.assertEqual(self.portfolio.open_orders_df.iloc[0]['quantity'], 6)
+        self.assertEqual(len(self.portfolio.check_pending_orders({})), 1)
+
+        self.book.add_market(False, 6, timestamp=self.now)
+        self.assertTrue(self.portfolio.open_orders_df.iloc[0]['filled'])
+        self.assertEqual(self.portfolio.position_df.loc["AAPL", 'quantity'], 10)
+        self.assertEqual(self.portfolio.current_cash, 10000 - 1000)
+        self.assertEqual(len(self.portfolio.filled_orders_df), 2)
+
+    def test_market_order_remainder_is_dropped(self):
+        """Test that an unfilled market order does not stay open"""
+        self.book.add_limit(False, 2, 100.0)
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 5, open_price=100.0, timestamp=self.now)
+        self.portfolio.add_order(order)
+        self.assertEqual(self.portfolio.position_df.loc["AAPL", 'quantity'], 2)
+        self.assertTrue(self.portfolio.open_orders_df.empty)
+
+    def test_cancel_routed_order(self):
+        """Test cancelling a resting portfolio order"""
+        order = StopOrder("AAPL", OrderDirection.SHORT, 5, stop_price=95.0, open_price=100.0, timestamp=self.now)
+        self.portfolio.add_order(order, stop_price=95.0)
+        self.assertTrue(self.portfolio.cancel_order(order.order_id))
+        self.assertTrue(self.portfolio.open_orders_df.empty)
+        self.assertFalse(self.engine.cancel("AAPL", order.order_id))
+
+    def test_commission_on_book_fills(self):
+        """Test that the portfolio cost model charges commission on book fills"""
+        portfolio = Portfolio(10000, cost_model=FixedCommission(1.0), fill_source=self.engine)
+        self.book.add_limit(False, 5, 100.0)
+        portfolio.add_order(Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 5, open_price=100.0))
+        self.assertEqual(portfolio.current_cash, 10000 - 500 - 1.0)
+
+    def test_buy_beyond_cash_is_refused_before_routing(self):
+        """Test that an unaffordable buy never reaches the book"""
+        portfolio = Portfolio(1000, fill_source=self.engine)
+        self.book.add_limit(False, 50, 100.0)
+        with self.assertRaises(ValueError):
+            portfolio.add_order(Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 50, open_price=100.0))
+        self.assertEqual(self.book.depth()['asks'], [(100.0, 50)])
+        self.assertTrue(portfolio.open_orders_df.empty)
+
+    def test_rejected_book_fill_drops_the_order(self):
+        """Test that a fill the portfolio cannot pay for leaves neither side corrupted"""
+        portfolio = Portfolio(1000, fill_source=self.engine)
+        self.book.add_limit(False, 50, 100.0)
+        # A stale reference price passes the pre-trade check, the book fill does not
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 50, open_price=10.0)
+        with self.assertRaises(ValueError):
+            portfolio.add_order(order)
+        self.assertTrue(portfolio.open_orders_df.empty)
+        self.assertEqual(portfolio._routed_orders, {})
+        self.assertEqual(portfolio.current_cash, 1000)
+        self.assertIsNone(self.book.best_ask)
+        self.engine.submit(LimitOrder("AAPL", OrderDirection.SHORT, 5, limit_price=101.0))
+        self.assertEqual(self.book.depth()['asks'], [(101.0, 5)])
+
+    def test_stop_orders_trigger_like_check_pending_orders(self):
+        """Test that routed StopOrders trigger on the same prints as reference-price fills"""
+        reference = Portfolio(10000)
+        stops = [(OrderDirection.LONG, 98.0), (OrderDirection.SHORT, 103.0),
+                 (OrderDirection.LONG, 95.0), (OrderDirection.SHORT, 110.0)]
+        ids = {}
+        for position, (direction, stop_price) in enumerate(stops):
+            for portfolio in (self.portfolio, reference):
+                order = StopOrder("AAPL", direction, 1, stop_price=stop_price, open_price=100.0, timestamp=self.now)
+                portfolio.add_order(order, stop_price=stop_price)
+                ids[order.order_id] = position
+        for price in (100.0, 99.0, 97.5, 101.0, 104.0, 100.0):
+            # Quotes either side of the print for triggered stops to trade against
+            bid = self.book.add_limit(True, 10, price)
+            ask = self.book.add_limit(False, 10, price + 0.01)
+            self.book.add_market(False, 1, timestamp=self.now)
+            self.book.cancel(bid)
+            self.book.cancel(ask)
+            routed = {ids[order.order_id] for order in self.portfolio.check_pending_orders({})}
+            expected = {ids[order.order_id] for order in reference.check_pending_orders({"AAPL": price})}
+            self.assertEqual(routed, expected, f"at {price}")
+        self.assertEqual(list(self.portfolio.position_df['quantity']), list(reference.position_df['quantity']))
+        self.assertEqual(len(self.portfolio.filled_orders_df), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
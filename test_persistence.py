@@ -0,0 +1,214 @@
+import unittest
+import os
+import tempfile
+import threading
+import subprocess
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from portfolio.portfolio import Portfolio
+from portfolio import persistence
+from portfolio.persistence import PortfolioStore
+from order.order import Order, OrderType, OrderDirection, LimitOrder
+from order.order_book import MatchingEngine
+
+
+class TestPortfolioStore(unittest.TestCase):
+    """Test cases for SQLite persistence of portfolio state"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'portfolio.db')
+        self.index = pd.bdate_range('2024-01-02', periods=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def trade(self, portfolio, store, bars, name='default'):
+        for i in bars:
+            timestamp = self.index[i]
+            price = 100.0 + i
+            if i % 5 == 0:
+                symbol = 'AAPL' if i % 10 == 0 else 'MSFT'
+                order = Order(symbol, OrderType.MARKET, OrderDirection.LONG, 10, open_price=price, timestamp=timestamp)
+                portfolio.execute_market_order(order, price, timestamp=timestamp)
+            if i % 20 == 0:
+                portfolio.add_order(LimitOrder('GOOG', OrderDirection.LONG, 5, limit_price=price - 50,
+                                               open_price=price, timestamp=timestamp), limit_price=price - 50)
+            portfolio.update_portfolio_value({'AAPL': price, 'MSFT': price}, timestamp)
+            store.sync(portfolio, name)
+
+    def test_round_trip(self):
+        """Test that a reloaded portfolio matches the one that was synced"""
+        portfolio = Portfolio(initial_capital=100000)
+        order = Order('AAPL', OrderType.MARKET, OrderDirection.LONG, 2, open_price=5.0)
+        portfolio.execute_option_order(order, 5.0, 'call', 150.0, pd.Timestamp('2024-06-21'))
+        with PortfolioStore(self.path) as store:
+            self.trade(portfolio, store, range(40))
+
+        with PortfolioStore(self.path) as store:
+            loaded = store.load_portfolio()
+        self.assertEqual(loaded.current_cash, portfolio.current_cash)
+        self.assertEqual(len(loaded.filled_orders_df), len(portfolio.filled_orders_df))
+        self.assertEqual(list(loaded.filled_orders_df['order_id']), list(portfolio.filled_orders_df['order_id']))
+        self.assertEqual(list(loaded.open_orders_df['limit_price']), list(portfolio.open_orders_df['limit_price']))
+        self.assertEqual(loaded.open_orders_df['order_type'].iloc[0], OrderType.LIMIT)
+        pd.testing.assert_series_equal(loaded.position_df['quantity'], portfolio.position_df['quantity'].astype(float))
+        pd.testing.assert_frame_equal(loaded.portfolio_history_df, portfolio.portfolio_history_df.astype(float),
+                                      check_names=False)
+        self.assertEqual(loaded.option_positions_df.loc['AAPL240621C00150000', 'quantity'], 2)
+
+    def test_resume_after_reload(self):
+        """Test that syncing a reloaded portfolio appends without duplicating rows"""
+        with PortfolioStore(self.path) as store:
+            self.trade(Portfolio(initial_capital=100000), store, range(30))
+        with PortfolioStore(self.path) as store:
+            portfolio = store.load_portfolio()
+            self.trade(portfolio, store, range(30, 60))
+            store.flush()
+            self.assertEqual(len(store.fills()), 12)
+            self.assertEqual(len(store.history()), 60)
+            self.assertEqual(store.load_portfolio().current_cash, portfolio.current_cash)
+
+    def test_indexed_queries(self):
+        """Test fills by symbol and time range and history by time range"""
+        with PortfolioStore(self.path) as store:
+            self.trade(Portfolio(initial_capital=100000), store, range(60))
+            store.flush()
+            fills = store.fills(symbol='AAPL', start=self.index[10], end=self.index[40])
+            self.assertEqual(list(fills['fill_time']), [self.index[i] for i in (10, 20, 30, 40)])
+            self.assertTrue((fills['symbol'] == 'AAPL').all())
+            history = store.history(start=self.index[5], end=self.index[9])
+            self.assertEqual(list(history.index), list(self.index[5:10]))
+
+    def test_repeated_timestamp_overwrites_history(self):
+        """Test that a history row rewritten in place is persisted once with its latest value"""
+        portfolio = Portfolio(initial_capital=1000)
+        with PortfolioStore(self.path) as store:
+            portfolio.update_portfolio_value({}, self.index[0])
+            store.sync(portfolio)
+            portfolio.current_cash = 900
+            portfolio.update_portfolio_value({}, self.index[0])
+            store.sync(portfolio)
+            store.flush()
+            history = store.history()
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history['cash'].iloc[0], 900)
+
+    def test_sync_builds_rows_off_the_trading_thread(self):
+        """Test that sync() leaves row building to the writer and skips unchanged tables"""
+        store = PortfolioStore(self.path)
+        apply = store._apply
+        applied = []
+
+        def recording_apply(kind, name, payload):
+            applied.append(kind)
+            return apply(kind, name, payload)
+        store._apply = recording_apply
+        rows = persistence._rows
+        builders = []
+
+        def recording_rows(*args):
+            builders.append(threading.current_thread())
+            return rows(*args)
+        portfolio = Portfolio(initial_capital=100000)
+        with patch('portfolio.persistence._rows', side_effect=recording_rows):
+            self.trade(portfolio, store, range(3))
+            store.flush()
+        self.assertTrue(builders)
+        self.assertTrue(all(thread is store._writer for thread in builders))
+        del applied[:]
+        store.sync(portfolio)
+        store.flush()
+        self.assertEqual(sorted(applied), ['history', 'state'])
+        # In-place edits after sync() do not reach the copy already queued
+        portfolio.position_df.loc['AAPL', 'quantity'] = 20
+        store.sync(portfolio)
+        portfolio.position_df.loc['AAPL', 'quantity'] = 99
+        store.close()
+        with PortfolioStore(self.path) as reopened:
+            self.assertEqual(reopened.load_portfolio().position_df.loc['AAPL', 'quantity'], 20)
+
+    def test_write_failure_does_not_hang(self):
+        """Test that a failed write releases flush() and close() and fails the store"""
+        store = PortfolioStore(self.path)
+        apply = store._apply
+
+        def failing_apply(kind, name, rows):
+            if kind == 'history':
+                raise RuntimeError("disk full")
+            return apply(kind, name, rows)
+        store._apply = failing_apply
+        portfolio = Portfolio(initial_capital=100000)
+        self.trade(portfolio, store, range(3))
+
+        closer = threading.Thread(target=lambda: self.assertRaises(RuntimeError, store.close))
+        closer.start()
+        closer.join(timeout=5)
+        self.assertFalse(closer.is_alive())
+        self.assertFalse(store._writer.is_alive())
+        with self.assertRaises(RuntimeError):
+            store.sync(portfolio)
+        with PortfolioStore(self.path) as reopened:
+            self.assertEqual(reopened.portfolios(), [])
+
+    def test_reload_reserves_order_ids(self):
+        """Test that new orders in a fresh process never reuse a restored order id"""
+        portfolio = Portfolio(initial_capital=100000)
+        for order_id, symbol in ((1, 'GOOG'), (2, 'AAPL')):
+            portfolio.add_order(LimitOrder(symbol, OrderDirection.LONG, 5, limit_price=50.0, open_price=100.0,
+                                           order_id=order_id), limit_price=50.0)
+        with PortfolioStore(self.path) as store:
+            store.sync(portfolio)
+
+        code = (f"from portfolio.persistence import PortfolioStore; from order.order import LimitOrder, OrderDirection\n"
+                f"store = PortfolioStore({self.path!r}); portfolio = store.load_portfolio()\n"
+                f"new = LimitOrder('MSFT', OrderDirection.LONG, 1, limit_price=1.0)\n"
+                f"portfolio.add_order(new, limit_price=1.0); portfolio.cancel_order(new.order_id)\n"
+                f"print(new.order_id, sorted(portfolio.open_orders_df['symbol'])); store.close()")
+        completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                   cwd=str(Path(__file__).parent), check=True)
+        self.assertEqual(completed.stdout.split()[0], '3')
+        self.assertIn("['AAPL', 'GOOG']", completed.stdout)
+
+    def test_reload_routes_open_orders_to_fill_source(self):
+        """Test that restored open orders rest in a new fill_source book and fill from it"""
+        portfolio = Portfolio(initial_capital=100000)
+        portfolio.add_order(LimitOrder('AAPL', OrderDirection.LONG, 5, limit_price=50.0, open_price=100.0),
+                            limit_price=50.0)
+        with PortfolioStore(self.path) as store:
+            store.sync(portfolio)
+            engine = MatchingEngine()
+            restored = store.load_portfolio(fill_source=engine)
+            order_id = restored.open_orders_df['order_id'].iloc[0]
+            self.assertIn(order_id, restored._routed_orders)
+            engine.submit(LimitOrder('AAPL', OrderDirection.SHORT, 5, limit_price=50.0))
+            fills = restored.check_pending_orders({})
+            self.assertEqual([fill.order_id for fill in fills], [order_id])
+            self.assertEqual(restored.position_df.loc['AAPL', 'quantity'], 5)
+            self.assertEqual(restored.current_cash, 100000 - 5 * 50.0)
+            self.assertNotIn(order_id, restored._routed_orders)
+            store.sync(restored)
+            store.flush()
+            self.assertEqual(len(store.fills()), 1)
+
+    def test_named_portfolios(self):
+        """Test that several portfolios share one database"""
+        with PortfolioStore(self.path) as store:
+            self.trade(Portfolio(initial_capital=100000), store, range(10), name='fast')
+            self.trade(Portfolio(initial_capital=50000), store, range(20), name='slow')
+            store.flush()
+            self.assertEqual(store.portfolios(), ['fast', 'slow'])
+            self.assertEqual(store.load_portfolio('slow').initial_capital, 50000)
+            self.assertEqual(len(store.history('fast')), 10)
+            with self.assertRaises(ValueError):
+                store.load_portfolio('missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from datetime import datetime
 import pandas as pd
+import numpy as np
 import sys
 from pathlib import Path
 
@@ -9,6 +10,7 @@ sys.path.append(str(Path(__file__).parent))
 
 from order.order import Order, OrderType, OrderDirection, LimitOrder, StopOrder
 from portfolio.portfolio import Portfolio
+from data.option_pricer import black_scholes, option_symbol
 
 
 class TestOrder(unittest.TestCase):
@@ -231,6 +233,46 @@ class TestOrder(unittest.TestCase):
         self.assertEqual(order_dict['direction'], OrderDirection.LONG)
         self.assertEqual(order_dict['quantity'], 10)
 
+    def test_order_is_compact(self):
+        """Test that orders use slots instead of a per-instance dict"""
+        order = LimitOrder("AAPL", OrderDirection.LONG, 10, limit_price=150.0, open_price=150.0)
+        self.assertFalse(hasattr(order, '__dict__'))
+        with self.assertRaises(AttributeError):
+            order.unknown_field = 1
+
+    def test_order_ids_increase(self):
+        """Test that default order ids are increasing integers"""
+        first = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 1, open_price=1.0)
+        second = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 1, open_price=1.0)
+        self.assertIsInstance(first.order_id, int)
+        self.assertGreater(second.order_id, first.order_id)
+        custom = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 1, open_price=1.0, order_id="abc")
+        self.assertEqual(custom.order_id, "abc")
+
+    def test_timestamps_from_caller(self):
+        """Test that open and fill times come from the caller"""
+        opened, filled = datetime(2024, 1, 2, 9, 30), datetime(2024, 1, 2, 10, 0)
+        order = StopOrder("AAPL", OrderDirection.SHORT, 10, stop_price=155.0, open_price=150.0, timestamp=opened)
+        order.execute_order(156.0, timestamp=filled)
+        self.assertEqual(order.open_time, opened)
+        self.assertEqual(order.fill_time, filled)
+
+    def test_get_order_is_snapshot_and_get_record_is_live(self):
+        """Test that get_order keeps the state at export while get_record follows later fills"""
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 10, open_price=150.0)
+        snapshot = order.get_order()
+        record = order.get_record()
+        order.execute_order(151.0)
+        order.fill(151.0, quantity=4)
+        self.assertFalse(snapshot['filled'])
+        self.assertEqual(snapshot['quantity'], 10)
+        self.assertIsNone(snapshot['fill_price'])
+        self.assertTrue(record['filled'])
+        self.assertEqual(record['quantity'], 4)
+        self.assertEqual(dict(record)['fill_price'], 151.0)
+        with self.assertRaises(KeyError):
+            record['missing']
+
 
 class TestPortfolio(unittest.TestCase):
     """Test cases for Portfolio class"""
@@ -414,6 +456,8 @@ class TestPortfolio(unittest.TestCase):
         executed = self.portfolio.check_pending_orders(market_data)
         self.assertEqual(len(executed), 1)
         self.assertTrue(executed[0].filled)
+        self.assertEqual(executed[0].order_id, limit_order.order_id)
+        self.assertEqual(self.portfolio.filled_orders_df.iloc[0]['order_id'], limit_order.order_id)
 
     def test_update_portfolio_value(self):
         """Test updating portfolio value"""
@@ -572,6 +616,96 @@ class TestPortfolio(unittest.TestCase):
         self.assertTrue(summary['filled_orders_count'] >= 3)
 
 
+class TestOptionPortfolio(unittest.TestCase):
+    """Test cases for option positions held in a Portfolio"""
+
+    def setUp(self):
+        self.portfolio = Portfolio(initial_capital=100000)
+        self.expiry = datetime(2025, 6, 20)
+        self.now = datetime(2025, 1, 2)
+
+    def _buy(self, symbol, option_type, strike, quantity, price, direction=OrderDirection.LONG):
+        order = Order(symbol, OrderType.MARKET, direction, quantity, open_price=price)
+        return self.portfolio.execute_option_order(order, price, option_type, strike, self.expiry)
+
+    def test_black_scholes_put_call_parity(self):
+        """Test that the vectorized pricer satisfies put-call parity"""
+        strikes = [90.0, 100.0, 110.0]
+        calls = black_scholes(100.0, strikes, 0.5, 0.05, 0.2, True)['price']
+        puts = black_scholes(100.0, strikes, 0.5, 0.05, 0.2, False)['price']
+        for call, put, strike in zip(calls, puts, strikes):
+            self.assertAlmostEqual(call - put, 100.0 - strike * np.exp(-0.05 * 0.5))
+
+    def test_deep_out_of_the_money_put_keeps_precision(self):
+        """Test that far-tail put prices and greeks are not cancelled to zero"""
+        from scipy.special import ndtr
+        years, sigma = 0.5, 0.2
+        d1 = (np.log(100.0 / 10.0) + (0.05 + 0.5 * sigma ** 2) * years) / (sigma * np.sqrt(years))
+        d2 = d1 - sigma * np.sqrt(years)
+        discount = np.exp(-0.05 * years)
+        results = black_scholes(100.0, 10.0, years, 0.05, sigma, False)
+        self.assertGreater(float(results['price']), 0.0)
+        np.testing.assert_allclose(results['price'], 10.0 * discount * ndtr(-d2) - 100.0 * ndtr(-d1), rtol=1e-6)
+        np.testing.assert_allclose(results['rho'], -10.0 * years * discount * ndtr(-d2) / 100, rtol=1e-12)
+        self.assertLess(float(results['delta']), 0.0)
+
+    def test_expired_option_is_intrinsic(self):
+        """Test that expired contracts are worth intrinsic value with no greeks"""
+        results = black_scholes(105.0, 100.0, 0.0, 0.05, 0.2, True)
+        self.assertAlmostEqual(float(results['price']), 5.0)
+        self.assertEqual(float(results['delta']), 0.0)
+
+    def test_execute_option_order(self):
+        """Test that an option fill charges premium times multiplier"""
+        self.assertTrue(self._buy("AAPL", "call", 150.0, 2, 5.0))
+        contract = option_symbol("AAPL", self.expiry, "call", 150.0)
+        self.assertEqual(contract, "AAPL250620C00150000")
+        self.assertEqual(self.portfolio.current_cash, 100000 - 2 * 5.0 * 100)
+        self.assertEqual(self.portfolio.option_positions_df.loc[contract, 'quantity'], 2)
+        self.assertEqual(self.portfolio.filled_orders_df.iloc[0]['symbol'], contract)
+
+    def test_option_fill_uses_given_timestamp(self):
+        """Test that an option fill is stamped with the bar time, not the wall clock"""
+        order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, 1, open_price=5.0)
+        self.portfolio.execute_option_order(order, 5.0, "call", 150.0, self.expiry, timestamp=self.now)
+        self.assertEqual(order.fill_time, self.now)
+        self.assertEqual(self.portfolio.filled_orders_df.iloc[0]['fill_time'], self.now)
+
+    def test_option_greeks_aggregation(self):
+        """Test per-underlying and book greeks after a mark"""
+        self._buy("AAPL", "call", 150.0, 2, 5.0)
+        self._buy("AAPL", "put", 140.0, 1, 3.0, direction=OrderDirection.SHORT)
+        self._buy("MSFT", "call", 400.0, 1, 10.0)
+        self.portfolio.update_option_values({"AAPL": 150.0, "MSFT": 410.0}, self.now,
+                                            volatility={"AAPL": 0.25, "MSFT": 0.2})
+
+        years = (self.expiry - self.now).days / 365.25
+        call = black_scholes(150.0, 150.0, years, 0.05, 0.25, True)
+        put = black_scholes(150.0, 140.0, years, 0.05, 0.25, False)
+        greeks = self.portfolio.get_option_greeks()
+        expected_delta = 200 * float(call['delta']) - 100 * float(put['delta'])
+        self.assertAlmostEqual(greeks.loc["AAPL", 'delta'], expected_delta)
+        self.assertAlmostEqual(greeks.loc["TOTAL", 'gamma'], greeks.loc[["AAPL", "MSFT"], 'gamma'].sum())
+
+    def test_option_value_in_portfolio_history(self):
+        """Test that option market value is included in total value"""
+        self._buy("AAPL", "call", 150.0, 1, 5.0)
+        self.portfolio.update_option_values({"AAPL": 160.0}, self.now, volatility=0.25)
+        self.portfolio.update_portfolio_value({"AAPL": 160.0}, self.now)
+        option_value = self.portfolio.option_positions_df['market_value'].sum()
+        self.assertGreater(option_value, 1000.0)
+        self.assertAlmostEqual(self.portfolio.portfolio_history_df.iloc[0]['total_value'],
+                               self.portfolio.current_cash + option_value)
+
+    def test_closing_option_position(self):
+        """Test that selling the same contract flattens the position"""
+        self._buy("AAPL", "call", 150.0, 2, 5.0)
+        self._buy("AAPL", "call", 150.0, 2, 6.0, direction=OrderDirection.SHORT)
+        contract = option_symbol("AAPL", self.expiry, "call", 150.0)
+        self.assertEqual(self.portfolio.option_positions_df.loc[contract, 'quantity'], 0)
+        self.assertEqual(self.portfolio.current_cash, 100000 + 2 * 1.0 * 100)
+
+
 def run_tests():
     """Run all tests and print results"""
     # Create test suite
@@ -581,6 +715,7 @@ def run_tests():
     # Add test cases
     suite.addTests(loader.loadTestsFromTestCase(TestOrder))
     suite.addTests(loader.loadTestsFromTestCase(TestPortfolio))
+    suite.addTests(loader.loadTestsFromTestCase(TestOptionPortfolio))
     
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
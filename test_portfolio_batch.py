@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from portfolio.portfolio import Portfolio
+from portfolio.portfolio_batch import PortfolioBatch
+from order.order import Order, OrderType, OrderDirection
+from order.costs import CompositeCostModel, PerShareCommission, SpreadCost
+
+
+class TestPortfolioBatch(unittest.TestCase):
+    """Test cases for K portfolios simulated as arrays"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.symbols = ['AAPL', 'MSFT', 'GOOG']
+        self.index = pd.bdate_range('2024-01-02', periods=80)
+        self.prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (80, 3)), axis=0))
+        # Random buys and sells, including sells through zero and buys too large to afford
+        self.orders = rng.integers(-40, 41, (80, 6, 3)) * (rng.random((80, 6, 3)) < 0.3)
+        self.orders[10, 0, 0] = 5000
+        self.prices[20:25, 2] = np.nan
+
+    def run_portfolios(self, cost_model=None):
+        portfolios = [Portfolio(initial_capital=100000, cost_model=cost_model) for _ in range(6)]
+        rejected = np.zeros(6, dtype=int)
+        for t, timestamp in enumerate(self.index):
+            for k, portfolio in enumerate(portfolios):
+                for j, symbol in enumerate(self.symbols):
+                    quantity = self.orders[t, k, j]
+                    if quantity == 0 or np.isnan(self.prices[t, j]):
+                        continue
+                    direction = OrderDirection.LONG if quantity > 0 else OrderDirection.SHORT
+                    order = Order(symbol, OrderType.MARKET, direction, abs(int(quantity)), open_price=self.prices[t, j],
+                                  timestamp=timestamp)
+                    try:
+                        portfolio.execute_market_order(order, self.prices[t, j], timestamp=timestamp)
+                    except ValueError:
+                        rejected[k] += 1
+                marks = {symbol: self.prices[t, j] for j, symbol in enumerate(self.symbols) if not np.isnan(self.prices[t, j])}
+                portfolio.update_portfolio_value(marks, timestamp)
+        return portfolios, rejected
+
+    def run_batch(self, cost_model=None):
+        batch = PortfolioBatch(6, self.symbols, initial_capital=100000, cost_model=cost_model)
+        for t, timestamp in enumerate(self.index):
+            quantities = np.where(np.isnan(self.prices[t]), 0, self.orders[t])
+            batch.execute(quantities, np.nan_to_num(self.prices[t]))
+            batch.mark(self.prices[t], timestamp)
+        return batch
+
+    def assert_matches(self, cost_model=None):
+        portfolios, rejected = self.run_portfolios(cost_model)
+        batch = self.run_batch(cost_model)
+        np.testing.assert_allclose(batch.cash, [p.current_cash for p in portfolios])
+        np.testing.assert_array_equal(batch.rejected_count, rejected)
+        np.testing.assert_array_equal(batch.trade_count, [len(p.filled_orders_df) for p in portfolios])
+        for k, portfolio in enumerate(portfolios):
+            expected = portfolio.position_df.reindex(batch.positions(k).index).astype(float)
+            pd.testing.assert_frame_equal(batch.positions(k), expected, check_names=False)
+            np.testing.assert_allclose(batch.history('total_value')[k].to_numpy(),
+                                       portfolio.portfolio_history_df['total_value'].to_numpy(dtype=float))
+        return batch
+
+    def test_matches_portfolio_accounting(self):
+        """Test that the batch reproduces separate Portfolio objects"""
+        batch = self.assert_matches()
+        self.assertEqual(batch.rejected_count[0], 1)
+
+    def test_matches_portfolio_with_costs(self):
+        """Test that cost models apply to the arrays the same way"""
+        self.assert_matches(CompositeCostModel(PerShareCommission(0.01, minimum=1.0), SpreadCost(10)))
+
+    def test_rebalance_and_metrics(self):
+        """Test target rebalancing and per-portfolio metrics"""
+        batch = PortfolioBatch(3, ['AAPL', 'MSFT'], initial_capital=[1000, 2000, 3000])
+        batch.rebalance([[5, 0], [0, 10], [5, 5]], [100.0, 50.0])
+        batch.mark([100.0, 50.0], pd.Timestamp('2024-01-02'))
+        batch.rebalance([[0, 0], [0, 10], [10, 5]], [110.0, 55.0])
+        batch.mark([110.0, 55.0], pd.Timestamp('2024-01-03'))
+        np.testing.assert_allclose(batch.quantity, [[0, 0], [0, 10], [10, 5]])
+        np.testing.assert_allclose(batch.avg_price[2], [105.0, 50.0])
+        np.testing.assert_allclose(batch.history('total_value').iloc[-1], [1050.0, 2050.0, 3075.0])
+        metrics = batch.get_performance_metrics()
+        self.assertEqual(len(metrics), 3)
+        np.testing.assert_allclose(metrics['total_return'], [0.05, 0.025, 0.025])
+
+    def test_shape_validation(self):
+        """Test that arrays must have one value per symbol"""
+        batch = PortfolioBatch(2, ['AAPL', 'MSFT'])
+        with self.assertRaises(ValueError):
+            batch.execute([1, 2, 3], [100.0, 50.0])
+        with self.assertRaises(ValueError):
+            batch.history('nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
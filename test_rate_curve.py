@@ -0,0 +1,109 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data import rate_curve
+from data.rate_curve import RateCurve, RateCurveCache
+from data.data_factory import DataLoader
+from portfolio.portfolio import Portfolio
+from order.order import Order, OrderType, OrderDirection
+
+
+class TestRateCurve(unittest.TestCase):
+    """Test cases for the cached risk-free term structure"""
+
+    def setUp(self):
+        self.frame = pd.DataFrame({0.25: [0.050, 0.052, np.nan], 5.0: [0.040, 0.041, 0.043], 10.0: [0.042, 0.043, 0.045]},
+                                  index=pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-05']))
+        self.curve = RateCurve.from_frame(self.frame)
+
+    def test_interpolation_and_flat_extrapolation(self):
+        """Test linear interpolation between tenors and flat ends"""
+        rates = self.curve.rate([0.1, 0.25, 2.625, 5.0, 7.5, 30.0], as_of='2024-01-03')
+        np.testing.assert_allclose(rates, [0.052, 0.052, 0.0465, 0.041, 0.042, 0.043])
+        self.assertIsInstance(self.curve.rate(1.0), float)
+
+    def test_as_of_lookup(self):
+        """Test historical lookups use the latest curve on or before the date"""
+        self.assertAlmostEqual(self.curve.rate(5.0, as_of='2024-01-04'), 0.041)
+        np.testing.assert_allclose(self.curve.rate(5.0, as_of=['2024-01-02', '2024-01-05']), [0.040, 0.043])
+        # Missing 3 month quote carries forward
+        self.assertAlmostEqual(self.curve.rate(0.25, as_of='2024-01-05'), 0.052)
+        with self.assertRaises(ValueError):
+            self.curve.rate(1.0, as_of='2023-12-29')
+
+    def test_csv_round_trip(self):
+        """Test a local curve file reloads the same curve"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.curve.to_csv(os.path.join(tmp, 'curve.csv'))
+            loaded = RateCurveCache(path=path).curve()
+        np.testing.assert_allclose(loaded.rates, self.curve.rates)
+        np.testing.assert_array_equal(loaded.tenors, self.curve.tenors)
+
+    def test_cache_ttl_and_fallback(self):
+        """Test the loader runs once per TTL and failures fall back"""
+        calls = []
+        cache = RateCurveCache(loader=lambda: calls.append(1) or self.curve, ttl=3600)
+        for _ in range(5):
+            cache.rate(1.0)
+        self.assertEqual(len(calls), 1)
+        cache.invalidate()
+        cache.rate(1.0)
+        self.assertEqual(len(calls), 2)
+
+        def fail():
+            raise ConnectionError("offline")
+        failing = RateCurveCache(loader=fail, ttl=0)
+        self.assertEqual(failing.rate(1.0), 0.05)
+        failing._curve = self.curve
+        self.assertAlmostEqual(failing.rate(5.0), 0.043)
+
+    def test_option_loader_uses_maturity_rate(self):
+        """Test build_option_data interpolates the curve at the option's maturity"""
+        today = pd.Timestamp(datetime.now()).normalize()
+        curve = RateCurve([today], [0.25, 10.0], [[0.05, 0.03]])
+        index = pd.bdate_range(end=today, periods=60)
+        prices = pd.DataFrame({'Close': np.linspace(90, 100, 60)}, index=index)
+        expiration = (datetime.now() + timedelta(days=int(365.25 * 5.125) + 1)).strftime('%Y-%m-%d')
+        option = DataLoader.build_option_data('AAPL', index[0], index[-1], prices,
+                                              {'calls': None, 'puts': None, 'expiration': expiration},
+                                              RateCurveCache(loader=lambda: curve), strike_price=100.0)
+        self.assertAlmostEqual(option.risk_free_rate, 0.04, places=3)
+
+    def test_portfolio_marks_with_curve(self):
+        """Test the option book is marked with per-maturity rates"""
+        curve = RateCurve(['2024-01-01'], [0.25, 2.0], [[0.0, 0.10]])
+        flat = Portfolio(initial_capital=100000)
+        curved = Portfolio(initial_capital=100000)
+        for portfolio in (flat, curved):
+            for expiry, premium in (('2024-04-01', 5.0), ('2026-01-02', 15.0)):
+                order = Order('AAPL', OrderType.MARKET, OrderDirection.LONG, 1, open_price=premium)
+                portfolio.execute_option_order(order, premium, 'call', 100.0, pd.Timestamp(expiry))
+        flat.update_option_values({'AAPL': 100.0}, pd.Timestamp('2024-01-02'), 0.2, risk_free_rate=0.0)
+        curved.update_option_values({'AAPL': 100.0}, pd.Timestamp('2024-01-02'), 0.2, risk_free_rate=curve)
+        difference = curved.option_positions_df['market_price'] - flat.option_positions_df['market_price']
+        near, far = difference.loc[['AAPL240401C00100000', 'AAPL260102C00100000']]
+        self.assertAlmostEqual(near, 0.0, places=6)
+        self.assertGreater(far, 0.5)
+
+    def test_default_cache_is_replaceable(self):
+        """Test offline runs can swap in a file-backed default cache"""
+        original = rate_curve.default_cache()
+        try:
+            rate_curve.set_default_cache(RateCurveCache(loader=lambda: self.curve))
+            from data.download_data import load_rf_data
+            self.assertAlmostEqual(load_rf_data(), 0.052)
+        finally:
+            rate_curve.set_default_cache(original)
+
+
+if __name__ == '__main__':
+    unittest.main()
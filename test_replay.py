@@ -0,0 +1,94 @@
+import unittest
+import tempfile
+import os
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.replay import TickReader, CsvTickReader, BinaryTickReader, ReplayEngine, merge_streams, write_binary_ticks
+from order.order import OrderDirection, LimitOrder
+from portfolio.portfolio import Portfolio
+
+
+def make_ticks(start, n, step_ms, price, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq=f"{step_ms}ms", name='timestamp')
+    return pd.DataFrame({'price': price + np.cumsum(rng.normal(0, 0.01, n)),
+                         'size': rng.integers(1, 100, n).astype(float)}, index=index)
+
+
+class TestTickReplay(unittest.TestCase):
+    """Test cases for the streaming tick replay engine"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.aapl = make_ticks("2024-01-02 09:30", 1000, 7, 150.0, 1)
+        self.msft = make_ticks("2024-01-02 09:30", 800, 11, 400.0, 2)
+        self.aapl_path = os.path.join(self.tmp.name, "AAPL.csv")
+        self.msft_path = os.path.join(self.tmp.name, "MSFT.bin")
+        self.aapl.to_csv(self.aapl_path)
+        write_binary_ticks(self.msft_path, self.msft)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def readers(self, chunksize=100):
+        return [CsvTickReader(self.aapl_path, "AAPL", chunksize=chunksize),
+                BinaryTickReader(self.msft_path, "MSFT", chunksize=chunksize)]
+
+    def test_binary_round_trip(self):
+        """Test that binary tick files read back the written ticks"""
+        chunks = list(BinaryTickReader(self.msft_path, "MSFT", chunksize=300).iter_chunks())
+        self.assertEqual([len(c[0]) for c in chunks], [300, 300, 200])
+        np.testing.assert_allclose(np.concatenate([c[1] for c in chunks]), self.msft['price'].to_numpy())
+
+    def test_reader_without_chunks_cannot_be_built(self):
+        """Test that a reader subclass must implement iter_chunks"""
+        class NoChunks(TickReader):
+            pass
+        with self.assertRaises(TypeError):
+            NoChunks(self.msft_path, "MSFT")
+
+    def test_merge_is_time_ordered(self):
+        """Test that the k-way merge yields every event in timestamp order"""
+        events = list(merge_streams(self.readers()))
+        self.assertEqual(len(events), 1800)
+        timestamps = [event[0] for event in events]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(sum(1 for e in events if e[1] == "MSFT"), 800)
+
+    def test_streams_are_read_in_chunks(self):
+        """Test that readers consume files lazily, chunk by chunk"""
+        readers = self.readers(chunksize=100)
+        stream = merge_streams(readers)
+        next(stream)
+        self.assertEqual([r.chunks_read for r in readers], [1, 1])
+
+    def test_batches(self):
+        """Test batch sizes and batch summaries"""
+        batches = list(ReplayEngine(self.readers(), batch_size=500).iter_batches())
+        self.assertEqual([len(b) for b in batches], [500, 500, 500, 300])
+        prices, volumes, timestamp = ReplayEngine.summarize_batch(batches[-1])
+        self.assertEqual(set(prices), {"AAPL", "MSFT"})
+        self.assertEqual(timestamp, max(self.aapl.index[-1], self.msft.index[-1]))
+
+    def test_run_portfolio(self):
+        """Test driving pending orders and marking from the replay"""
+        portfolio = Portfolio(initial_capital=100000)
+        limit = self.aapl['price'].max() + 1.0
+        portfolio.add_order(LimitOrder("AAPL", OrderDirection.LONG, 10, limit_price=limit, open_price=limit),
+                            limit_price=limit)
+        stats = ReplayEngine(self.readers(), batch_size=50).run(portfolio)
+
+        self.assertEqual(stats, {'batches': 36, 'events': 1800})
+        self.assertEqual(len(portfolio.portfolio_history_df), 36)
+        self.assertEqual(portfolio.position_df.loc["AAPL", 'quantity'], 10)
+        self.assertTrue(portfolio.open_orders_df.iloc[0]['filled'])
+
+
+if __name__ == '__main__':
+    unittest.main()
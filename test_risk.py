@@ -0,0 +1,124 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from portfolio.risk import CovarianceEstimator, PortfolioRisk
+
+
+def make_returns(n_days=500, symbols=("AAPL", "GOOGL", "MSFT"), seed=7):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0, 0.01, n_days)
+    data = {s: 0.5 * (i + 1) * market + rng.normal(0.0, 0.01, n_days) for i, s in enumerate(symbols)}
+    return pd.DataFrame(data, index=pd.bdate_range("2020-01-01", periods=n_days))
+
+
+class TestCovarianceEstimator(unittest.TestCase):
+    """Test cases for the incremental covariance estimator"""
+
+    def test_matches_sample_covariance(self):
+        """Test that the cached covariance matches pandas"""
+        returns = make_returns()
+        estimator = CovarianceEstimator().update(returns)
+        np.testing.assert_allclose(estimator.covariance, returns.cov().to_numpy())
+
+    def test_incremental_update(self):
+        """Test that chunked updates equal one full update"""
+        returns = make_returns()
+        estimator = CovarianceEstimator()
+        estimator.update(returns.iloc[:200])
+        first = estimator.covariance
+        estimator.update(returns.iloc[200:])
+        self.assertIsNot(first, estimator.covariance)
+        np.testing.assert_allclose(estimator.covariance, returns.cov().to_numpy())
+
+    def test_fixed_shrinkage(self):
+        """Test that full shrinkage gives a scaled identity"""
+        returns = make_returns()
+        estimator = CovarianceEstimator(shrinkage=1.0).update(returns)
+        cov = estimator.covariance
+        np.testing.assert_allclose(cov, np.eye(3) * np.trace(returns.cov().to_numpy()) / 3)
+
+    def test_oas_shrinkage(self):
+        """Test that OAS produces an intensity between 0 and 1"""
+        estimator = CovarianceEstimator(shrinkage='oas').update(make_returns())
+        estimator.covariance
+        self.assertGreater(estimator.shrinkage_intensity, 0.0)
+        self.assertLessEqual(estimator.shrinkage_intensity, 1.0)
+
+    def test_invalid_shrinkage(self):
+        """Test that invalid shrinkage settings raise"""
+        with self.assertRaises(ValueError):
+            CovarianceEstimator(shrinkage='ledoit')
+        with self.assertRaises(ValueError):
+            CovarianceEstimator(shrinkage=1.5)
+
+
+class TestPortfolioRisk(unittest.TestCase):
+    """Test cases for the portfolio risk engine"""
+
+    def setUp(self):
+        self.returns = make_returns()
+        self.positions = pd.DataFrame({
+            'quantity': [10, 5, -8],
+            'market_value': [1500.0, 1000.0, -2400.0],
+        }, index=['AAPL', 'GOOGL', 'MSFT'])
+        self.risk = PortfolioRisk(self.positions, self.returns, confidence=0.95)
+
+    def test_historical_var(self):
+        """Test historical VaR against a direct quantile"""
+        pnl = np.expm1(self.returns.to_numpy()) @ self.positions['market_value'].to_numpy()
+        self.assertAlmostEqual(self.risk.historical_var(), -np.quantile(pnl, 0.05))
+        self.assertGreaterEqual(self.risk.historical_cvar(), self.risk.historical_var())
+
+    def test_parametric_var(self):
+        """Test parametric VaR and CVaR ordering"""
+        self.assertGreater(self.risk.parametric_var(), 0.0)
+        self.assertGreater(self.risk.parametric_cvar(), self.risk.parametric_var())
+
+    def test_parametric_close_to_historical_on_normal_returns(self):
+        """Test that parametric and historical VaR agree on normally distributed returns"""
+        rng = np.random.default_rng(3)
+        cov = np.array([[4.0, 1.0, 0.5], [1.0, 9.0, 2.0], [0.5, 2.0, 6.0]]) * 25e-4
+        simple = rng.multivariate_normal([0.0005, 0.0002, 0.0003], cov, size=200000)
+        returns = pd.DataFrame(np.log1p(simple), columns=['AAPL', 'GOOGL', 'MSFT'])
+        risk = PortfolioRisk(self.positions, returns, confidence=0.99)
+        self.assertAlmostEqual(risk.parametric_var() / risk.historical_var(), 1.0, delta=0.01)
+        self.assertAlmostEqual(risk.parametric_cvar() / risk.historical_cvar(), 1.0, delta=0.01)
+
+    def test_monte_carlo_close_to_parametric(self):
+        """Test that Monte Carlo VaR converges to the parametric value"""
+        mc_var = self.risk.monte_carlo_var(n_sims=200000, seed=1)
+        self.assertAlmostEqual(mc_var / self.risk.parametric_var(), 1.0, delta=0.02)
+
+    def test_component_var_sums_to_total(self):
+        """Test that component VaR adds up to the portfolio VaR"""
+        mu = float(self.risk.estimator.mean @ self.risk.exposures)
+        self.assertAlmostEqual(self.risk.component_var().sum(), self.risk.parametric_var() + mu)
+
+    def test_beta_against_benchmark(self):
+        """Test beta against an explicit benchmark series"""
+        benchmark = self.returns['AAPL']
+        risk = PortfolioRisk(self.positions, self.returns, benchmark_returns=benchmark)
+        self.assertAlmostEqual(risk.beta()['AAPL'], 1.0)
+
+    def test_missing_returns_for_position(self):
+        """Test that a position without returns raises"""
+        positions = pd.DataFrame({'market_value': [100.0]}, index=['TSLA'])
+        risk = PortfolioRisk(positions, self.returns)
+        with self.assertRaises(ValueError):
+            risk.exposures
+
+    def test_position_risk_table(self):
+        """Test the per-position risk table"""
+        table = self.risk.get_position_risk()
+        self.assertListEqual(list(table.columns), ['exposure', 'marginal_var', 'component_var', 'beta'])
+        self.assertEqual(len(table), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
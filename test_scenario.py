@@ -0,0 +1,131 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.option_pricer import black_scholes
+from data.rate_curve import RateCurve
+from order.order import Order, OrderType, OrderDirection
+from portfolio.portfolio import Portfolio
+from portfolio.scenario import stress_option_book
+
+
+def make_book(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'underlying': rng.choice(['SPY', 'AAPL', 'MSFT'], n),
+        'option_type': rng.choice(['call', 'put'], n),
+        'strike_price': rng.uniform(80, 120, n),
+        'expiration_date': pd.Timestamp('2025-01-02') + pd.to_timedelta(rng.integers(3, 600, n), unit='D'),
+        'multiplier': 100,
+        'quantity': rng.integers(-10, 11, n),
+    }, index=pd.Index([f'C{i}' for i in range(n)], name='contract'))
+
+
+SPOTS = {'SPY': 100.0, 'AAPL': 105.0, 'MSFT': 95.0}
+VOLS = {'SPY': 0.18, 'AAPL': 0.3, 'MSFT': 0.25}
+AS_OF = '2025-01-02'
+
+
+class TestScenarioEngine(unittest.TestCase):
+    """Test cases for option book stress testing over scenario grids"""
+
+    def setUp(self):
+        self.book = make_book(300, 1)
+        self.spot_shocks = np.linspace(-0.2, 0.2, 9)
+        self.vol_shocks = np.array([-0.05, 0.0, 0.05, 0.1])
+        self.day_shifts = np.array([0, 7, 30])
+
+    def stress(self, **options):
+        return stress_option_book(self.book, SPOTS, VOLS, AS_OF, self.spot_shocks, self.vol_shocks,
+                                  self.day_shifts, **options)
+
+    def test_matches_repricing_each_contract(self):
+        """Test that every cube entry equals a direct reprice of the contract"""
+        cube = self.stress(keep_contracts=True)
+        self.assertEqual(cube.contract_pnl.shape, (9, 4, 3, 300))
+        book = self.book
+        years = (book['expiration_date'] - pd.Timestamp(AS_OF)).dt.days.to_numpy() / 365.25
+        spot = book['underlying'].map(SPOTS).to_numpy()
+        sigma = book['underlying'].map(VOLS).to_numpy()
+        is_call = (book['option_type'] == 'call').to_numpy()
+        scale = book['quantity'].to_numpy() * 100.0
+        base = black_scholes(spot, book['strike_price'], years, 0.05, sigma, is_call)['price']
+        for i, j, k in [(0, 0, 0), (4, 1, 0), (8, 3, 2), (2, 2, 1)]:
+            price = black_scholes(spot * (1 + self.spot_shocks[i]), book['strike_price'],
+                                  years - self.day_shifts[k] / 365.25, 0.05, sigma + self.vol_shocks[j], is_call)['price']
+            expected = (price - base) * scale
+            np.testing.assert_allclose(cube.contract_pnl[i, j, k], expected, atol=1e-8)
+            by_underlying = pd.Series(expected).groupby(book['underlying'].to_numpy()).sum()
+            np.testing.assert_allclose(cube.by_underlying[i, j, k], by_underlying[cube.underlyings].to_numpy(),
+                                       atol=1e-6)
+        self.assertEqual(cube.contracts, list(book.index))
+
+    def test_unshocked_scenario_is_flat(self):
+        """Test that the zero spot, vol and time scenario has no P&L"""
+        cube = self.stress()
+        np.testing.assert_allclose(cube.total[4, 1, 0], 0.0, atol=1e-8)
+        self.assertEqual(cube.shape, (9, 4, 3))
+
+    def test_chunking_does_not_change_results(self):
+        """Test that small chunks give the same cube as one chunk"""
+        whole = self.stress(chunk_size=len(self.book))
+        for chunk_size in (1, 7, 64):
+            np.testing.assert_allclose(self.stress(chunk_size=chunk_size).by_underlying, whole.by_underlying,
+                                       atol=1e-6)
+
+    def test_worst_case_reductions(self):
+        """Test the book and per-underlying worst scenarios"""
+        cube = self.stress()
+        frame = cube.to_frame()
+        self.assertEqual(len(frame), 9 * 4 * 3)
+        worst = cube.worst_case()
+        self.assertAlmostEqual(worst['pnl'], frame['TOTAL'].min())
+        self.assertAlmostEqual(worst['pnl'], sum(worst['by_underlying'].values()))
+        self.assertAlmostEqual(frame.loc[(worst['spot_shock'], worst['vol_shock'], worst['day_shift']), 'TOTAL'],
+                               worst['pnl'])
+
+        table = cube.worst_by_underlying()
+        self.assertEqual(list(table.index), cube.underlyings + ['TOTAL'])
+        for underlying in cube.underlyings:
+            self.assertAlmostEqual(table.loc[underlying, 'worst_pnl'], frame[underlying].min())
+        surface = cube.surface('AAPL', day_shift=7)
+        self.assertEqual(surface.shape, (9, 4))
+        self.assertAlmostEqual(surface.loc[0.2, 0.1], frame.loc[(0.2, 0.1, 7.0), 'AAPL'])
+
+    def test_portfolio_book_and_rate_curve(self):
+        """Test stressing a Portfolio's option positions with a rate curve"""
+        portfolio = Portfolio(initial_capital=100000)
+        expiry = datetime(2025, 6, 20)
+        for option_type, strike, quantity in (('call', 150.0, 2), ('put', 140.0, 3)):
+            order = Order("AAPL", OrderType.MARKET, OrderDirection.LONG, quantity, open_price=5.0)
+            portfolio.execute_option_order(order, 5.0, option_type, strike, expiry)
+        curve = RateCurve.flat(0.05)
+        cube = stress_option_book(portfolio, 150.0, 0.25, datetime(2025, 1, 2), [-0.1, 0.0, 0.1],
+                                  risk_free_rate=curve)
+        flat = stress_option_book(portfolio, 150.0, 0.25, datetime(2025, 1, 2), [-0.1, 0.0, 0.1])
+        np.testing.assert_allclose(cube.by_underlying, flat.by_underlying)
+        self.assertEqual(cube.underlyings, ["AAPL"])
+        # A long straddle-like book gains from large moves either way
+        self.assertGreater(cube.total[0, 0, 0], 0)
+        self.assertGreater(cube.total[2, 0, 0], 0)
+
+    def test_invalid_inputs(self):
+        """Test that bad shocks, missing market data and empty books are rejected"""
+        with self.assertRaises(ValueError):
+            stress_option_book(self.book, SPOTS, VOLS, AS_OF, [-1.0, 0.0])
+        with self.assertRaises(ValueError):
+            stress_option_book(self.book, {'SPY': 100.0}, VOLS, AS_OF, [0.0])
+        with self.assertRaises(ValueError):
+            stress_option_book(Portfolio(), 100.0, 0.2, AS_OF, [0.0])
+        with self.assertRaises(ValueError):
+            stress_option_book(self.book, SPOTS, VOLS, AS_OF, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
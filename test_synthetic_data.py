@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.synthetic_data import (PRICE_COLUMNS, bar_index, generate_prices, generate_panel, load_ticker_data,
+                                 load_strike_data, simulate_log_returns)
+from data.data_factory import DataLoader
+from data.stock_data import StockData
+from data.option_data import OptionData
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Test cases for the seeded synthetic market data generator"""
+
+    def test_prices_shaped_like_yfinance(self):
+        """Test columns, dtypes, index and bar consistency"""
+        prices = load_ticker_data('AAPL', '2024-01-01', '2024-07-01')
+        self.assertEqual(list(prices.columns), PRICE_COLUMNS)
+        self.assertEqual(prices.index.name, 'Date')
+        self.assertEqual(prices['Volume'].dtype, np.int64)
+        self.assertTrue((prices.index.dayofweek < 5).all())
+        self.assertEqual(prices.index[-1], pd.Timestamp('2024-06-28'))
+        self.assertTrue((prices['High'] >= prices[['Open', 'Close']].max(axis=1)).all())
+        self.assertTrue((prices['Low'] <= prices[['Open', 'Close']].min(axis=1)).all())
+
+    def test_reproducible_and_consistent(self):
+        """Test seeds, per-ticker paths and overlapping ranges"""
+        first = load_ticker_data('AAPL', '2021-01-01', '2022-01-01')
+        second = load_ticker_data('AAPL', '2021-06-01', '2023-01-01')
+        pd.testing.assert_frame_equal(first.loc['2021-06-01':], second.loc[:'2021-12-31'])
+        self.assertFalse(first['Close'].equals(load_ticker_data('MSFT', '2021-01-01', '2022-01-01')['Close']))
+        for process in ('gbm', 'jump', 'regime'):
+            short = generate_prices(n_bars=100, process=process, seed=5)
+            pd.testing.assert_frame_equal(short, generate_prices(n_bars=300, process=process, seed=5).iloc[:100])
+
+    def test_processes(self):
+        """Test volatility, jump tails and regime switching"""
+        gbm, _ = simulate_log_returns(50_000, volatility=0.2, seed=1)
+        self.assertAlmostEqual(gbm.std() * np.sqrt(252), 0.2, delta=0.005)
+        jump, _ = simulate_log_returns(50_000, process='jump', jump_intensity=10, seed=1)
+        excess_kurtosis = lambda x: ((x - x.mean()) ** 4).mean() / x.var() ** 2 - 3
+        self.assertGreater(excess_kurtosis(jump), 1.0)
+        self.assertLess(abs(excess_kurtosis(gbm)), 0.2)
+        regime, bar_volatility = simulate_log_returns(50_000, process='regime', seed=1)
+        self.assertEqual(len(np.unique(bar_volatility)), 2)
+        with self.assertRaises(ValueError):
+            simulate_log_returns(10, process='heston')
+
+    def test_correlated_panel(self):
+        """Test that a panel's returns have the requested correlation"""
+        panel = generate_panel(['A', 'B', 'C'], n_bars=20_000, correlation=[[1, 0.8, 0.2], [0.8, 1, 0.2], [0.2, 0.2, 1]])
+        returns = np.log(pd.concat({ticker: frame['Close'] for ticker, frame in panel.items()}, axis=1)).diff()
+        correlation = returns.corr().to_numpy()
+        self.assertAlmostEqual(correlation[0, 1], 0.8, delta=0.02)
+        self.assertAlmostEqual(correlation[0, 2], 0.2, delta=0.03)
+        self.assertTrue(panel['A'].index.equals(panel['C'].index))
+        with self.assertRaises(ValueError):
+            generate_panel(['A', 'B'], n_bars=10, correlation=[[1, 2], [2, 1]])
+
+    def test_intraday_bars(self):
+        """Test that intraday bars only cover regular sessions"""
+        index = bar_index('2024-01-05', '2024-01-09', freq='5min')
+        self.assertEqual(len(index), 2 * 78)
+        self.assertEqual(index[0], pd.Timestamp('2024-01-05 09:30'))
+        self.assertEqual(index[-1], pd.Timestamp('2024-01-08 15:55'))
+        self.assertEqual(len(generate_prices('2024-01-02', n_bars=1000, freq='1min')), 1000)
+
+    def test_strike_data(self):
+        """Test chains shaped like load_strike_data output"""
+        strike_data = load_strike_data('AAPL', '2024-03-10', as_of='2024-01-02')
+        self.assertEqual(set(strike_data), {'calls', 'puts', 'expiration', 'expiration_dates'})
+        self.assertEqual(strike_data['expiration'], '2024-03-15')
+        calls, puts = strike_data['calls'], strike_data['puts']
+        self.assertTrue(calls['contractSymbol'].iloc[0].startswith('AAPL240315C'))
+        self.assertTrue((np.diff(calls['lastPrice']) < 0).all())
+        self.assertTrue((np.diff(puts['lastPrice']) > 0).all())
+        self.assertTrue((calls['bid'] <= calls['ask']).all())
+        spot = load_ticker_data('AAPL', '2023-12-20', '2024-01-03')['Close'].iloc[-1]
+        np.testing.assert_array_equal(calls['inTheMoney'], calls['strike'] < spot)
+
+    def test_data_loader_source(self):
+        """Test DataLoader with the registered synthetic source"""
+        stock = DataLoader.load_data('AAPL', '2023-01-01', '2024-01-01', source='synthetic')
+        self.assertIsInstance(stock, StockData)
+        self.assertGreater(len(stock.get_log_returns), 200)
+        option = DataLoader.load_data('AAPL', '2023-01-01', '2024-01-01', data_type='option', source='synthetic')
+        self.assertIsInstance(option, OptionData)
+        self.assertAlmostEqual(option.risk_free_rate, 0.04)
+        with self.assertRaises(Exception):
+            DataLoader.load_data('AAPL', '2023-01-01', '2024-01-01', source='bloomberg')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add the current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from data.stock_data import StockData
+from order.costs import CompositeCostModel, FixedCommission, SpreadCost
+from data.synthetic_data import generate_prices
+from backtest.backtester import moving_average_signals, run_signal_backtest
+from backtest.walk_forward import (parameter_grid, walk_forward_windows, crossover_signals,
+                                   evaluate_signals, walk_forward)
+
+
+def make_stock(n_bars=600, seed=3):
+    prices = generate_prices('2020-01-01', n_bars=n_bars, drift=0.08, volatility=0.24, seed=seed)
+    return StockData("AAPL", prices.index[0], prices.index[-1], prices)
+
+
+class TestWalkForward(unittest.TestCase):
+    """Test cases for the walk-forward optimization runner"""
+
+    def setUp(self):
+        self.stock = make_stock()
+        self.close = self.stock.get_prices['Close']
+        self.params = parameter_grid([5, 10, 20], [20, 40, 60])
+
+    def test_windows(self):
+        """Test rolling and anchored window positions"""
+        self.assertEqual(walk_forward_windows(10, 4, 3), [(0, 4, 7), (3, 7, 10)])
+        self.assertEqual(walk_forward_windows(11, 4, 3, anchored=True), [(0, 4, 7), (0, 7, 10), (0, 10, 11)])
+        self.assertEqual(walk_forward_windows(3, 4, 3), [])
+        self.assertNotIn((20, 20), self.params)
+
+    def test_signals_match_moving_average_signals(self):
+        """Test shared rolling means give the same signals as one pair at a time"""
+        signals = crossover_signals(self.close, self.params)
+        for row, (fast, slow) in zip(signals, self.params):
+            np.testing.assert_array_equal(row, moving_average_signals(self.close, fast, slow).to_numpy())
+
+    def test_evaluate_matches_signal_backtest(self):
+        """Test batched equity curves against run_signal_backtest on the same slice"""
+        signals = crossover_signals(self.close, self.params)
+        window = slice(100, 350)
+        equity = evaluate_signals(self.close.to_numpy()[window], signals[:, window], 50000)
+        prices = self.stock.get_prices.iloc[window]
+        for k in (0, 3, len(self.params) - 1):
+            stock = StockData("AAPL", prices.index[0], prices.index[-1], prices)
+            portfolio = run_signal_backtest(stock, pd.Series(signals[k, window], index=prices.index), 50000)
+            np.testing.assert_allclose(equity[k], portfolio.portfolio_history_df['total_value'].to_numpy(dtype=float))
+
+    def test_walk_forward(self):
+        """Test chosen pairs, stitched equity and worker independence"""
+        result = walk_forward(self.stock, self.params, train_size=200, test_size=100, max_workers=1)
+        windows = result['windows']
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows['test_start'].iloc[0], self.close.index[200])
+        # The stitched curve covers exactly the out-of-sample bars
+        self.assertEqual(list(result['equity'].index), list(self.close.index[200:]))
+        # Each chosen pair scores best in sample
+        signals = crossover_signals(self.close, self.params)
+        for (train_start, test_start, _), (_, row) in zip(walk_forward_windows(600, 200, 100), windows.iterrows()):
+            equity = evaluate_signals(self.close.to_numpy()[train_start:test_start], signals[:, train_start:test_start])
+            returns = equity[:, 1:] / equity[:, :-1] - 1
+            sharpe = np.nan_to_num(returns.mean(axis=1) / returns.std(axis=1, ddof=1), nan=-np.inf)
+            self.assertEqual(self.params[int(np.argmax(sharpe))], (row['fast'], row['slow']))
+
+        parallel = walk_forward(self.stock, self.params, train_size=200, test_size=100, max_workers=2)
+        pd.testing.assert_frame_equal(parallel['windows'], windows)
+        pd.testing.assert_series_equal(parallel['equity'], result['equity'])
+        self.assertEqual(parallel['summary']['final_value'], result['summary']['final_value'])
+
+    def test_costs_in_and_out_of_portfolio(self):
+        """Test that all-in entries leave room for trading costs and trades count fills"""
+        cost_model = CompositeCostModel(SpreadCost(10), FixedCommission(5.0))
+        result = walk_forward(self.stock, self.params, train_size=200, test_size=100, max_workers=1,
+                              cost_model=cost_model)
+        portfolio = result['portfolio']
+        self.assertGreater(result['summary']['trades'], 0)
+        self.assertEqual(result['summary']['trades'], len(portfolio.filled_orders_df))
+        self.assertGreater(portfolio.filled_orders_df['commission'].sum(), 0)
+        batch = walk_forward(self.stock, self.params, train_size=200, test_size=100, max_workers=1,
+                             cost_model=cost_model, portfolio=False)
+        self.assertEqual(batch['summary']['trades'], result['summary']['trades'])
+        self.assertAlmostEqual(batch['summary']['final_value'], result['summary']['final_value'], places=6)
+
+    def test_invalid_arguments(self):
+        """Test unknown objectives and too little data are rejected"""
+        with self.assertRaises(ValueError):
+            walk_forward(self.stock, self.params, objective='profit')
+        with self.assertRaises(ValueError):
+            walk_forward(self.stock, self.params, train_size=600)
+
+
+if __name__ == '__main__':
+    unittest.main()